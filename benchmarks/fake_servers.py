@@ -0,0 +1,313 @@
+"""
+Local stand-ins for OpenWeatherMap, WeatherAPI and the Logz.io listener.
+
+Each fake serves the subset of the real API the shipper uses, over plain
+HTTP on 127.0.0.1, with a configurable per-request latency and error
+rate. Responses are deterministic per city, so runs are reproducible.
+
+Every fake also answers GET <base_url>/_stats (no latency, no errors) with its
+request, error and record counts.
+
+Usage from a benchmark:
+    
+    with FakeOpenWeatherMap(latency=0.005) as owm, FakeLogzListener() as logz:
+        source_config['base_url'] = owm.base_url
+        logz_config.update(scheme='http', host=logz.host, port=logz.port)
+
+or as a separate process, so the servers do not compete with the
+pipeline for the GIL (prints one JSON line with the URLs, then serves
+until interrupted):
+    
+    python benchmarks/fake_servers.py --latency 0.005 --error-rate 0.01
+"""
+
+import argparse
+import gzip
+import json
+import random
+import signal
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DESCRIPTIONS = ['clear sky', 'few clouds', 'scattered clouds', 'light rain', 'mist', 'snow']
+
+def fake_city_id(city: str) -> int:
+    """Deterministic OpenWeatherMap-style city ID for a city name."""
+    return zlib.crc32(city.encode('utf-8')) % 10_000_000
+
+def fake_weather(city: str) -> Tuple[float, str]:
+    """Deterministic temperature (Celsius) and description for a city."""
+    seed = zlib.crc32(city.encode('utf-8'))
+    return round((seed % 500) / 10 - 15, 1), DESCRIPTIONS[seed % len(DESCRIPTIONS)]
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive, like the real services
+    protocol_version = 'HTTP/1.1'
+    # Buffer each response into one write (flushed per request) so headers and
+    # body do not go out as separate segments and stall on delayed ACKs
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    service: 'FakeService'
+    
+    def do_GET(self) -> None:
+        self.service.handle(self, 'GET')
+        
+    def do_POST(self) -> None:
+        self.service.handle(self, 'POST')
+        
+    def send_body(self, status: int, body: bytes, content_type: str = 'application/json') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def send_json(self, status: int, data: Any) -> None:
+        self.send_body(status, json.dumps(data).encode('utf-8'))
+        
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+class FakeService:
+    """
+    Base class: a threaded HTTP server with injected latency and errors.
+    
+    Args:
+        latency: Seconds to wait before answering each request
+        error_rate: Fraction of requests answered with error_status (0.0 - 1.0)
+        error_status: HTTP status used for injected errors
+        seed: Random seed for error injection
+    """
+    
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 seed: Optional[int] = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.server: Optional[ThreadingHTTPServer] = None
+        
+    @property
+    def host(self) -> str:
+        return self.server.server_address[0]
+    
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+    
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+    
+    def start(self) -> 'FakeService':
+        """Start serving on a free local port from a daemon thread."""
+        handler = type(f'{type(self).__name__}Handler', (_FakeHandler,), {'service': self})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name=type(self).__name__, daemon=True).start()
+        return self
+    
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            
+    def __enter__(self) -> 'FakeService':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+        
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'requests': self.requests, 'errors': self.errors}
+        
+    def handle(self, request: _FakeHandler, method: str) -> None:
+        if urlsplit(request.path).path.endswith('/_stats'):
+            request.send_json(200, self.stats())
+            return
+        
+        if self.latency:
+            time.sleep(self.latency)
+        
+        with self.lock:
+            self.requests += 1
+            failed = self.error_rate and self.random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        
+        if method == 'POST':
+            # Always consume the body so the connection can be reused
+            body = request.rfile.read(int(request.headers.get('Content-Length', 0)))
+        
+        if failed:
+            request.send_json(self.error_status, {'error': 'injected failure'})
+            return
+        
+        url = urlsplit(request.path)
+        if method == 'POST':
+            self.respond_post(request, url.path, body)
+        else:
+            self.respond_get(request, url.path, {key: values[0] for key, values in parse_qs(url.query).items()})
+            
+    def respond_get(self, request: _FakeHandler, path: str, params: Dict[str, str]) -> None:
+        request.send_json(404, {'error': 'not found'})
+        
+    def respond_post(self, request: _FakeHandler, path: str, body: bytes) -> None:
+        request.send_json(404, {'error': 'not found'})
+
+class FakeOpenWeatherMap(FakeService):
+    """
+    Serves GET /data/2.5/weather?q=<city> and GET /data/2.5/group?id=<id,...>.
+    
+    Group requests only know the IDs of cities queried by name before, as
+    with the real API the shipper learns IDs from per-city responses.
+    """
+    
+    GROUP_MAX_IDS = 20
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cities_by_id: Dict[int, str] = {}
+    
+    @property
+    def base_url(self) -> str:
+        return super().base_url + '/data/2.5'
+    
+    def city_weather(self, city: str) -> Dict[str, Any]:
+        temperature, description = fake_weather(city)
+        return {
+            'id': fake_city_id(city),
+            'name': city,
+            'main': {'temp': temperature},
+            'weather': [{'description': description}]
+        }
+        
+    def respond_get(self, request: _FakeHandler, path: str, params: Dict[str, str]) -> None:
+        if path == '/data/2.5/weather' and 'q' in params:
+            with self.lock:
+                self.cities_by_id[fake_city_id(params['q'])] = params['q']
+            request.send_json(200, self.city_weather(params['q']))
+        elif path == '/data/2.5/group' and 'id' in params:
+            ids = [int(city_id) for city_id in params['id'].split(',')]
+            if len(ids) > self.GROUP_MAX_IDS:
+                request.send_json(400, {'cod': '400', 'message': 'too many ids'})
+                return
+            with self.lock:
+                cities = [self.cities_by_id[city_id] for city_id in ids if city_id in self.cities_by_id]
+            weather = [self.city_weather(city) for city in cities]
+            request.send_json(200, {'cnt': len(weather), 'list': weather})
+        else:
+            request.send_json(404, {'cod': '404', 'message': 'city not found'})
+
+class FakeWeatherAPI(FakeService):
+    """
+    Serves GET /v1/current.json?q=<city> and bulk POST /v1/current.json?q=bulk.
+    
+    Bulk items for cities in unknown_cities carry a per-item error, as the
+    real API does for names it cannot match.
+    """
+    
+    BULK_MAX_LOCATIONS = 50
+    
+    def __init__(self, *args, unknown_cities: Iterable[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.unknown_cities = set(unknown_cities)
+    
+    @property
+    def base_url(self) -> str:
+        return super().base_url + '/v1'
+    
+    def city_weather(self, city: str) -> Dict[str, Any]:
+        temperature, description = fake_weather(city)
+        return {
+            'location': {'name': city},
+            'current': {'temp_c': temperature, 'condition': {'text': description.capitalize()}}
+        }
+        
+    def respond_get(self, request: _FakeHandler, path: str, params: Dict[str, str]) -> None:
+        if path != '/v1/current.json' or 'q' not in params or params['q'] in self.unknown_cities:
+            request.send_json(400, {'error': {'code': 1006, 'message': 'No matching location found.'}})
+            return
+        
+        request.send_json(200, self.city_weather(params['q']))
+        
+    def respond_post(self, request: _FakeHandler, path: str, body: bytes) -> None:
+        if path != '/v1/current.json' or 'q=bulk' not in urlsplit(request.path).query:
+            request.send_json(404, {'error': {'code': 1005, 'message': 'API request url is invalid.'}})
+            return
+        
+        locations = json.loads(body)['locations']
+        if len(locations) > self.BULK_MAX_LOCATIONS:
+            request.send_json(400, {'error': {'code': 9000, 'message': 'Too many locations.'}})
+            return
+        
+        bulk = []
+        for location in locations:
+            query = {'custom_id': location.get('custom_id'), 'q': location['q']}
+            if location['q'] in self.unknown_cities:
+                query['error'] = {'code': 1006, 'message': 'No matching location found.'}
+            else:
+                query.update(self.city_weather(location['q']))
+            bulk.append({'query': query})
+        request.send_json(200, {'bulk': bulk})
+
+class FakeLogzListener(FakeService):
+    """Accepts NDJSON POSTs (optionally gzipped) and counts the records received."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = 0
+        self.payload_bytes = 0
+        
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self.lock:
+            stats.update(records=self.records, payload_bytes=self.payload_bytes)
+        return stats
+    
+    def respond_post(self, request: _FakeHandler, path: str, body: bytes) -> None:
+        if request.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        
+        records = body.count(b'\n') + 1 if body else 0
+        with self.lock:
+            self.records += records
+            self.payload_bytes += len(body)
+        request.send_body(200, b'', 'text/plain')
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fake weather APIs and a fake Logz.io listener')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait before each response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail with 503')
+    args = parser.parse_args()
+    
+    options = {'latency': args.latency, 'error_rate': args.error_rate}
+    services = {
+        'openweathermap': FakeOpenWeatherMap(**options).start(),
+        'weatherapi': FakeWeatherAPI(**options).start(),
+        'logz_io': FakeLogzListener(**options).start()
+    }
+    print(json.dumps({name: service.base_url for name, service in services.items()}), flush=True)
+    
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    for service in services.values():
+        service.stop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
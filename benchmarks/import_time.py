@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of the pipeline modules in fresh interpreters.
+
+Each measurement starts a new Python process, imports the module and
+reports the wall time of the import (median of several runs) and whether
+heavy dependencies (requests, asyncio) were loaded as a side effect.
+Also times a csv-only fetch from a cold start, which is what a
+CSV-only deployment pays before its first cycle.
+
+Usage:
+    python benchmarks/import_time.py [runs]
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PROBE = '''
+import sys, time, json
+started = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "requests": "requests" in sys.modules, "asyncio": "asyncio" in sys.modules}}))
+'''
+
+CASES = [
+    ('import src.data_sources', 'import src.data_sources'),
+    ('csv-only fetch (cold)',
+     'from src.data_sources import fetch_all_sources_data\n'
+     'fetch_all_sources_data({"data_sources": [{"type": "csv", "file_path": "weather_data.csv"}]})'),
+    ('import main', 'import main')
+]
+
+def measure(code, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE.format(code=code)], cwd=ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return statistics.median(sample['ms'] for sample in samples), samples[-1]
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    print(f"Median of {runs} fresh interpreters")
+    for name, code in CASES:
+        ms, sample = measure(code, runs)
+        loaded = [module for module in ('requests', 'asyncio') if sample[module]] or ['-']
+        print(f"{name:>24}: {ms:7.1f}ms  (loaded: {', '.join(loaded)})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark: fetch -> transform -> ship against local fake servers.
+
+Runs polling cycles of the real pipeline (WeatherDataShipper.polling_cycle)
+against stand-ins for OpenWeatherMap, WeatherAPI and the Logz.io listener
+(fake_servers.py, run in a separate process), for every combination of
+city count and batch size. Each scenario runs in its own process so peak
+RSS is per scenario.
+
+Reported per scenario: cycle latency (median and p95), records per second,
+peak RSS, and the peak of Python allocations during one traced cycle.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py
+    python benchmarks/pipeline_benchmark.py --cities 10,100 --batch-sizes 50 --latency 0.02 --error-rate 0.05
+    python benchmarks/pipeline_benchmark.py --save-baseline   # write benchmarks/baselines/pipeline.json
+    python benchmarks/pipeline_benchmark.py --compare         # exit 1 if a metric regressed past --tolerance
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(BENCHMARK_DIR, '..')
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baselines', 'pipeline.json')
+
+# Metrics checked by --compare (p95 is reported but too noisy over a few cycles to gate on),
+# mapped to True if higher is better
+METRICS = {
+    'cycle_p50_ms': False,
+    'records_per_s': True,
+    'peak_rss_mib': False,
+    'alloc_peak_kib': False
+}
+
+def build_config(cities, batch_size, urls, max_concurrency, bulk=False, work_dir='.'):
+    logz = urlsplit(urls['logz_io'])
+    return {
+        'polling_interval': 60,
+        'data_sources': [
+            {'type': 'openweathermap', 'enabled': True, 'api_key': 'bench', 'cities': cities,
+             'base_url': urls['openweathermap'], 'max_concurrency': max_concurrency,
+             'bulk': bulk, 'city_id_file': os.path.join(work_dir, 'owm_city_ids.json')},
+            {'type': 'weatherapi', 'enabled': True, 'api_key': 'bench', 'cities': cities,
+             'base_url': urls['weatherapi'], 'max_concurrency': max_concurrency, 'bulk': bulk}
+        ],
+        'logz_io': {'scheme': 'http', 'host': logz.hostname, 'port': logz.port, 'token': 'bench'},
+        # No backoff sleeps, so injected errors cost their round trips rather than fixed delays
+        'network': {'retry_attempts': 3, 'retry_delay_base': 0},
+        'http': {'max_retries': 1, 'backoff_factor': 0},
+        'data_processing': {'batch_size': batch_size}
+    }
+
+def start_fake_servers(latency, error_rate):
+    """Start fake_servers.py in its own process so it does not share the pipeline's GIL."""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARK_DIR, 'fake_servers.py'),
+         '--latency', str(latency), '--error-rate', str(error_rate)],
+        stdout=subprocess.PIPE, text=True
+    )
+    return process, json.loads(process.stdout.readline())
+
+def shipped_records(session, urls):
+    return session.get(urls['logz_io'] + '/_stats').json()['records']
+
+def source_requests(session, urls):
+    """Requests the weather API fakes have answered so far."""
+    return sum(session.get(urls[name] + '/_stats').json()['requests'] for name in ('openweathermap', 'weatherapi'))
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_scenario(args):
+    """Run one scenario in this process and return its results."""
+    from main import WeatherDataShipper
+    from src.http_session import create_http_session
+    from src.logging_setup import configure_logging, shutdown_logging
+    
+    configure_logging({'level': 'ERROR'})
+    cities = [f"City{i:04d}" for i in range(args.scenario_cities)]
+    fake_servers, urls = start_fake_servers(args.latency, args.error_rate)
+    work_dir = tempfile.mkdtemp(prefix='pipeline-benchmark-')
+    
+    try:
+        shipper = WeatherDataShipper()
+        shipper.config = build_config(cities, args.scenario_batch_size, urls, args.max_concurrency,
+                                      args.bulk, work_dir)
+        shipper.http_session = create_http_session(shipper.config)
+        
+        # Warm up connections and imports (and resolve city IDs in bulk mode)
+        shipper.polling_cycle()
+        
+        requests_before = source_requests(shipper.http_session, urls)
+        shipped_before = shipped_records(shipper.http_session, urls)
+        durations = []
+        for _ in range(args.cycles):
+            started = time.perf_counter()
+            shipper.polling_cycle()
+            durations.append(time.perf_counter() - started)
+        shipped = shipped_records(shipper.http_session, urls) - shipped_before
+        requests_sent = source_requests(shipper.http_session, urls) - requests_before
+        
+        tracemalloc.start()
+        shipper.polling_cycle()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        shipper.http_session.close()
+    finally:
+        fake_servers.terminate()
+        fake_servers.wait()
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    shutdown_logging()
+    durations.sort()
+    return {
+        'cycle_p50_ms': round(statistics.median(durations) * 1000, 2),
+        'cycle_p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))] * 1000, 2),
+        'records_per_s': round(shipped / sum(durations), 1),
+        'peak_rss_mib': round(peak_rss_mib(), 1),
+        'alloc_peak_kib': round(alloc_peak / 1024, 1),
+        'records_per_cycle': shipped // args.cycles,
+        'api_requests_per_cycle': requests_sent // args.cycles
+    }
+
+def run_all(args):
+    """Run every scenario in a child process and collect the results."""
+    results = {}
+    for cities in args.cities:
+        for batch_size in args.batch_sizes:
+            command = [
+                sys.executable, os.path.abspath(__file__),
+                '--scenario-cities', str(cities), '--scenario-batch-size', str(batch_size),
+                '--cycles', str(args.cycles), '--latency', str(args.latency),
+                '--error-rate', str(args.error_rate), '--max-concurrency', str(args.max_concurrency)
+            ] + (['--bulk'] if args.bulk else [])
+            process = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+            if process.returncode != 0:
+                sys.stderr.write(process.stderr)
+                raise SystemExit(f"Scenario cities={cities}, batch={batch_size} failed")
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+            results[f"cities={cities},batch={batch_size}"] = result
+            print(f"{f'cities={cities}, batch={batch_size}':>24}: "
+                  f"p50 {result['cycle_p50_ms']:8.1f}ms  p95 {result['cycle_p95_ms']:8.1f}ms  "
+                  f"{result['records_per_s']:10,.0f} records/s  RSS {result['peak_rss_mib']:6.1f}MiB  "
+                  f"alloc peak {result['alloc_peak_kib']:8.1f}KiB  "
+                  f"{result['api_requests_per_cycle']} API requests/cycle", flush=True)
+    return results
+
+def compare(results, baseline, tolerance):
+    """Return a description of every metric that regressed by more than tolerance."""
+    regressions = []
+    for scenario, result in results.items():
+        expected = baseline.get(scenario)
+        if expected is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = expected.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{scenario} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    int_list = lambda value: [int(item) for item in value.split(',')]
+    parser.add_argument('--cities', type=int_list, default=[10, 50, 200], help='Comma-separated city counts')
+    parser.add_argument('--batch-sizes', type=int_list, default=[100, 1000], help='Comma-separated batch sizes')
+    parser.add_argument('--cycles', type=int, default=10, help='Timed cycles per scenario')
+    parser.add_argument('--latency', type=float, default=0.005, help='Fake server latency per request, seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake requests that fail')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Concurrent city requests per source')
+    parser.add_argument('--bulk', action='store_true', help='Use the multi-city bulk endpoints')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE, help='Write results as the baseline')
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, help='Compare results with a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative regression (0.25 = 25%%)')
+    parser.add_argument('--scenario-cities', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--scenario-batch-size', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    
+    if args.scenario_cities is not None:
+        print(json.dumps(run_scenario(args)))
+        return 0
+    
+    print(f"Latency {args.latency * 1000:.0f}ms, error rate {args.error_rate:.0%}, "
+          f"{args.cycles} cycles per scenario, concurrency {args.max_concurrency}")
+    results = run_all(args)
+    
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'settings': {'latency': args.latency, 'error_rate': args.error_rate, 'cycles': args.cycles,
+                                    'max_concurrency': args.max_concurrency, 'bulk': args.bulk},
+                       'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.save_baseline}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"Regressions beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.compare}")
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: unified records as dicts vs WeatherRecord vs RecordBatch.
+
+Builds the same records the way transform_single_record used to (dicts),
+as WeatherRecord objects, and as one columnar RecordBatch, and reports the
+bytes per record still allocated once the raw rows are released, measured
+with tracemalloc.
+
+Usage:
+    python benchmarks/record_memory.py [record_count]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.transformers.weather_transformer import transform_weather_batch
+from src.transformers.weather_record import WeatherRecord
+
+CITIES = ['Berlin', 'London', 'Tokyo', 'Sydney', 'Paris', 'New York']
+DESCRIPTIONS = ['clear sky', 'light rain', 'scattered clouds', 'Sunny']
+
+def raw_rows(count):
+    # Strings are built per row, as they are when parsed from API responses or CSV files
+    return [
+        {
+            'city': CITIES[i % len(CITIES)].encode().decode(),
+            'temperature': f"{(i % 400) / 10:.1f}",
+            'description': DESCRIPTIONS[i % len(DESCRIPTIONS)].encode().decode(),
+            'source_provider': 'csv'.encode().decode()
+        }
+        for i in range(count)
+    ]
+
+def as_dicts(rows):
+    return [
+        {
+            "city": str(row['city']).strip(),
+            "temperature_celsius": float(row['temperature']),
+            "description": str(row['description']).strip(),
+            "source_provider": str(row['source_provider']).strip()
+        }
+        for row in rows
+    ]
+
+def as_records(rows):
+    return [
+        WeatherRecord(str(row['city']).strip(), float(row['temperature']),
+                      str(row['description']).strip(), str(row['source_provider']).strip())
+        for row in rows
+    ]
+
+def as_batch(rows):
+    return transform_weather_batch(rows)[0]
+
+def measure(build, count):
+    # Count what stays alive once the raw rows are released, as after a transform
+    tracemalloc.start()
+    rows = raw_rows(count)
+    result = build(rows)
+    del rows
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"Records: {count}")
+    baseline = None
+    for name, build in (('dict', as_dicts), ('WeatherRecord', as_records), ('RecordBatch', as_batch)):
+        allocated = measure(build, count)
+        baseline = baseline or allocated
+        print(f"{name:>14}: {allocated / count:7.1f} bytes/record ({allocated / baseline:.0%} of dict)")
+
+if __name__ == '__main__':
+    main()
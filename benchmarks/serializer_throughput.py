@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: NDJSON payload serialization throughput per backend.
+
+Compares the original per-record json.dumps + join path with each
+NdjsonSerializer backend available here, reporting records per second
+(best of several runs).
+
+Usage:
+    python benchmarks/serializer_throughput.py [record_count] [repeat]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.shipper.serializer import NdjsonSerializer, available_backends
+from src.transformers.weather_record import WeatherRecord
+
+CITIES = ['Berlin', 'London', 'Tokyo', 'Sydney', 'Paris', 'New York']
+
+def make_records(count):
+    return [
+        WeatherRecord(CITIES[i % len(CITIES)], (i % 400) / 10 - 5, 'scattered clouds', 'openweathermap')
+        for i in range(count)
+    ]
+
+def json_dumps_join(records):
+    # The payload builder before the serializer layer: generic dumps of each record dict
+    return '\n'.join(json.dumps(record.to_dict()) for record in records).encode('utf-8')
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    records = make_records(count)
+    
+    candidates = [('json.dumps + join', json_dumps_join)]
+    for backend in available_backends():
+        candidates.append((backend, NdjsonSerializer(backend).serialize))
+    
+    print(f"Records: {count}, best of {repeat}")
+    baseline = None
+    for name, serialize in candidates:
+        seconds = min(timeit.repeat(lambda: serialize(records), number=1, repeat=repeat))
+        rate = count / seconds
+        baseline = baseline or rate
+        print(f"{name:>18}: {rate:12,.0f} records/s ({rate / baseline:.1f}x)")
+
+if __name__ == '__main__':
+    main()
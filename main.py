@@ -6,135 +6,528 @@ A command-line application that continuously polls weather data from multiple so
 transforms it to a unified format, and ships it to Logz.io.
 """
 
+import argparse
+import asyncio
+import functools
+import logging
+import threading
 import time
 import signal
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 
 from src.config_loader import load_config
-from src.data_sources import fetch_all_sources_data
-from src.transformers.weather_transformer import transform_weather_data
-from src.shipper.logz_io_client import ship_with_retry
+from src.logging_setup import configure_logging, shutdown_logging
+from src.data_sources import (fetch_all_sources_data, fetch_all_sources_data_async,
+                              get_bulk_sources, iter_csv_chunks, commit_csv_chunk,
+                              register_configured_sources)
+from src.transformers.weather_transformer import transform_weather_records, transform_weather_batch
+from src.transformers.weather_record import record_to_json
+from src.shipper.logz_io_client import ship_batches_with_retry
+from src.shipper.background import ShippingWorker
+from src.shipper.spool import Spool
+from src.shipper.recovery import RecoveryReplayer
+from src.http_session import create_http_session
+from src.data_sources.cache import create_response_cache
+from src.resilience import configure_resilience
+from src.scheduler import DeadlineScheduler, Tick
+from src.sharding import ShardSupervisor, shard_config
+from src.metrics import (start_metrics_server, CYCLE_SECONDS, TRANSFORM_SECONDS, TRANSFORM_REJECTED,
+                         QUEUE_DEPTH, SPOOL_PENDING_BYTES)
+
+logger = logging.getLogger('weather_shipper')
 
 class WeatherDataShipper:
     """Main weather data shipper application."""
     
-    def __init__(self):
+    def __init__(self, async_mode: Optional[bool] = None, config: Optional[Dict[str, Any]] = None):
         self.running = True
-        self.config = None
+        self.async_mode = async_mode
+        self._stop_event = None
+        self.shutdown_event = threading.Event()
+        # A shard worker is handed its configuration instead of loading it
+        self.config = config
+        self.http_session = None
+        self.response_cache = None
+        self.shipping_worker = None
+        self.spool = None
+        self.spool_drain_lock = threading.Lock()
+        self.recovery_replayer = None
         self.pending_data = []
+        self.recovery_file_lock = threading.Lock()
+        self.metrics_server = None
+        self.cycles = 0
+        self.last_cycle_finished = None
+        self.last_cycle_success = None
+        self.consecutive_failures = 0
+        self.started_at = None
         
     def load_configuration(self):
         """Load application configuration."""
         try:
-            self.config = load_config()
-            print("✅ Configuration loaded successfully")
+            if self.config is None:
+                self.config = load_config()
+            configure_logging(self.config.get('logging', {}))
+            logger.info("✅ Configuration loaded successfully")
             
             polling_interval = self.config.get('polling_interval', 60)
             data_sources_count = len(self.config.get('data_sources', []))
             
-            print(f"⏰ Polling interval: {polling_interval} seconds")
-            print(f"📊 Data sources configured: {data_sources_count}")
+            logger.info(f"⏰ Polling interval: {polling_interval} seconds")
+            logger.info(f"📊 Data sources configured: {data_sources_count}")
+            
+            # Custom source types from the 'source_plugins' section; modules load on first use
+            register_configured_sources(self.config)
+            
+            # Circuit breakers open after data_processing.max_consecutive_failures failures in a row
+            configure_resilience(self.config)
+            
+            # One pooled session for the whole run, shared by sources and shipper
+            self.http_session = create_http_session(self.config)
+            self.response_cache = create_response_cache(self.config)
+            
+            spool_config = self.config.get('spool', {})
+            if spool_config.get('enabled', False):
+                self.spool = Spool(
+                    spool_config.get('directory', './spool'),
+                    segment_max_bytes=spool_config.get('segment_max_bytes', 8 * 1024 * 1024),
+                    max_total_bytes=spool_config.get('max_total_bytes', 512 * 1024 * 1024)
+                )
+                spooled_bytes = self.spool.pending_bytes()
+                logger.info(f"💽 Spool enabled at {self.spool.directory}")
+                if spooled_bytes:
+                    logger.info(f"♻️  Spool holds {spooled_bytes} bytes from a previous run, "
+                          "replaying them once shipping succeeds")
+            
+            shipping_config = self.config.get('shipping', {})
+            if shipping_config.get('background', False):
+                self.shipping_worker = ShippingWorker(
+                    ship=self.ship_records,
+                    spill=self.spill_records,
+                    queue_size=shipping_config.get('queue_size', 10),
+                    full_policy=shipping_config.get('queue_full_policy', 'drop_oldest')
+                )
+                logger.info(f"📬 Background shipping enabled (queue of {shipping_config.get('queue_size', 10)} batches, "
+                      f"policy: {self.shipping_worker.full_policy})")
+                QUEUE_DEPTH.set_function(self.shipping_worker.queue_depth)
+            
+            if self.spool:
+                SPOOL_PENDING_BYTES.set_function(self.spool.pending_bytes)
+            
+            metrics_config = self.config.get('metrics', {})
+            if metrics_config.get('enabled', False):
+                self.metrics_server = start_metrics_server(
+                    metrics_config.get('host', '127.0.0.1'),
+                    metrics_config.get('port', 9108),
+                    health=self.health
+                )
+                host, port = self.metrics_server.server_address[:2]
+                logger.info(f"📈 Metrics available at http://{host}:{port}/metrics, health at /health")
             
         except Exception as e:
-            print(f"❌ Failed to load configuration: {e}")
+            logger.error("❌ Failed to load configuration: %s", e)
             sys.exit(1)
     
     def setup_signal_handlers(self):
         """Set up signal handlers for graceful shutdown."""
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
-        print("🛡️  Signal handlers set up (Ctrl+C for graceful shutdown)")
+        logger.info("🛡️  Signal handlers set up (Ctrl+C for graceful shutdown)")
     
+    def setup_async_signal_handlers(self, loop: asyncio.AbstractEventLoop):
+        """Route SIGINT/SIGTERM through the event loop so waits end immediately."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.async_signal_handler, signum)
+            except (NotImplementedError, RuntimeError):
+                # Not supported on this platform; the plain handlers stay in place
+                pass
+            
+    def restore_signal_handlers(self, loop: asyncio.AbstractEventLoop):
+        """Hand SIGINT/SIGTERM back to the plain handlers for the shutdown phase."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.remove_signal_handler(signum)
+            except (NotImplementedError, RuntimeError):
+                pass
+            signal.signal(signum, self.signal_handler)
+            
+    def async_signal_handler(self, signum):
+        """Handle shutdown signals delivered through the event loop."""
+        self.signal_handler(signum, None)
+        self._stop_event.set()
+        
     def signal_handler(self, signum, frame):
         """Handle shutdown signals gracefully."""
-        print(f"\n🛑 Received signal {signum}, initiating graceful shutdown...")
+        logger.info(f"🛑 Received signal {signum}, initiating graceful shutdown...")
         self.running = False
+        self.shutdown_event.set()
     
     def polling_cycle(self):
         """Execute one complete polling cycle: fetch -> transform -> ship."""
+        started = time.perf_counter()
+        success = False
         try:
-            print(f"\n🔄 Starting polling cycle at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+            logger.info(f"🔄 Starting polling cycle at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            # Catch up on spooled records even if this cycle has nothing to ship
+            self.drain_pending_spool()
             
             # Step 1: Fetch raw data from all sources
-            raw_data = fetch_all_sources_data(self.config)
+            raw_data = fetch_all_sources_data(self.config, session=self.http_session, cache=self.response_cache)
+            self.report_cache_stats()
             
-            if not raw_data:
-                print("ℹ️  No data fetched this cycle")
-                return True
+            checkpoints = getattr(raw_data, 'checkpoints', [])
             
             # Step 2: Transform to unified format
-            transformed_data = transform_weather_data(raw_data)
-            
-            if not transformed_data:
-                print("⚠️  No valid data after transformation")
-                return True
-            
-            print(f"📋 Transformed {len(transformed_data)} records")
+            transformed_data = self.transform_cycle_data(raw_data)
             
             # Step 3: Ship to Logz.io
-            success = ship_with_retry(transformed_data, self.config)
-            
-            if success:
-                print("✅ Polling cycle completed successfully")
-                return True
+            if transformed_data:
+                success = self.ship_cycle_data(transformed_data, checkpoints)
             else:
-                # Store failed data for retry on shutdown
-                self.pending_data.extend(transformed_data)
-                print("⚠️  Shipping failed, data stored for retry")
-                return False
+                success = True
+                self.commit_checkpoints(checkpoints, True)
+            
+            # Bulk sources stream through transform and ship chunk by chunk
+            self.stream_bulk_sources()
+            
+            return success
                 
         except Exception as e:
-            print(f"❌ Error in polling cycle: {e}")
+            logger.error("❌ Error in polling cycle: %s", e)
+            return False
+        finally:
+            CYCLE_SECONDS.observe(time.perf_counter() - started)
+            self.record_cycle(success)
+            
+    def record_cycle(self, success: bool):
+        """Note a finished cycle for the health endpoint."""
+        self.cycles += 1
+        self.last_cycle_finished = time.monotonic()
+        self.last_cycle_success = success
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+        
+    def health(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Health for the /health endpoint.
+        
+        Unhealthy once no cycle has finished for three polling intervals
+        (counting from startup until the first cycle finishes), or once
+        data_processing.max_consecutive_failures cycles in a row failed.
+        
+        Returns:
+            (healthy, details) tuple
+        """
+        polling_interval = self.config.get('polling_interval', 60)
+        max_failures = self.config.get('data_processing', {}).get('max_consecutive_failures', 5)
+        since = self.last_cycle_finished if self.last_cycle_finished is not None else self.started_at
+        age = time.monotonic() - since if since is not None else 0.0
+        stalled = age > 3 * polling_interval
+        failing = self.consecutive_failures >= max_failures
+        healthy = self.running and not stalled and not failing
+        
+        return healthy, {
+            'status': 'ok' if healthy else 'stalled' if stalled or not self.running else 'failing',
+            'cycles': self.cycles,
+            'seconds_since_last_cycle': round(age, 1),
+            'last_cycle_success': self.last_cycle_success,
+            'consecutive_failures': self.consecutive_failures,
+            'shipping_queue_depth': self.shipping_worker.queue_depth() if self.shipping_worker else 0
+        }
+        
+    def transform_cycle_data(self, raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transform one cycle's raw data; returns an empty list if nothing is left to ship."""
+        if not raw_data:
+            logger.info("ℹ️  No data fetched this cycle")
+            return []
+        
+        with TRANSFORM_SECONDS.time():
+            transformed_data = transform_weather_records(raw_data)
+        TRANSFORM_REJECTED.inc(len(raw_data) - len(transformed_data))
+        
+        if not transformed_data:
+            logger.warning("⚠️  No valid data after transformation")
+            return []
+        
+        logger.info(f"📋 Transformed {len(transformed_data)} records")
+        return transformed_data
+    
+    def transform_chunk(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transform one bulk chunk column by column, with one summary warning for rejected rows."""
+        with TRANSFORM_SECONDS.time():
+            batch, rejected = transform_weather_batch(rows)
+        TRANSFORM_REJECTED.inc(len(rejected))
+        return batch.to_records()
+    
+    def stream_bulk_sources(self):
+        """
+        Stream bulk CSV sources through transform and ship one chunk at a time.
+        
+        At most 'max_chunks_per_cycle' chunks are read per source and cycle,
+        so a large back-fill is spread over many cycles instead of holding up
+        live sources and the scheduler. Chunks are shipped on this thread,
+        bypassing the background queue (whose drop_oldest policy could discard
+        them), and each chunk's offset is checkpointed only once it has been
+        shipped or spooled. Only one chunk of rows is in memory at a time and
+        an interrupted back-fill resumes after the last checkpointed chunk.
+        """
+        for source_config in get_bulk_sources(self.config):
+            file_path = source_config.get('file_path')
+            max_chunks = source_config.get('max_chunks_per_cycle', 20)
+            rows = 0
+            started = time.monotonic()
+            
+            try:
+                for count, chunk in enumerate(iter_csv_chunks(source_config), 1):
+                    transformed_data = self.transform_chunk(chunk.rows)
+                    if transformed_data and not self.ship_chunk(transformed_data):
+                        # Not checkpointed: the chunk is read again next cycle
+                        break
+                    commit_csv_chunk(source_config, chunk)
+                    rows += len(chunk.rows)
+                    
+                    if not self.running or count >= max_chunks:
+                        break
+            except Exception as e:
+                logger.error("❌ Failed to stream from %s: %s", file_path, e)
+            
+            if rows:
+                elapsed = max(time.monotonic() - started, 1e-6)
+                logger.info(f"📈 Streamed {rows} rows from {file_path} in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+                
+    def ship_chunk(self, transformed_data: List[Dict[str, Any]]) -> bool:
+        """Ship one bulk chunk now; True once every record is shipped or spooled, so it may be checkpointed."""
+        unshipped = ship_batches_with_retry(transformed_data, self.config, session=self.http_session)
+        if not unshipped:
+            return True
+        
+        if self.spool:
+            self.spool.append(unshipped)
+            return True
+        
+        logger.warning("⚠️  Shipping failed for %d bulk records, re-reading their chunk next cycle", len(unshipped))
+        return False
+    
+    def ship_cycle_data(self, transformed_data: List[Dict[str, Any]],
+                        checkpoints: List[Callable[[], None]] = ()) -> bool:
+        """
+        Ship one cycle's transformed data, or hand it to the background shipper if enabled.
+        
+        Args:
+            transformed_data: The cycle's records
+            checkpoints: Source read positions to save once the records are shipped or spooled
+        
+        Returns:
+            Whether the records were shipped (always True when queued for the background shipper)
+        """
+        if self.shipping_worker:
+            on_handed_off = functools.partial(self.commit_checkpoints, checkpoints) if checkpoints else None
+            self.shipping_worker.submit(transformed_data, on_handed_off)
+            logger.info(f"📬 Queued {len(transformed_data)} records for shipping "
+                  f"(queue depth: {self.shipping_worker.queue_depth()})")
+            return True
+        
+        success = self.ship_records(transformed_data)
+        self.commit_checkpoints(checkpoints, success)
+        return success
+    
+    def commit_checkpoints(self, checkpoints: List[Callable[[], None]], shipped: bool):
+        """
+        Save source read positions once their records are safe.
+        
+        Records are safe once shipped, or once the unshipped ones are in the
+        durable spool. Records only kept in memory are not, so their
+        positions are left unsaved and a restart reads them again.
+        """
+        if not checkpoints:
+            return
+        
+        if not shipped and not self.spool:
+            logger.warning("⚠️  Not saving source read positions; unshipped rows will be re-read after a restart")
+            return
+        
+        for checkpoint in checkpoints:
+            try:
+                checkpoint()
+            except Exception as e:
+                logger.error("❌ Failed to save a source read position: %s", e)
+    
+    def ship_records(self, transformed_data: List[Dict[str, Any]]) -> bool:
+        """Ship records to Logz.io, keeping any that fail for retry on shutdown."""
+        unshipped = ship_batches_with_retry(transformed_data, self.config, session=self.http_session)
+        
+        self.report_connection_stats()
+        
+        if not unshipped:
+            logger.info("✅ Polling cycle completed successfully")
+            # The listener is reachable again: catch up on spooled records
+            if self.spool:
+                self.drain_spool()
+            return True
+        else:
+            # Store only the failed batches' records for retry
+            self.store_unshipped(unshipped)
+            logger.warning("⚠️  Shipping failed for %d records, data stored for retry", len(unshipped))
             return False
+        
+    def store_unshipped(self, records: List[Dict[str, Any]]):
+        """Keep records that could not be shipped: in the durable spool, or in memory."""
+        if self.spool:
+            self.spool.append(records)
+        else:
+            self.pending_data.extend(records)
+            
+    def spill_records(self, records: List[Dict[str, Any]]):
+        """Persist records the shipping queue has no room for."""
+        if self.spool:
+            self.spool.append(records)
+        else:
+            self.append_to_recovery_file(records)
+            
+    def drain_pending_spool(self):
+        """Drain the spool at the start of a cycle if it holds records."""
+        if self.spool and self.spool.pending_bytes():
+            self.drain_spool()
+            
+    def drain_spool(self):
+        """
+        Re-ship spooled records oldest first, acknowledging each batch as it lands.
+        
+        Runs at the start of each cycle while the spool holds records, and
+        after each successful shipment. At most one drain runs at a time.
+        """
+        if not self.spool_drain_lock.acquire(blocking=False):
+            return
+        
+        try:
+            spool_config = self.config.get('spool', {})
+            batch_size = self.config.get('data_processing', {}).get('batch_size', 100)
+            
+            for _ in range(spool_config.get('drain_batches_per_cycle', 10)):
+                records, position = self.spool.read(batch_size)
+                if not records:
+                    break
+                
+                if ship_batches_with_retry(records, self.config, session=self.http_session):
+                    logger.warning("⚠️  Spool replay failed, will retry next cycle")
+                    break
+                
+                self.spool.ack(position)
+                logger.info(f"♻️  Replayed {len(records)} spooled records "
+                      f"({self.spool.pending_bytes()} bytes still spooled)")
+        finally:
+            self.spool_drain_lock.release()
     
+    def start_recovery_replay(self):
+        """Replay records saved to the recovery file by an earlier run, in the background."""
+        replay_config = self.config.get('recovery_replay', {})
+        recovery_file = self.config.get('application', {}).get('recovery_file', './unsent_data.jsonl')
+        
+        if not replay_config.get('enabled', False) or not RecoveryReplayer.has_pending(recovery_file):
+            return
+        
+        self.recovery_replayer = RecoveryReplayer(
+            recovery_file,
+            ship=lambda records: ship_batches_with_retry(records, self.config, session=self.http_session),
+            batch_size=self.config.get('data_processing', {}).get('batch_size', 100),
+            records_per_second=replay_config.get('records_per_second'),
+            retry_delay=replay_config.get('retry_delay', 5),
+            file_lock=self.recovery_file_lock
+        )
+        self.recovery_replayer.start()
+        
     def graceful_shutdown(self):
         """Attempt to send any pending data before shutdown."""
-        print("\n🔄 Attempting graceful shutdown...")
+        logger.info("🔄 Attempting graceful shutdown...")
+        
+        shutdown_timeout = self.config.get('application', {}).get('shutdown_timeout', 30)
+        
+        if self.recovery_replayer:
+            # Replay progress is checkpointed, so the next start picks up from here
+            self.recovery_replayer.stop(timeout=shutdown_timeout)
+        
+        if self.shipping_worker:
+            # Let the background shipper drain its queue; whatever is left becomes pending
+            logger.info(f"📬 Draining shipping queue ({self.shipping_worker.queue_depth()} batches)...")
+            self.store_unshipped(self.shipping_worker.stop(timeout=shutdown_timeout))
         
         if self.pending_data:
-            print(f"📤 Attempting to send {len(self.pending_data)} pending records...")
-            
-            shutdown_timeout = self.config.get('application', {}).get('shutdown_timeout', 30)
+            logger.info(f"📤 Attempting to send {len(self.pending_data)} pending records...")
             
             # Try to send pending data with timeout
             try:
-                success = ship_with_retry(self.pending_data, self.config)
-                if success:
-                    print("✅ Pending data sent successfully")
+                self.pending_data = ship_batches_with_retry(self.pending_data, self.config, session=self.http_session)
+                if not self.pending_data:
+                    logger.info("✅ Pending data sent successfully")
                 else:
-                    print("⚠️  Could not send pending data")
+                    logger.warning("⚠️  Could not send pending data")
                     
                     # Save to file if configured
                     if self.config.get('application', {}).get('persist_on_shutdown', False):
                         self.save_pending_data()
                         
             except Exception as e:
-                print(f"❌ Error during graceful shutdown: {e}")
+                logger.error("❌ Error during graceful shutdown: %s", e)
                 if self.config.get('application', {}).get('persist_on_shutdown', False):
                     self.save_pending_data()
         
-        print("👋 Shutdown complete")
+        if self.spool:
+            spooled_bytes = self.spool.pending_bytes()
+            if spooled_bytes:
+                logger.info(f"💽 {spooled_bytes} bytes of unshipped records remain spooled for the next run")
+            self.spool.close()
+        
+        if self.response_cache:
+            self.response_cache.close()
+        
+        if self.http_session:
+            self.report_connection_stats()
+            self.http_session.close()
+        
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+        
+        logger.info("👋 Shutdown complete")
+        shutdown_logging()
+        
+    def report_connection_stats(self):
+        """Print how many HTTP connections were reused vs. newly opened."""
+        stats = self.http_session.connection_stats.snapshot()
+        logger.info(f"🔌 HTTP connections: {stats['reused']} reused, {stats['opened']} newly opened")
+        
+    def report_cache_stats(self):
+        """Print response cache hit/miss counts, if caching is enabled."""
+        if self.response_cache:
+            stats = self.response_cache.stats()
+            logger.info(f"🗃️  Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['revalidated']} revalidated")
     
     def save_pending_data(self):
         """Save pending data to recovery file."""
         try:
-            recovery_file = self.config.get('application', {}).get('recovery_file', './unsent_data.jsonl')
-            
-            import json
-            with open(recovery_file, 'w') as f:
-                for record in self.pending_data:
-                    f.write(json.dumps(record) + '\n')
-            
-            print(f"💾 Saved {len(self.pending_data)} records to {recovery_file}")
+            recovery_file = self.append_to_recovery_file(self.pending_data)
+            logger.info(f"💾 Saved {len(self.pending_data)} records to {recovery_file}")
             
         except Exception as e:
-            print(f"❌ Failed to save pending data: {e}")
+            logger.error("❌ Failed to save pending data: %s", e)
+            
+    def append_to_recovery_file(self, records: List[Dict[str, Any]]) -> str:
+        """Append records to the recovery file, which may already hold spilled records."""
+        recovery_file = self.config.get('application', {}).get('recovery_file', './unsent_data.jsonl')
+        
+        with self.recovery_file_lock:
+            with open(recovery_file, 'a') as f:
+                for record in records:
+                    f.write(record_to_json(record) + '\n')
+        
+        return recovery_file
     
     def run(self):
         """Main application loop."""
-        print("🚀 Starting Weather Data Shipper")
-        print("=" * 50)
+        logger.info("🚀 Starting Weather Data Shipper")
+        self.started_at = time.monotonic()
         
         # Load configuration
         self.load_configuration()
@@ -144,36 +537,189 @@ class WeatherDataShipper:
         
         polling_interval = self.config.get('polling_interval', 60)
         
-        print(f"\n▶️  Starting continuous polling (every {polling_interval}s)")
-        print("Press Ctrl+C to stop gracefully")
+        if self.async_mode is None:
+            self.async_mode = self.config.get('application', {}).get('async_mode', False)
+        
+        logger.info(f"▶️  Starting continuous polling (every {polling_interval}s)")
+        logger.info("Press Ctrl+C to stop gracefully")
+        
+        if self.shipping_worker:
+            self.shipping_worker.start()
+        
+        self.start_recovery_replay()
+        
+        if self.async_mode:
+            logger.info("⚡ Running in asyncio pipeline mode")
+            asyncio.run(self.run_async(polling_interval))
+        else:
+            self.run_sync(polling_interval)
+        
+        # Graceful shutdown
+        self.graceful_shutdown()
+        
+    def create_scheduler(self, polling_interval: int) -> DeadlineScheduler:
+        """Scheduler firing a cycle every polling_interval seconds on fixed deadlines."""
+        missed_tick_policy = self.config.get('application', {}).get('missed_tick_policy', 'coalesce')
+        return DeadlineScheduler(polling_interval, missed_tick_policy)
+    
+    def report_tick(self, tick: Tick):
+        """Log how late a cycle started relative to its deadline."""
+        logger.debug(f"⏱️  Cycle started {tick.lag * 1000:.1f}ms after its deadline")
+        
+    def run_sync(self, polling_interval: int):
+        """Synchronous polling loop: each cycle fetches, transforms and ships in turn."""
+        scheduler = self.create_scheduler(polling_interval)
         
-        # Main polling loop
         while self.running:
             try:
+                # Wait for the next deadline (returns None at once on a shutdown signal)
+                tick = scheduler.wait(self.shutdown_event)
+                if tick is None:
+                    break
+                self.report_tick(tick)
+                
                 # Execute polling cycle
                 self.polling_cycle()
-                
-                # Wait for next cycle (but check for shutdown signal)
-                for _ in range(polling_interval):
-                    if not self.running:
-                        break
-                    time.sleep(1)
                     
             except KeyboardInterrupt:
                 # This shouldn't happen due to signal handler, but just in case
                 self.running = False
                 break
             except Exception as e:
-                print(f"❌ Unexpected error in main loop: {e}")
+                logger.error("❌ Unexpected error in main loop: %s", e)
                 # Continue running unless it's a critical error
-                time.sleep(5)
+                if self.shutdown_event.wait(5):
+                    break
         
-        # Graceful shutdown
-        self.graceful_shutdown()
+    async def run_async(self, polling_interval: int):
+        """
+        Asyncio polling loop.
+        
+        Sources are fetched concurrently, and each cycle's shipment runs in the
+        background so it overlaps with the next cycle's fetch. At most one
+        shipment is in flight; it is awaited before shutdown. A cycle with a
+        shipment is recorded once the shipment finishes, with its result.
+        """
+        loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self.setup_async_signal_handlers(loop)
+        
+        ship_future = None
+        scheduler = self.create_scheduler(polling_interval)
+        
+        try:
+            while self.running:
+                try:
+                    # Wait for the next deadline, waking immediately on a shutdown signal
+                    tick = await scheduler.wait_async(self._stop_event)
+                    if tick is None:
+                        break
+                    self.report_tick(tick)
+                    
+                    logger.info(f"🔄 Starting polling cycle at {time.strftime('%Y-%m-%d %H:%M:%S')}")
+                    started = time.perf_counter()
+                    
+                    # Catch up on spooled records even if this cycle has nothing to ship
+                    await loop.run_in_executor(None, self.drain_pending_spool)
+                    
+                    raw_data = await fetch_all_sources_data_async(
+                        self.config, session=self.http_session, cache=self.response_cache
+                    )
+                    self.report_cache_stats()
+                    checkpoints = getattr(raw_data, 'checkpoints', [])
+                    transformed_data = self.transform_cycle_data(raw_data)
+                    
+                    cycle_shipment = None
+                    if transformed_data:
+                        # Keep at most one cycle's shipment in flight
+                        if ship_future is not None:
+                            await ship_future
+                        ship_future = cycle_shipment = loop.run_in_executor(
+                            None, self.ship_cycle_data_safely, transformed_data, checkpoints
+                        )
+                    else:
+                        self.commit_checkpoints(checkpoints, True)
+                    
+                    if get_bulk_sources(self.config):
+                        await loop.run_in_executor(None, self.stream_bulk_sources)
+                    
+                    CYCLE_SECONDS.observe(time.perf_counter() - started)
+                    if cycle_shipment is None:
+                        self.record_cycle(True)
+                    else:
+                        # The cycle succeeded only if its shipment does
+                        cycle_shipment.add_done_callback(lambda shipment: self.record_cycle(shipment.result()))
+                
+                except Exception as e:
+                    logger.error("❌ Unexpected error in main loop: %s", e)
+                    self.record_cycle(False)
+                    # Continue running unless it's a critical error
+                    await asyncio.sleep(5)
+            
+            if ship_future is not None:
+                await ship_future
+        finally:
+            self.restore_signal_handlers(loop)
+            
+    def ship_cycle_data_safely(self, transformed_data: List[Dict[str, Any]],
+                               checkpoints: List[Callable[[], None]] = ()) -> bool:
+        """
+        Run ship_cycle_data off the event loop, reporting instead of raising errors.
+        
+        ship_cycle_data stores records it could not ship itself, so on an
+        error nothing is stored again (that would re-ship batches already
+        accepted), just as a failed cycle of the synchronous loop.
+        """
+        try:
+            return self.ship_cycle_data(transformed_data, checkpoints)
+        except Exception as e:
+            logger.error("❌ Error while shipping cycle data: %s", e)
+            return False
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Poll weather data sources and ship them to Logz.io")
+    parser.add_argument(
+        '--async', dest='async_mode', action='store_true', default=None,
+        help="run the asyncio pipeline (overrides application.async_mode)"
+    )
+    parser.add_argument(
+        '--shards', type=int, default=None,
+        help="split cities and CSV files across this many worker processes (overrides application.shards)"
+    )
+    return parser.parse_args(argv)
+
+def run_shard(config: Dict[str, Any], shard_index: int, shard_count: int, async_mode: Optional[bool] = None):
+    """Entry point of a shard worker process: run the pipeline on this shard's part of the config."""
+    configure_logging({})
+    shipper = WeatherDataShipper(async_mode=async_mode, config=shard_config(config, shard_index, shard_count))
+    shipper.run()
+
+def run_supervisor(config: Dict[str, Any], shard_count: int, async_mode: Optional[bool] = None):
+    """Run shard_count workers under a supervisor that restarts them if they exit."""
+    configure_logging(config.get('logging', {}))
+    supervisor = ShardSupervisor(config, shard_count, run_shard, (async_mode,))
+    supervisor.run()
+    shutdown_logging()
 
 def main():
     """Entry point for the command-line application."""
-    shipper = WeatherDataShipper()
+    args = parse_args()
+    # Console logging until the configuration (and its logging section) is loaded
+    configure_logging({})
+    
+    try:
+        config = load_config()
+    except Exception as e:
+        logger.error("❌ Failed to load configuration: %s", e)
+        sys.exit(1)
+    
+    shard_count = args.shards if args.shards is not None else config.get('application', {}).get('shards', 1)
+    if shard_count > 1:
+        run_supervisor(config, shard_count, args.async_mode)
+        return
+    
+    shipper = WeatherDataShipper(async_mode=args.async_mode, config=config)
     shipper.run()
 
 if __name__ == "__main__":
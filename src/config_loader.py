@@ -42,6 +42,10 @@ def _apply_env_overrides(config: Dict[str, Any]) -> None:
     if logz_host := os.getenv('LOGZ_IO_HOST'):
         config.setdefault('logz_io', {})['host'] = logz_host
 
+    # Logging
+    if log_level := os.getenv('LOG_LEVEL'):
+        config.setdefault('logging', {})['level'] = log_level
+
 def _set_api_key(config: Dict[str, Any], source_type: str, api_key: str) -> None:
     """Set API key for a specific data source type."""
     for source in config.get('data_sources', []):
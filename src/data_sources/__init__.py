@@ -1,50 +1,372 @@
-from typing import List, Dict, Any
-from .csv_source import fetch_csv_data
-from .openweathermap_source import fetch_openweathermap_data
-from .weatherapi_source import fetch_weatherapi_data
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Callable, Optional
+from ..metrics import SOURCE_FETCH_SECONDS, SOURCE_FETCH_ERRORS, SOURCE_RECORDS
+from .registry import (FetchedRows, SourceCapabilities, SourcePlugin, get_source_plugin, register_source,
+                       register_configured_sources, available_sources)
 
-def fetch_source_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+logger = logging.getLogger(__name__)
+
+# Source modules are imported on first use (see registry.py); these names are
+# still importable from the package and resolve lazily
+_LAZY_EXPORTS = {
+    'fetch_csv_data': 'csv_source',
+    'iter_csv_chunks': 'csv_source',
+    'commit_csv_chunk': 'csv_source',
+    'fetch_openweathermap_data': 'openweathermap_source',
+    'fetch_weatherapi_data': 'weatherapi_source'
+}
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(f'.{module_name}', __name__), name)
+
+def _check_capabilities(plugin: SourcePlugin, source_config: Dict[str, Any]) -> None:
+    """Reject read modes the source type does not support."""
+    mode = source_config.get('mode')
+    if mode == 'incremental' and not plugin.capabilities.supports_incremental:
+        raise ValueError(f"Source type {plugin.name} does not support incremental reads")
+    if (mode == 'bulk' or source_config.get('bulk')) and not plugin.capabilities.supports_batching:
+        raise ValueError(f"Source type {plugin.name} does not support bulk reads")
+
+def fetch_source_data(source_config: Dict[str, Any], session=None, cache=None) -> List[Dict[str, Any]]:
     """
     Fetch data from any configured source type.
     
     Args:
         source_config: Configuration dict for the data source
+        session: Optional shared HTTP session for API sources
+        cache: Optional response cache for API sources
         
     Returns:
         List of raw data dictionaries
     """
     source_type = source_config.get('type')
+    plugin = get_source_plugin(source_type)
+    _check_capabilities(plugin, source_config)
+    
+    try:
+        with SOURCE_FETCH_SECONDS.labels(source_type).time():
+            data = plugin.fetch(source_config, session=session, cache=cache)
+            if plugin.capabilities.supports_async:
+                # Coroutine sources get a private event loop when called from a thread
+                import asyncio
+                data = asyncio.run(data)
+    except Exception:
+        SOURCE_FETCH_ERRORS.labels(source_type).inc()
+        raise
     
-    if source_type == 'csv':
-        return fetch_csv_data(source_config)
-    elif source_type == 'openweathermap':
-        return fetch_openweathermap_data(source_config)
-    elif source_type == 'weatherapi':
-        return fetch_weatherapi_data(source_config)
-    else:
-        raise ValueError(f"Unknown source type: {source_type}")
+    SOURCE_RECORDS.labels(source_type).inc(len(data))
+    return data
 
-def fetch_all_sources_data(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+async def fetch_source_data_async(source_config: Dict[str, Any], session=None, cache=None) -> List[Dict[str, Any]]:
+    """
+    Fetch data from a source whose fetch function is a coroutine (supports_async).
+    
+    Args:
+        source_config: Configuration dict for the data source
+        session: Optional shared HTTP session
+        cache: Optional response cache
+    
+    Returns:
+        List of raw data dictionaries
+    """
+    source_type = source_config.get('type')
+    plugin = get_source_plugin(source_type)
+    _check_capabilities(plugin, source_config)
+    
+    try:
+        with SOURCE_FETCH_SECONDS.labels(source_type).time():
+            data = await plugin.fetch(source_config, session=session, cache=cache)
+    except Exception:
+        SOURCE_FETCH_ERRORS.labels(source_type).inc()
+        raise
+    
+    SOURCE_RECORDS.labels(source_type).inc(len(data))
+    return data
+
+# One long-lived pool for source fetches, so fetches abandoned at their deadline
+# occupy at most max_workers threads instead of leaking a new pool's threads every cycle
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+# Fetches abandoned at their deadline and still running, by id() of their source config
+# (kept alive by the running fetch); the source is skipped until its fetch returns
+_abandoned: Dict[int, Future] = {}
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Return the shared source fetch pool, replacing it if max_workers changed."""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='source-fetch')
+            _executor_workers = max_workers
+        return _executor
+
+class _SourceFetch:
+    """A source fetch submitted to the shared pool, which knows when it actually started running."""
+    
+    def __init__(self, executor: ThreadPoolExecutor, source_config: Dict[str, Any], session=None, cache=None,
+                 on_start: Optional[Callable[[], None]] = None):
+        self.source_config = source_config
+        self.started_at = None
+        self.on_start = on_start
+        self.future = executor.submit(self._run, session, cache)
+        
+    def _run(self, session, cache) -> List[Dict[str, Any]]:
+        self.started_at = time.monotonic()
+        if self.on_start:
+            self.on_start()
+        return fetch_source_data(self.source_config, session=session, cache=cache)
+    
+    def deadline(self, timeout: float, cycle_deadline: float) -> float:
+        """The source's own deadline counts from when it started, not from when it was queued."""
+        if self.started_at is None:
+            return cycle_deadline
+        return min(self.started_at + timeout, cycle_deadline)
+    
+    def abandon(self) -> None:
+        """Give up on the fetch: drop it if still queued, otherwise let it finish in the background."""
+        if not self.future.cancel() and not self.future.done():
+            _abandoned[id(self.source_config)] = self.future
+        logger.warning("⏰ Timed out fetching from %s, skipping it this cycle", self.source_config.get('type'))
+
+def _still_running(source_config: Dict[str, Any]) -> bool:
+    """Whether a fetch of this source abandoned in an earlier cycle is still running."""
+    future = _abandoned.get(id(source_config))
+    if future is None:
+        return False
+    if future.done():
+        del _abandoned[id(source_config)]
+        return False
+    logger.warning("⏳ Previous fetch from %s is still running, skipping it this cycle", source_config.get('type'))
+    return True
+
+def is_bulk_source(source_config: Dict[str, Any]) -> bool:
+    """Whether a source is streamed in chunks (see iter_csv_chunks) instead of fetched per cycle."""
+    return source_config.get('type') == 'csv' and source_config.get('mode') == 'bulk'
+
+def get_bulk_sources(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the enabled sources that are streamed in chunks."""
+    return [
+        source_config for source_config in config.get('data_sources', [])
+        if source_config.get('enabled', True) and is_bulk_source(source_config)
+    ]
+
+def fetch_all_sources_data(config: Dict[str, Any], session=None, cache=None) -> List[Dict[str, Any]]:
     """
     Fetch data from all configured and enabled data sources.
     
+    Uses the concurrent fetch path when 'fetching.concurrent' is enabled,
+    otherwise walks the sources one at a time. Bulk sources are excluded;
+    they are streamed separately with iter_csv_chunks().
+    
     Args:
         config: Full application configuration
+        session: Optional shared HTTP session for API sources
+        cache: Optional response cache for API sources
         
     Returns:
-        Combined list of raw data from all sources
+        Combined list of raw data from all sources, carrying their read
+        position checkpoints (see FetchedRows)
+    """
+    enabled_sources = [
+        source_config for source_config in config.get('data_sources', [])
+        if source_config.get('enabled', True) and not is_bulk_source(source_config)
+    ]
+    
+    if config.get('fetching', {}).get('concurrent', False):
+        return _fetch_sources_concurrently(enabled_sources, config.get('fetching', {}), session, cache)
+    
+    all_data = FetchedRows()
+    
+    for source_config in enabled_sources:
+        try:
+            source_data = fetch_source_data(source_config, session=session, cache=cache)
+            all_data.extend_from(source_data)
+            logger.info(f"✅ Fetched {len(source_data)} records from {source_config.get('type')}")
+        except Exception as e:
+            logger.error("❌ Failed to fetch from %s: %s", source_config.get('type'), e)
+            # Continue with other sources instead of failing completely
+            continue
+    
+    return all_data
+
+def _fetch_sources_concurrently(sources: List[Dict[str, Any]],
+                                fetching_config: Dict[str, Any],
+                                session=None, cache=None) -> List[Dict[str, Any]]:
+    """
+    Fetch all sources on a bounded thread pool with per-source and per-cycle deadlines.
+    
+    A source's own deadline counts from when its fetch starts running, so
+    sources queued behind max_workers do not lose their time in the queue.
+    A source that fails or misses its deadline is reported and skipped; its
+    fetch is abandoned rather than waited on, so it cannot hold back the
+    rest of the cycle, and the source is skipped in later cycles until that
+    fetch returns. Results are merged in configuration order.
+    
+    Args:
+        sources: Enabled data source configurations
+        fetching_config: The 'fetching' section of the application configuration
+        session: Optional shared HTTP session for API sources
+        cache: Optional response cache for API sources
+    
+    Returns:
+        Combined list of raw data from all sources that finished in time
     """
-    all_data = []
+    if not sources:
+        return FetchedRows()
+    
+    max_workers = fetching_config.get('max_workers', 4)
+    default_timeout = fetching_config.get('source_timeout', 30)
+    cycle_timeout = fetching_config.get('cycle_timeout', 45)
+    
+    started = time.monotonic()
+    cycle_deadline = started + cycle_timeout
+    
+    executor = _get_executor(max_workers)
+    fetches = {}
+    
+    for index, source_config in enumerate(sources):
+        if not _still_running(source_config):
+            fetch = _SourceFetch(executor, source_config, session, cache)
+            fetches[fetch.future] = (index, fetch)
+    
+    results = [None] * len(sources)
+    pending = set(fetches)
+    
+    def deadline(future: Future) -> float:
+        _, fetch = fetches[future]
+        return fetch.deadline(fetch.source_config.get('timeout', default_timeout), cycle_deadline)
+    
+    try:
+        while pending:
+            now = time.monotonic()
+            
+            # Give up on sources whose own deadline (or the cycle deadline) has passed
+            for future in [f for f in pending if deadline(f) <= now]:
+                pending.discard(future)
+                fetches[future][1].abandon()
+            
+            if not pending:
+                break
+            
+            timeout = min(deadline(f) for f in pending) - now
+            if any(fetches[f][1].started_at is None for f in pending):
+                # A queued fetch gets its own deadline once it starts; look again soon
+                timeout = min(timeout, 0.1)
+            done, pending = wait(pending, timeout=max(0, timeout), return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                index, fetch = fetches[future]
+                source_type = fetch.source_config.get('type')
+                try:
+                    source_data = future.result()
+                    results[index] = source_data
+                    logger.info(f"✅ Fetched {len(source_data)} records from {source_type}")
+                except Exception as e:
+                    logger.error("❌ Failed to fetch from %s: %s", source_type, e)
+    finally:
+        # Don't block the cycle on abandoned fetches; they finish in the background
+        for future in pending:
+            fetches[future][1].abandon()
+    
+    all_data = FetchedRows()
+    for source_data in results:
+        if source_data:
+            all_data.extend_from(source_data)
+    
+    logger.info(f"⏱️  Fetched all sources in {time.monotonic() - started:.2f}s")
+    return all_data
+
+async def fetch_all_sources_data_async(config: Dict[str, Any], session=None,
+                                      cache=None) -> List[Dict[str, Any]]:
+    """
+    Fetch data from all enabled sources concurrently from an asyncio event loop.
+    
+    Each blocking source fetcher runs on the shared bounded thread pool and
+    is awaited with its own deadline (counted from when it starts running),
+    capped by the per-cycle deadline, using the same 'fetching' settings and
+    abandoned-fetch handling as the threaded concurrent path. Sources that
+    support async are awaited on the loop directly.
+    
+    Args:
+        config: Full application configuration
+        session: Optional shared HTTP session for API sources
+        cache: Optional response cache for API sources
+    
+    Returns:
+        Combined list of raw data from all sources that finished in time
+    """
+    # Deferred so that synchronous runs never import asyncio
+    import asyncio
+    
+    sources = [
+        source_config for source_config in config.get('data_sources', [])
+        if source_config.get('enabled', True) and not is_bulk_source(source_config)
+    ]
+    
+    if not sources:
+        return FetchedRows()
+    
+    fetching_config = config.get('fetching', {})
+    default_timeout = fetching_config.get('source_timeout', 30)
+    cycle_timeout = fetching_config.get('cycle_timeout', 45)
+    
+    loop = asyncio.get_running_loop()
+    executor = _get_executor(fetching_config.get('max_workers', 4))
+    started = time.monotonic()
+    cycle_deadline = started + cycle_timeout
+    
+    async def fetch_in_pool(source_config: Dict[str, Any], timeout: float) -> List[Dict[str, Any]]:
+        running = asyncio.Event()
+        fetch = _SourceFetch(executor, source_config, session, cache,
+                             on_start=lambda: loop.call_soon_threadsafe(running.set))
+        try:
+            # Queued behind max_workers, only the cycle deadline applies
+            await asyncio.wait_for(running.wait(), timeout=max(0, cycle_deadline - time.monotonic()))
+            remaining = fetch.deadline(timeout, cycle_deadline) - time.monotonic()
+            return await asyncio.wait_for(asyncio.wrap_future(fetch.future), timeout=max(0, remaining))
+        except asyncio.TimeoutError:
+            # Don't block the loop on abandoned fetches; they finish in the background
+            fetch.abandon()
+            return []
+    
+    async def fetch_one(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+        source_type = source_config.get('type')
+        timeout = min(source_config.get('timeout', default_timeout), cycle_timeout)
+        try:
+            if get_source_plugin(source_type).capabilities.supports_async:
+                try:
+                    source_data = await asyncio.wait_for(
+                        fetch_source_data_async(source_config, session=session, cache=cache), timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("⏰ Timed out fetching from %s, skipping it this cycle", source_type)
+                    return []
+            elif _still_running(source_config):
+                return []
+            else:
+                source_data = await fetch_in_pool(source_config, timeout)
+            logger.info(f"✅ Fetched {len(source_data)} records from {source_type}")
+            return source_data
+        except Exception as e:
+            logger.error("❌ Failed to fetch from %s: %s", source_type, e)
+            return []
+    
+    results = await asyncio.gather(*(fetch_one(source_config) for source_config in sources))
     
-    for source_config in config.get('data_sources', []):
-        if source_config.get('enabled', True):
-            try:
-                source_data = fetch_source_data(source_config)
-                all_data.extend(source_data)
-                print(f"✅ Fetched {len(source_data)} records from {source_config.get('type')}")
-            except Exception as e:
-                print(f"❌ Failed to fetch from {source_config.get('type')}: {e}")
-                # Continue with other sources instead of failing completely
-                continue
+    all_data = FetchedRows()
+    for source_data in results:
+        all_data.extend_from(source_data)
     
+    logger.info(f"⏱️  Fetched all sources in {time.monotonic() - started:.2f}s")
     return all_data
\ No newline at end of file
@@ -0,0 +1,229 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional, NamedTuple
+
+from ..metrics import CITY_FETCH_SECONDS, CITY_FETCH_ERRORS
+
+class CacheEntry(NamedTuple):
+    """A cached raw record with its validator and absolute expiry time."""
+    record: Dict[str, Any]
+    etag: Optional[str]
+    expires_at: float
+    
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+class MemoryCacheBackend:
+    """In-process LRU cache backend."""
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+        
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                
+    def close(self) -> None:
+        pass
+
+class DiskCacheBackend:
+    """SQLite-backed cache backend that survives restarts."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, record TEXT NOT NULL, etag TEXT, expires_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+        
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT record, etag, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2])
+    
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, record, etag, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(entry.record), entry.etag, entry.expires_at)
+            )
+            self.connection.commit()
+            
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+class ResponseCache:
+    """
+    TTL cache of weather API results keyed by provider and city.
+    
+    Expiry follows the response's Cache-Control max-age when present and the
+    configured TTL otherwise; 'no-store' responses are not cached. Expired
+    entries that carry an ETag are revalidated with If-None-Match, and a
+    304 Not Modified reuses the cached record.
+    """
+    
+    def __init__(self, backend, default_ttl: float = 600):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.lock = threading.Lock()
+        
+    def fetch(self, provider: str, city: str,
+              send: Callable[[Dict[str, str]], Any],
+              parse: Callable[[Any], Dict[str, Any]],
+              ttl: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return the cached record for provider/city, or fetch and cache it.
+        
+        Args:
+            provider: Provider name
+            city: City name as configured
+            send: Sends the request with the given extra headers and returns the response
+            parse: Turns a successful response into a raw record (raising on errors)
+            ttl: TTL override for this provider, in seconds
+        
+        Returns:
+            Raw data dictionary
+        """
+        key = f"{provider}:{city}"
+        entry = self.backend.get(key)
+        
+        if entry is not None and entry.is_fresh():
+            self._count('hits')
+            return dict(entry.record)
+        
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else {}
+        response = send(headers)
+        
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            self._store(key, entry.record, response.headers, ttl)
+            return dict(entry.record)
+        
+        self._count('misses')
+        record = parse(response)
+        self._store(key, record, response.headers, ttl)
+        return record
+    
+    def get_fresh(self, provider: str, city: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached record for provider/city if it has not expired.
+        
+        For bulk requests, which fetch many cities at once and store each
+        result with store(); expired entries are not revalidated.
+        """
+        entry = self.backend.get(f"{provider}:{city}")
+        
+        if entry is not None and entry.is_fresh():
+            self._count('hits')
+            return dict(entry.record)
+        return None
+    
+    def store(self, provider: str, city: str, record: Dict[str, Any], headers,
+              ttl: Optional[float] = None) -> None:
+        """Cache one city's record taken from a bulk response."""
+        self._count('misses')
+        self._store(f"{provider}:{city}", record, headers, ttl)
+        
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
+        
+    def close(self) -> None:
+        self.backend.close()
+        
+    def _count(self, counter: str) -> None:
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            
+    def _store(self, key: str, record: Dict[str, Any], headers, ttl: Optional[float]) -> None:
+        cache_control = _parse_cache_control(headers.get('Cache-Control', ''))
+        
+        if 'no-store' in cache_control:
+            return
+        
+        if 'no-cache' in cache_control:
+            max_age = 0
+        elif 'max-age' in cache_control:
+            try:
+                max_age = float(cache_control['max-age'])
+            except ValueError:
+                max_age = ttl if ttl is not None else self.default_ttl
+        else:
+            max_age = ttl if ttl is not None else self.default_ttl
+        
+        self.backend.set(key, CacheEntry(dict(record), headers.get('ETag'), time.time() + max_age))
+
+def _parse_cache_control(value: str) -> Dict[str, str]:
+    """Parse a Cache-Control header into a directive -> argument dict."""
+    directives = {}
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"')
+    return directives
+
+def fetch_with_cache(cache: Optional[ResponseCache], provider: str, city: str,
+                     send: Callable[[Dict[str, str]], Any],
+                     parse: Callable[[Any], Dict[str, Any]],
+                     ttl: Optional[float] = None) -> Dict[str, Any]:
+    """Fetch through the cache if one is configured, otherwise send directly."""
+    try:
+        with CITY_FETCH_SECONDS.labels(provider).time():
+            if cache is None:
+                return parse(send({}))
+            return cache.fetch(provider, city, send, parse, ttl=ttl)
+    except Exception:
+        CITY_FETCH_ERRORS.labels(provider).inc()
+        raise
+
+def create_response_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    """
+    Create the response cache described by the 'cache' config section.
+    
+    Args:
+        config: Full application configuration
+    
+    Returns:
+        ResponseCache, or None if caching is disabled
+    """
+    cache_config = config.get('cache', {})
+    
+    if not cache_config.get('enabled', False):
+        return None
+    
+    backend_type = cache_config.get('backend', 'memory')
+    
+    if backend_type == 'memory':
+        backend = MemoryCacheBackend(cache_config.get('max_entries', 10000))
+    elif backend_type == 'disk':
+        backend = DiskCacheBackend(cache_config.get('path', './weather_cache.sqlite3'))
+    else:
+        raise ValueError(f"Unknown cache backend: {backend_type}")
+    
+    return ResponseCache(backend, default_ttl=cache_config.get('default_ttl', 600))
@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting how many requests are started per second.
+    
+    The bucket holds up to one second's worth of tokens, so a provider's
+    per-second quota can be used in a short burst but never exceeded on average.
+    
+    The rate adapts to the provider: slow_down() halves it (when the provider
+    answers 429) and speed_up() moves it back towards the configured rate.
+    """
+    
+    # Lowest adapted rate, as a fraction of the configured rate
+    MIN_RATE_FRACTION = 0.1
+    # Rate regained per successful request, as a fraction of the configured rate
+    RECOVERY_STEP = 0.05
+    
+    def __init__(self, requests_per_second: float):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self.configured_rate = float(requests_per_second)
+        self.rate = self.configured_rate
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        
+    def acquire(self) -> None:
+        """Block until a request may be started."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait_time = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait_time)
+
+    def slow_down(self) -> None:
+        """Halve the rate (down to MIN_RATE_FRACTION of the configured rate)."""
+        with self.lock:
+            self._set_rate(max(self.configured_rate * self.MIN_RATE_FRACTION, self.rate / 2))
+            
+    def speed_up(self) -> None:
+        """Move the rate one step back towards the configured rate."""
+        if self.rate >= self.configured_rate:
+            return
+        with self.lock:
+            self._set_rate(min(self.configured_rate, self.rate + self.configured_rate * self.RECOVERY_STEP))
+            
+    def _set_rate(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = min(self.tokens, self.capacity)
+
+# Limiters live for the whole process so quotas hold across polling cycles
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str, requests_per_second: Optional[float]) -> Optional[RateLimiter]:
+    """
+    Get the shared rate limiter for a provider, creating it on first use.
+    
+    Args:
+        provider: Provider name the quota applies to
+        requests_per_second: Allowed request rate, or None for no limit
+    
+    Returns:
+        The provider's RateLimiter, or None if no limit is configured
+    """
+    if not requests_per_second:
+        return None
+    
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None or limiter.configured_rate != float(requests_per_second):
+            limiter = RateLimiter(requests_per_second)
+            _rate_limiters[provider] = limiter
+        return limiter
+
+def fetch_cities_concurrently(cities: List[str],
+                              fetch_city: Callable[[str], Optional[Dict[str, Any]]],
+                              max_concurrency: int = 1,
+                              rate_limiter: Optional[RateLimiter] = None) -> List[Dict[str, Any]]:
+    """
+    Run a per-city fetch function over all cities with bounded concurrency.
+    
+    The fetch function is expected to handle its own per-city errors and
+    return None for cities that could not be fetched.
+    
+    Args:
+        cities: City names to fetch
+        fetch_city: Function fetching one city's raw record
+        max_concurrency: Maximum number of requests in flight at once
+        rate_limiter: Optional limiter acquired before every request
+    
+    Returns:
+        List of raw data dictionaries, in the same order as cities
+    """
+    def limited_fetch(city: str) -> Optional[Dict[str, Any]]:
+        if rate_limiter:
+            rate_limiter.acquire()
+        return fetch_city(city)
+    
+    if max_concurrency <= 1 or len(cities) <= 1:
+        results = [limited_fetch(city) for city in cities]
+    else:
+        workers = min(max_concurrency, len(cities))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='city-fetch') as executor:
+            results = list(executor.map(limited_fetch, cities))
+    
+    return [record for record in results if record is not None]
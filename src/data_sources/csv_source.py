@@ -1,11 +1,57 @@
 import csv
-from typing import List, Dict, Any
+import functools
+import glob
+import io
+import json
+import logging
+import mmap
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple, Iterator, NamedTuple
+
+from ..sharding import owns
+from .registry import FetchedRows
+
+logger = logging.getLogger(__name__)
+
+# Serializes read-modify-write of checkpoint files shared by several CSV sources
+_checkpoint_lock = threading.Lock()
+
+# Read state of files whose latest rows are not checkpointed yet, by (state file, absolute path);
+# later reads continue from here while those rows are still being shipped
+_read_states: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+# Read states handed off before the read they continue from, by (state file, absolute path,
+# state they were read from); saved as soon as that earlier read is
+_deferred_states: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+MAX_DEFERRED_STATES = 1000
+
+# Bytes before a file's resume offset fingerprinted to notice files rewritten in place
+TAIL_FINGERPRINT_BYTES = 64
+
+class CsvChunk(NamedTuple):
+    """A chunk of rows from a bulk CSV read and the position to checkpoint once it is handled."""
+    rows: List[Dict[str, Any]]
+    file_path: str
+    inode: int
+    fieldnames: List[str]
+    end_offset: int
+    tail_crc: int
 
 def fetch_csv_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Read weather data from CSV file.
     Expected CSV format: city,temperature,description
     
+    With mode 'incremental', only rows appended since the previous call are
+    returned (see _fetch_csv_incremental). 'file_path' may also be a
+    directory or a glob pattern, in which case every matching file that
+    changed since it was last read is ingested (see _fetch_csv_files).
+    Both return FetchedRows whose checkpoints save the new read positions;
+    call them once the rows are shipped or spooled.
+    
     Args:
         source_config: Configuration dict containing 'file_path', 'enabled', etc.
     
@@ -20,19 +66,440 @@ def fetch_csv_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
     if not file_path:
         raise ValueError("CSV source requires 'file_path' in configuration")
     
+    if os.path.isdir(file_path) or any(char in file_path for char in '*?['):
+        return _fetch_csv_files(file_path, source_config)
+    
+    if source_config.get('mode', 'full') == 'incremental':
+        return _fetch_csv_incremental(file_path, source_config)
+    
     try:
-        data = []
-        with open(file_path, 'r', newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            for row in reader:
-                # Add source type to raw data
-                row['source_provider'] = source_config.get('type', 'csv')
-                data.append(row)
+        return _read_csv_file(file_path, source_config.get('type', 'csv'))
         
-        return data
+    except FileNotFoundError:
+        raise FileNotFoundError(f"CSV file not found: {file_path}")
+    except Exception as e:
+        raise Exception(f"Error reading CSV file {file_path}: {e}")
+
+def _read_csv_file(file_path: str, source_provider: str) -> List[Dict[str, Any]]:
+    """Read every row of one CSV file (module-level so process pools can pickle it)."""
+    data = []
+    with open(file_path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
         
+        for row in reader:
+            # Add source type to raw data
+            row['source_provider'] = source_provider
+            data.append(row)
+    
+    return data
+
+def _read_csv_tail(file_path: str, offset: int, fieldnames: Optional[List[str]], tail_crc: Optional[int],
+                   source_provider: str) -> Tuple[List[Dict[str, Any]], int, Optional[List[str]], int]:
+    """
+    Read the complete rows of a CSV file after offset (module-level so process pools can pickle it).
+    
+    If the bytes before offset no longer match tail_crc, the file was
+    rewritten in place rather than appended to, and it is read from the start.
+    
+    Returns:
+        Rows, offset after the last complete row, header, and the fingerprint for that offset
+    """
+    with open(file_path, 'rb') as file:
+        start = max(0, offset - TAIL_FINGERPRINT_BYTES)
+        file.seek(start)
+        content = file.read()
+        if not _tail_matches(content[:offset - start], offset, tail_crc):
+            logger.info(f"✏️  CSV file {file_path} was rewritten, reading it from the start")
+            start = offset = 0
+            fieldnames = None
+            file.seek(0)
+            content = file.read()
+    
+    # Only consume complete records; a row still being written waits for the next read
+    complete = content[:_last_record_end(content, offset - start)]
+    rows, fieldnames = _parse_csv_chunk(complete[offset - start:].decode('utf-8'), fieldnames)
+    for row in rows:
+        # Add source type to raw data
+        row['source_provider'] = source_provider
+    
+    end_offset = start + len(complete)
+    
+    return rows, end_offset, fieldnames, _tail_fingerprint(complete)
+
+def _last_record_end(data: bytes, position: int) -> int:
+    """
+    End of the last complete CSV record in data after position (a record boundary).
+    
+    Newlines inside quoted fields do not end a record: a newline is a record
+    boundary only when the quotes since the previous boundary are balanced
+    (an escaped "" counts twice, so it keeps the balance).
+    
+    Returns:
+        Offset just past the last record's newline, or position if no record is complete
+    """
+    end = position
+    quotes = 0
+    while True:
+        newline = data.find(b'\n', position)
+        if newline < 0:
+            return end
+        quotes += data.count(b'"', position, newline)
+        if quotes % 2 == 0:
+            end = newline + 1
+        position = newline + 1
+
+def _read_record(mapped: mmap.mmap) -> Optional[bytes]:
+    """Read one complete CSV record, which may span lines, or None at a record still being written."""
+    record = mapped.readline()
+    while record.endswith(b'\n') and record.count(b'"') % 2:
+        line = mapped.readline()
+        if not line:
+            return None
+        record += line
+    return record if record.endswith(b'\n') else None
+
+def _tail_fingerprint(data: bytes) -> int:
+    """Fingerprint of the bytes just before a resume offset (data ends at the offset)."""
+    return zlib.crc32(data[-TAIL_FINGERPRINT_BYTES:])
+
+def _tail_matches(data: bytes, offset: int, tail_crc: Optional[int]) -> bool:
+    """
+    Whether the bytes before offset still match the fingerprint saved with it.
+    
+    Checkpoints written before fingerprints were recorded have none and are trusted.
+    """
+    if not offset or tail_crc is None:
+        return True
+    return _tail_fingerprint(data) == tail_crc
+
+def _fetch_csv_files(pattern: str, source_config: Dict[str, Any]) -> FetchedRows:
+    """
+    Ingest all CSV files in a directory or matching a glob pattern in parallel.
+    
+    A manifest of processed files is kept in 'manifest_file', so files that
+    have not changed (mtime and size) since they were last read are skipped.
+    Like incremental mode, it records each file's read offset, inode and
+    header: a file that grew is read from where the last read stopped, so
+    appended rows are shipped once, while a rotated, truncated or rewritten
+    file is read again from the start. Only complete lines are read. The
+    manifest is updated by the returned rows' checkpoint.
+    Changed and new files are read on a pool of 'max_workers' threads, or
+    processes when 'executor' is 'process'. A file that fails to read is
+    reported and retried on the next call.
+    
+    In sharded mode the source config carries 'shard' ({'index', 'count'})
+    and only the files this shard owns on the hash ring are read.
+    
+    Args:
+        pattern: Directory (all *.csv files in it) or glob pattern
+        source_config: CSV source configuration
+    
+    Returns:
+        List of raw data dictionaries from the changed files, in file name order
+    """
+    manifest_file = source_config.get('manifest_file', './csv_manifest.json')
+    executor_type = source_config.get('executor', 'thread')
+    source_provider = source_config.get('type', 'csv')
+    shard = source_config.get('shard')
+    
+    if executor_type not in ('thread', 'process'):
+        raise ValueError(f"Unknown CSV executor: {executor_type} (expected 'thread' or 'process')")
+    
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.csv')
+    
+    manifest = _load_read_states(manifest_file)
+    
+    changed = {}
+    for file_path in sorted(glob.glob(pattern)):
+        if shard and not owns(os.path.abspath(file_path), shard):
+            continue
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            continue
+        state = manifest.get(os.path.abspath(file_path))
+        if state and state.get('mtime') == stat.st_mtime and state.get('size') == stat.st_size:
+            continue
+        changed[file_path] = (stat, *_position_from_state(file_path, stat, state))
+    
+    if not changed:
+        return FetchedRows()
+    
+    pool_class = ProcessPoolExecutor if executor_type == 'process' else ThreadPoolExecutor
+    
+    data = []
+    processed = {}
+    with pool_class(max_workers=min(source_config.get('max_workers', 4), len(changed))) as pool:
+        futures = {
+            file_path: pool.submit(_read_csv_tail, file_path, offset, fieldnames, tail_crc, source_provider)
+            for file_path, (_, offset, fieldnames, tail_crc) in changed.items()
+        }
+        for file_path, future in futures.items():
+            try:
+                rows, end_offset, fieldnames, tail_crc = future.result()
+                data.extend(rows)
+                stat = changed[file_path][0]
+                processed[os.path.abspath(file_path)] = {
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    'inode': stat.st_ino,
+                    'offset': end_offset,
+                    'fieldnames': fieldnames,
+                    'tail_crc': tail_crc
+                }
+            except Exception as e:
+                logger.warning("⚠️  Failed to read CSV file %s: %s", file_path, e)
+    
+    logger.info(f"📂 Read {len(processed)} changed CSV files matching {pattern}")
+    
+    if not processed:
+        return FetchedRows(data)
+    
+    previous = {path: manifest.get(path) for path in processed}
+    return FetchedRows(data, [_advance_read_states(manifest_file, previous, processed, prune=True)])
+
+def _fetch_csv_incremental(file_path: str, source_config: Dict[str, Any]) -> FetchedRows:
+    """
+    Read only the rows appended to a CSV file since the last call.
+    
+    The byte offset, inode, header and a fingerprint of the bytes before the
+    offset are persisted in 'checkpoint_file', so a restart does not
+    re-ingest the whole file. A file that shrank (truncated), has a new inode
+    (rotated) or no longer matches the fingerprint (rewritten in place) is
+    read again from the start. A partially written last line is left for the
+    next call.
+    
+    The checkpoint is saved by the returned rows' checkpoint, once they are
+    shipped or spooled; until then later calls continue after these rows.
+    
+    Args:
+        file_path: Path of the CSV file
+        source_config: CSV source configuration
+    
+    Returns:
+        FetchedRows with the new rows
+    """
+    checkpoint_file = source_config.get('checkpoint_file', './csv_checkpoint.json')
+    
+    try:
+        stat = os.stat(file_path)
+        path = os.path.abspath(file_path)
+        state = _load_read_states(checkpoint_file).get(path)
+        offset, fieldnames, tail_crc = _position_from_state(file_path, stat, state)
+        
+        data, end_offset, fieldnames, tail_crc = _read_csv_tail(
+            file_path, offset, fieldnames, tail_crc, source_config.get('type', 'csv')
+        )
+        
+        entry = {'inode': stat.st_ino, 'offset': end_offset, 'fieldnames': fieldnames, 'tail_crc': tail_crc}
+        if entry == state:
+            return FetchedRows(data)
+        
+        return FetchedRows(data, [_advance_read_states(checkpoint_file, {path: state}, {path: entry})])
+    
     except FileNotFoundError:
         raise FileNotFoundError(f"CSV file not found: {file_path}")
     except Exception as e:
-        raise Exception(f"Error reading CSV file {file_path}: {e}")
\ No newline at end of file
+        raise Exception(f"Error reading CSV file {file_path}: {e}")
+
+def iter_csv_chunks(source_config: Dict[str, Any]) -> Iterator[CsvChunk]:
+    """
+    Stream a large CSV file in fixed-size chunks of rows using a memory map.
+    
+    Used by sources with mode 'bulk' (e.g. back-filling historical exports).
+    Only one chunk of parsed rows is held in memory at a time, so memory use
+    does not grow with the file size. Reading starts from the checkpointed
+    offset; call commit_csv_chunk() once a chunk has been handed off so an
+    interrupted back-fill resumes after the last committed chunk.
+    
+    Args:
+        source_config: CSV source configuration ('file_path', 'chunk_size', 'checkpoint_file')
+    
+    Returns:
+        Iterator of CsvChunk
+    """
+    file_path = source_config.get('file_path')
+    if not file_path:
+        raise ValueError("CSV source requires 'file_path' in configuration")
+    
+    chunk_size = source_config.get('chunk_size', 5000)
+    checkpoint_file = source_config.get('checkpoint_file', './csv_checkpoint.json')
+    source_provider = source_config.get('type', 'csv')
+    
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"CSV file not found: {file_path}")
+    
+    offset, fieldnames, tail_crc = _resume_position(file_path, stat, checkpoint_file)
+    
+    if stat.st_size == offset:
+        return
+    
+    with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if not _tail_matches(mapped[max(0, offset - TAIL_FINGERPRINT_BYTES):offset], offset, tail_crc):
+            logger.info(f"✏️  CSV file {file_path} was rewritten, reading it from the start")
+            offset, fieldnames = 0, None
+        mapped.seek(offset)
+        
+        if fieldnames is None:
+            header = _read_record(mapped)
+            if header is None:
+                return
+            fieldnames = next(csv.reader(io.StringIO(header.decode('utf-8'), newline='')))
+            offset = mapped.tell()
+        
+        while True:
+            records = []
+            while len(records) < chunk_size:
+                # Stop at a row still being written; it is picked up by a later read
+                record = _read_record(mapped)
+                if record is None:
+                    break
+                offset += len(record)
+                records.append(record)
+            
+            if not records:
+                return
+            
+            rows, _ = _parse_csv_chunk(b''.join(records).decode('utf-8'), fieldnames)
+            for row in rows:
+                # Add source type to raw data
+                row['source_provider'] = source_provider
+            
+            tail_crc = _tail_fingerprint(mapped[max(0, offset - TAIL_FINGERPRINT_BYTES):offset])
+            yield CsvChunk(rows, file_path, stat.st_ino, fieldnames, offset, tail_crc)
+            
+            if len(records) < chunk_size:
+                return
+
+def commit_csv_chunk(source_config: Dict[str, Any], chunk: CsvChunk) -> None:
+    """Checkpoint a bulk read so the next read starts after this chunk."""
+    checkpoint_file = source_config.get('checkpoint_file', './csv_checkpoint.json')
+    _save_position(checkpoint_file, chunk.file_path, chunk.inode, chunk.end_offset, chunk.fieldnames, chunk.tail_crc)
+
+def _resume_position(file_path: str, stat: os.stat_result,
+                     checkpoint_file: str) -> Tuple[int, Optional[List[str]], Optional[int]]:
+    """
+    Look up where to resume reading a file from its checkpoint.
+    
+    Returns:
+        Byte offset, header and tail fingerprint, or (0, None, None) if the file is new, rotated or truncated
+    """
+    with _checkpoint_lock:
+        state = _load_checkpoints(checkpoint_file).get(os.path.abspath(file_path))
+    
+    return _position_from_state(file_path, stat, state)
+
+def _position_from_state(file_path: str, stat: os.stat_result,
+                         state: Optional[Dict[str, Any]]) -> Tuple[int, Optional[List[str]], Optional[int]]:
+    """Resume offset, header and tail fingerprint from a checkpoint or manifest entry ((0, None, None) to start over)."""
+    # Manifest entries written before offsets were recorded only hold mtime and size
+    if not state or 'offset' not in state:
+        return 0, None, None
+    
+    if state['inode'] != stat.st_ino:
+        logger.info(f"🔁 CSV file {file_path} was rotated, reading the new file from the start")
+        return 0, None, None
+    
+    if stat.st_size < state['offset']:
+        logger.info(f"✂️  CSV file {file_path} was truncated, reading it from the start")
+        return 0, None, None
+    
+    return state['offset'], state['fieldnames'], state.get('tail_crc')
+
+def _load_read_states(state_file: str) -> Dict[str, Any]:
+    """Per-file state to continue reading from: the saved state, or a newer read not checkpointed yet."""
+    with _checkpoint_lock:
+        states = _load_checkpoints(state_file)
+        states.update({path: entry for (file, path), entry in _read_states.items() if file == state_file})
+    return states
+
+def _advance_read_states(state_file: str, previous: Dict[str, Optional[Dict[str, Any]]],
+                         updates: Dict[str, Dict[str, Any]], prune: bool = False) -> Callable[[], None]:
+    """Continue later reads from the updated states, returning the checkpoint that saves them."""
+    with _checkpoint_lock:
+        for path, entry in updates.items():
+            _read_states[(state_file, path)] = entry
+    return functools.partial(_commit_read_states, state_file, previous, updates, prune)
+
+def _commit_read_states(state_file: str, previous: Dict[str, Optional[Dict[str, Any]]],
+                        updates: Dict[str, Dict[str, Any]], prune: bool = False) -> None:
+    """
+    Save read states once the rows read with them are shipped or spooled.
+    
+    A file's state is only saved over the state it was read from. A read
+    handed off while the one before it is still being shipped is saved
+    together with that one. Once a read goes unsaved (its rows were not
+    handed off), later reads of that file are not saved either, and a
+    restart re-reads from the last saved state rather than skipping rows.
+    
+    Args:
+        state_file: Checkpoint or manifest file
+        previous: State each file was read from, by absolute path (None if new)
+        updates: New state of each file, by absolute path
+        prune: Also forget files that no longer exist (manifests)
+    """
+    with _checkpoint_lock:
+        states = _load_checkpoints(state_file)
+        for path, entry in updates.items():
+            if states.get(path) != previous[path]:
+                _defer_read_state(state_file, path, previous[path], entry)
+                continue
+            # Later reads handed off first can be saved now too
+            while entry is not None:
+                states[path] = entry
+                entry = _deferred_states.pop((state_file, path, _state_key(entry)), None)
+            if _read_states.get((state_file, path)) == states[path]:
+                del _read_states[(state_file, path)]
+        if prune:
+            # Forget files that no longer exist
+            states = {path: entry for path, entry in states.items() if os.path.exists(path)}
+        _save_checkpoints(state_file, states)
+
+def _defer_read_state(state_file: str, path: str, previous: Optional[Dict[str, Any]],
+                      entry: Dict[str, Any]) -> None:
+    """Keep a read state until the read it continues from is saved (called under _checkpoint_lock)."""
+    if len(_deferred_states) >= MAX_DEFERRED_STATES:
+        # Reads that were never handed off block these for good; a restart re-reads from the saved state
+        logger.debug("Dropping %d deferred CSV read states", len(_deferred_states))
+        _deferred_states.clear()
+    _deferred_states[(state_file, path, _state_key(previous))] = entry
+
+def _state_key(state: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(state, sort_keys=True)
+
+def _save_position(checkpoint_file: str, file_path: str, inode: int, offset: int,
+                   fieldnames: Optional[List[str]], tail_crc: int) -> None:
+    """Record the read position of one file in the checkpoint file."""
+    with _checkpoint_lock:
+        checkpoints = _load_checkpoints(checkpoint_file)
+        checkpoints[os.path.abspath(file_path)] = {
+            'inode': inode,
+            'offset': offset,
+            'fieldnames': fieldnames,
+            'tail_crc': tail_crc
+        }
+        _save_checkpoints(checkpoint_file, checkpoints)
+
+def _parse_csv_chunk(text: str, fieldnames: Optional[List[str]]) -> Tuple[List[Dict[str, Any]], Optional[List[str]]]:
+    """Parse CSV text, reading the header from it when fieldnames is not known yet."""
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    rows = list(reader)
+    return rows, reader.fieldnames
+
+def _load_checkpoints(checkpoint_file: str) -> Dict[str, Any]:
+    """Load per-file state: read checkpoints or the processed-file manifest."""
+    try:
+        with open(checkpoint_file, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def _save_checkpoints(checkpoint_file: str, checkpoints: Dict[str, Any]) -> None:
+    """Persist per-file state atomically."""
+    tmp_path = checkpoint_file + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoints, f)
+    os.replace(tmp_path, checkpoint_file)
\ No newline at end of file
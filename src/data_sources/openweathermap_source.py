@@ -1,12 +1,32 @@
+import json
+import logging
+import os
+import threading
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-def fetch_openweathermap_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+from ..metrics import SOURCE_REQUESTS_SAVED
+from ..resilience import ProviderGuard, ProviderUnavailable, get_provider_guard
+from .cache import ResponseCache, fetch_with_cache
+from .concurrency import fetch_cities_concurrently, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://api.openweathermap.org/data/2.5"
+
+# Most city IDs the /group endpoint accepts per request
+GROUP_MAX_CITIES = 20
+
+def fetch_openweathermap_data(source_config: Dict[str, Any],
+                              session: Optional[requests.Session] = None,
+                              cache: Optional[ResponseCache] = None) -> List[Dict[str, Any]]:
     """
     Fetch weather data from OpenWeatherMap API.
     
     Args:
         source_config: Configuration dict containing 'cities', 'api_key', etc.
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
+        cache: Optional response cache consulted before calling the API
     
     Returns:
         List of raw data dictionaries
@@ -24,38 +44,285 @@ def fetch_openweathermap_data(source_config: Dict[str, Any]) -> List[Dict[str, A
     if not cities:
         return []
     
-    data = []
-    base_url = "http://api.openweathermap.org/data/2.5/weather"
+    max_concurrency = source_config.get('max_concurrency', 1)
+    cache_ttl = source_config.get('cache_ttl')
+    base_url = source_config.get('base_url', DEFAULT_BASE_URL)
+    rate_limiter = get_rate_limiter('openweathermap', source_config.get('requests_per_second'))
+    guard = get_provider_guard('openweathermap', rate_limiter)
     
-    for city in cities:
+    # While the circuit is open, skip the whole source instead of timing out city by city
+    unavailable = guard.unavailable_reason()
+    if unavailable:
+        logger.warning("🚫 Skipping OpenWeatherMap this cycle (%s)", unavailable)
+        return []
+    
+    if source_config.get('bulk', False):
+        return _fetch_bulk(cities, api_key, session or requests, source_config, cache, guard)
+    
+    return fetch_cities_concurrently(
+        cities,
+        lambda city: _fetch_city(city, api_key, session or requests, cache, cache_ttl, base_url, guard=guard),
+        max_concurrency=max_concurrency
+    )
+
+def _fetch_city(city: str, api_key: str, http, cache: Optional[ResponseCache] = None,
+                cache_ttl: Optional[float] = None,
+                base_url: str = DEFAULT_BASE_URL,
+                city_ids: Optional['CityIdCache'] = None,
+                guard: Optional[ProviderGuard] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetch current weather for a single city from OpenWeatherMap.
+    
+    Args:
+        city: City name to query
+        api_key: OpenWeatherMap API key
+        http: requests.Session (or the requests module) used to send the request
+        cache: Optional response cache
+        cache_ttl: Cache TTL override for this source, in seconds
+        base_url: API root URL ('base_url' in the source config)
+        city_ids: City ID cache to record the city's ID in (bulk mode)
+        guard: Provider guard the request is sent through (circuit breaker, 429 handling)
+    
+    Returns:
+        Raw data dictionary, or None if the city could not be fetched
+    """
+    url = base_url.rstrip('/') + "/weather"
+    
+    def send(headers: Dict[str, str]):
+        request = lambda: http.get(url, params=params, headers=headers, timeout=15)
+        return guard.call(request) if guard else request()
+    
+    try:
+        # Make API request
+        params = {
+            'q': city,
+            'appid': api_key,
+            'units': 'metric'  # Get temperature in Celsius
+        }
+        
+        return fetch_with_cache(
+            cache, 'openweathermap', city,
+            send=send,
+            parse=lambda response: _parse_response(response, city, city_ids),
+            ttl=cache_ttl
+        )
+        
+    except ProviderUnavailable as e:
+        # The circuit opened or the provider asked for a pause; reported once by the guard
+        logger.debug("Skipped %s on OpenWeatherMap: %s", city, e)
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.warning("⚠️  Failed to fetch data for %s from OpenWeatherMap: %s", city, e)
+        return None
+    except KeyError as e:
+        logger.warning("⚠️  Unexpected response format for %s from OpenWeatherMap: %s", city, e)
+        return None
+
+def _parse_response(response, city: str, city_ids: Optional['CityIdCache'] = None) -> Dict[str, Any]:
+    """
+    Turn an OpenWeatherMap current-weather response into a raw record.
+    
+    Args:
+        response: HTTP response from the current-weather endpoint
+        city: City name as configured, used if the response has no name
+        city_ids: City ID cache to record the response's city ID in
+    
+    Returns:
+        Raw data dictionary
+    
+    Raises:
+        requests.exceptions.HTTPError: For HTTP error statuses
+        KeyError: If the response is missing expected fields
+    """
+    response.raise_for_status()  # Raise exception for HTTP errors
+    
+    weather_data = response.json()
+    
+    if city_ids is not None and 'id' in weather_data:
+        city_ids.set(city, weather_data['id'])
+    
+    return _build_record(weather_data, city)
+
+def _build_record(weather_data: Dict[str, Any], city: str) -> Dict[str, Any]:
+    """Extract a raw record from one city's current weather (single or /group response item)."""
+    # Extract relevant data and standardize format
+    record = {
+        'city': weather_data.get('name', city),
+        'temperature': weather_data['main']['temp'],
+        'description': weather_data['weather'][0]['description'],
+        'source_provider': 'openweathermap'
+    }
+    
+    return record
+
+class CityIdCache:
+    """
+    City name -> OpenWeatherMap city ID mapping, persisted as a JSON file.
+    
+    IDs are learned from per-city responses, so each name is resolved once
+    and later fetched through the multi-city /group endpoint.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
         try:
-            # Make API request
-            params = {
-                'q': city,
-                'appid': api_key,
-                'units': 'metric'  # Get temperature in Celsius
-            }
+            with open(path, 'r') as f:
+                self.ids: Dict[str, int] = json.load(f)
+        except FileNotFoundError:
+            self.ids = {}
             
-            response = requests.get(base_url, params=params, timeout=15)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            
-            weather_data = response.json()
-            
-            # Extract relevant data and standardize format
-            record = {
-                'city': weather_data.get('name', city),
-                'temperature': weather_data['main']['temp'],
-                'description': weather_data['weather'][0]['description'],
-                'source_provider': 'openweathermap'
-            }
-            
-            data.append(record)
-            
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  Warning: Failed to fetch data for {city} from OpenWeatherMap: {e}")
-            continue
-        except KeyError as e:
-            print(f"⚠️  Warning: Unexpected response format for {city} from OpenWeatherMap: {e}")
-            continue
-    
-    return data
\ No newline at end of file
+    def get(self, city: str) -> Optional[int]:
+        with self.lock:
+            return self.ids.get(city)
+        
+    def set(self, city: str, city_id: int) -> None:
+        with self.lock:
+            if self.ids.get(city) != city_id:
+                self.ids[city] = city_id
+                self.dirty = True
+                
+    def save(self) -> None:
+        """Write the mapping atomically if it changed."""
+        with self.lock:
+            if not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.ids, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+# One cache per file for the whole process, shared across cycles
+_city_id_caches: Dict[str, CityIdCache] = {}
+_city_id_caches_lock = threading.Lock()
+
+def get_city_id_cache(path: str) -> CityIdCache:
+    """Get the shared city ID cache for a file, loading it on first use."""
+    with _city_id_caches_lock:
+        city_ids = _city_id_caches.get(path)
+        if city_ids is None:
+            city_ids = _city_id_caches[path] = CityIdCache(path)
+        return city_ids
+
+def _fetch_bulk(cities: List[str], api_key: str, http, source_config: Dict[str, Any],
+                cache: Optional[ResponseCache] = None,
+                guard: Optional[ProviderGuard] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch many cities with the multi-city /group endpoint.
+    
+    Cities with a known ID are fetched up to 'bulk_size' (at most 20) per
+    request. Names without an ID yet, and IDs missing from a /group
+    response, fall back to per-city requests, which also resolve their IDs
+    for the next cycle. Fresh response cache entries are used as-is.
+    
+    Args:
+        cities: City names to fetch
+        api_key: OpenWeatherMap API key
+        http: requests.Session (or the requests module) used to send the requests
+        source_config: OpenWeatherMap source configuration
+        cache: Optional response cache
+        guard: Provider guard the requests are sent through (and rate limited by)
+    
+    Returns:
+        Raw data dictionaries, in the same order as cities
+    """
+    base_url = source_config.get('base_url', DEFAULT_BASE_URL)
+    cache_ttl = source_config.get('cache_ttl')
+    max_concurrency = source_config.get('max_concurrency', 1)
+    bulk_size = max(1, min(source_config.get('bulk_size', GROUP_MAX_CITIES), GROUP_MAX_CITIES))
+    city_ids = get_city_id_cache(source_config.get('city_id_file', './owm_city_ids.json'))
+    
+    # City -> record; None marks a city whose group request failed, skipped this cycle
+    records: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending = []
+    
+    for city in cities:
+        cached = cache.get_fresh('openweathermap', city) if cache else None
+        if cached is not None:
+            records[city] = cached
+        else:
+            pending.append(city)
+    
+    resolved = [city for city in pending if city_ids.get(city) is not None]
+    chunks = [resolved[i:i + bulk_size] for i in range(0, len(resolved), bulk_size)]
+    
+    def fetch_chunk(chunk: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        chunk_records = _fetch_group(chunk, city_ids, api_key, http, base_url, cache, cache_ttl, guard)
+        # Cities of a failed request are not retried one by one, which would multiply the load
+        return chunk_records if chunk_records is not None else dict.fromkeys(chunk)
+    
+    for chunk_records in fetch_cities_concurrently(chunks, fetch_chunk, max_concurrency=max_concurrency):
+        records.update(chunk_records)
+    
+    # Unresolved names, and IDs the group response left out, are fetched one by one
+    fallback = [city for city in pending if city not in records]
+    
+    def fetch_single(city: str) -> Optional[Dict[str, Any]]:
+        record = _fetch_city(city, api_key, http, cache, cache_ttl, base_url, city_ids, guard)
+        return {city: record} if record is not None else None
+    
+    for city_record in fetch_cities_concurrently(fallback, fetch_single, max_concurrency=max_concurrency):
+        records.update(city_record)
+    
+    city_ids.save()
+    
+    request_count = len(chunks) + len(fallback)
+    saved = len(pending) - request_count
+    if saved > 0:
+        SOURCE_REQUESTS_SAVED.labels('openweathermap').inc(saved)
+    logger.info(f"📦 OpenWeatherMap bulk: {len(pending)} cities in {len(chunks)} group + {len(fallback)} "
+                f"single requests ({saved} requests saved)")
+    
+    return [records[city] for city in cities if records.get(city) is not None]
+
+def _fetch_group(chunk: List[str], city_ids: CityIdCache, api_key: str, http, base_url: str,
+                 cache: Optional[ResponseCache] = None,
+                 cache_ttl: Optional[float] = None,
+                 guard: Optional[ProviderGuard] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Fetch up to 20 cities by ID in one /group request.
+    
+    Returns:
+        Raw records by configured city name (cities missing from the response
+        are left out), or None if the request failed. Aliases resolving to
+        the same ID ("NYC", "New York") each get a record.
+    """
+    cities_by_id: Dict[int, List[str]] = {}
+    for city in chunk:
+        cities_by_id.setdefault(city_ids.get(city), []).append(city)
+    params = {
+        'id': ','.join(str(city_id) for city_id in cities_by_id),
+        'appid': api_key,
+        'units': 'metric'
+    }
+    
+    request = lambda: http.get(base_url.rstrip('/') + "/group", params=params, timeout=15)
+    
+    try:
+        response = guard.call(request) if guard else request()
+        response.raise_for_status()
+        items = response.json()['list']
+    except ProviderUnavailable as e:
+        logger.debug("Skipped a group of %d cities on OpenWeatherMap: %s", len(chunk), e)
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.warning("⚠️  Failed to fetch %d cities from the OpenWeatherMap group endpoint: %s", len(chunk), e)
+        return None
+    except (KeyError, ValueError) as e:
+        logger.warning("⚠️  Unexpected group response format from OpenWeatherMap: %s", e)
+        return None
+    
+    records = {}
+    for item in items:
+        for city in cities_by_id.get(item.get('id'), []):
+            try:
+                records[city] = _build_record(item, city)
+            except (KeyError, IndexError) as e:
+                logger.warning("⚠️  Unexpected response format for %s from OpenWeatherMap: %s", city, e)
+                continue
+            if cache:
+                cache.store('openweathermap', city, records[city], response.headers, cache_ttl)
+    
+    return records
\ No newline at end of file
@@ -0,0 +1,172 @@
+import importlib
+import threading
+from typing import List, Dict, Any, Callable, Iterable, NamedTuple, Optional, Union
+
+# Installed packages can add source types under this entry point group, e.g. in pyproject.toml:
+#   [project.entry-points."weather_shipper.sources"]
+#   noaa = "noaa_source:plugin"
+ENTRY_POINT_GROUP = 'weather_shipper.sources'
+
+class SourceCapabilities(NamedTuple):
+    """What a source type can do beyond one fetch per cycle."""
+    supports_batching: bool = False  # Fetches many locations or rows per request/chunk
+    supports_async: bool = False  # The fetch function is a coroutine function
+    supports_incremental: bool = False  # Reads only data added since the previous cycle
+
+class FetchedRows(list):
+    """
+    Rows returned by a fetch, with the callbacks that save its read position.
+    
+    Sources that resume from a saved position (e.g. incremental CSV) return
+    this instead of a plain list. The checkpoints are called only once the
+    rows have been shipped or durably spooled, so a crash or failed shipment
+    re-reads them instead of losing them.
+    """
+    
+    def __init__(self, rows: Iterable[Dict[str, Any]] = (), checkpoints: Iterable[Callable[[], None]] = ()):
+        super().__init__(rows)
+        self.checkpoints: List[Callable[[], None]] = list(checkpoints)
+        
+    def extend_from(self, rows: List[Dict[str, Any]]) -> None:
+        """Add another fetch's rows, and its checkpoints if it has any."""
+        self.extend(rows)
+        self.checkpoints.extend(getattr(rows, 'checkpoints', ()))
+
+class SourcePlugin:
+    """
+    A data source type: its fetch function and its capabilities.
+    
+    The fetch function is given as a 'module:function' string and only
+    imported on first use, so source types that are not enabled (and their
+    dependencies, such as requests) are never loaded.
+    
+    Args:
+        name: Source type, as used in 'type' in the data_sources config
+        target: 'module:function' path of the fetch function, or the function itself
+        capabilities: What the source supports
+        uses_http: Whether the fetch function accepts the shared session and cache
+            (fetch(source_config, session=..., cache=...)); otherwise fetch(source_config)
+    """
+    
+    def __init__(self, name: str, target: Union[str, Callable], capabilities: SourceCapabilities = SourceCapabilities(),
+                 uses_http: bool = True):
+        self.name = name
+        self.target = target
+        self.capabilities = capabilities
+        self.uses_http = uses_http
+        self.function: Optional[Callable] = None if isinstance(target, str) else target
+        self.lock = threading.Lock()
+        
+    def load(self) -> Callable:
+        """Import the fetch function on first use."""
+        if self.function is None:
+            with self.lock:
+                if self.function is None:
+                    module_name, _, attribute = self.target.partition(':')
+                    # Built-in targets are relative ('.csv_source:...') to this package
+                    module = importlib.import_module(module_name, package=__package__)
+                    self.function = getattr(module, attribute)
+        return self.function
+    
+    def fetch(self, source_config: Dict[str, Any], session=None, cache=None):
+        """Call the fetch function (returns a coroutine for async sources)."""
+        fetch = self.load()
+        if self.uses_http:
+            return fetch(source_config, session=session, cache=cache)
+        return fetch(source_config)
+    
+    def __repr__(self) -> str:
+        return f"SourcePlugin({self.name!r}, {self.target!r}, {self.capabilities})"
+
+BUILTIN_SOURCES = (
+    SourcePlugin('csv', '.csv_source:fetch_csv_data',
+                 SourceCapabilities(supports_batching=True, supports_incremental=True), uses_http=False),
+    SourcePlugin('openweathermap', '.openweathermap_source:fetch_openweathermap_data',
+                 SourceCapabilities(supports_batching=True)),
+    SourcePlugin('weatherapi', '.weatherapi_source:fetch_weatherapi_data',
+                 SourceCapabilities(supports_batching=True))
+)
+
+_registry: Dict[str, SourcePlugin] = {plugin.name: plugin for plugin in BUILTIN_SOURCES}
+_registry_lock = threading.Lock()
+
+def register_source(name: str, target: Union[str, Callable],
+                    capabilities: Optional[SourceCapabilities] = None, uses_http: bool = True) -> SourcePlugin:
+    """
+    Register (or replace) a source type.
+    
+    Args:
+        name: Source type name
+        target: 'module:function' path of the fetch function, or the function itself
+        capabilities: What the source supports (nothing beyond plain fetches if omitted)
+        uses_http: Whether the fetch function takes session= and cache= keywords
+    
+    Returns:
+        The registered plugin
+    """
+    plugin = SourcePlugin(name, target, capabilities or SourceCapabilities(), uses_http)
+    with _registry_lock:
+        _registry[name] = plugin
+    return plugin
+
+def register_configured_sources(config: Dict[str, Any]) -> None:
+    """
+    Register the source types listed in the 'source_plugins' config section.
+    
+    Each entry maps a type name to a 'module:function' string, or to a dict
+    with 'target' plus optional 'capabilities' (supports_batching,
+    supports_async, supports_incremental) and 'uses_http'.
+    
+    Args:
+        config: Full application configuration
+    """
+    for name, spec in config.get('source_plugins', {}).items():
+        if isinstance(spec, str):
+            spec = {'target': spec}
+        register_source(
+            name,
+            spec['target'],
+            SourceCapabilities(**spec.get('capabilities', {})),
+            spec.get('uses_http', True)
+        )
+
+def _load_entry_point(source_type: str) -> Optional[SourcePlugin]:
+    """Register the source type an installed package advertises under ENTRY_POINT_GROUP, if any."""
+    from importlib.metadata import entry_points
+    
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP, name=source_type):
+        plugin = entry_point.load()
+        
+        if not isinstance(plugin, SourcePlugin):
+            # A bare fetch function, optionally with a 'capabilities' attribute
+            plugin = SourcePlugin(source_type, plugin, getattr(plugin, 'capabilities', SourceCapabilities()))
+        
+        with _registry_lock:
+            return _registry.setdefault(source_type, plugin)
+    
+    return None
+
+def get_source_plugin(source_type: str) -> SourcePlugin:
+    """
+    Look up a source type, consulting installed entry points if it is not registered.
+    
+    Args:
+        source_type: The 'type' of a data source config
+    
+    Returns:
+        The source's plugin
+    
+    Raises:
+        ValueError: If no source of that type is registered or installed
+    """
+    plugin = _registry.get(source_type) or _load_entry_point(source_type)
+    if plugin is None:
+        raise ValueError(f"Unknown source type: {source_type}")
+    return plugin
+
+def available_sources() -> List[str]:
+    """Names of all registered and installed source types."""
+    from importlib.metadata import entry_points
+    
+    installed = {entry_point.name for entry_point in entry_points(group=ENTRY_POINT_GROUP)}
+    return sorted(set(_registry) | installed)
@@ -1,12 +1,29 @@
+import logging
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-def fetch_weatherapi_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+from ..metrics import SOURCE_REQUESTS_SAVED
+from ..resilience import ProviderGuard, ProviderUnavailable, get_provider_guard
+from .cache import ResponseCache, fetch_with_cache
+from .concurrency import fetch_cities_concurrently, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://api.weatherapi.com/v1"
+
+# Most locations one bulk request accepts
+BULK_MAX_LOCATIONS = 50
+
+def fetch_weatherapi_data(source_config: Dict[str, Any],
+                          session: Optional[requests.Session] = None,
+                          cache: Optional[ResponseCache] = None) -> List[Dict[str, Any]]:
     """
     Fetch weather data from WeatherAPI.com.
     
     Args:
         source_config: Configuration dict containing 'cities', 'api_key', etc.
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
+        cache: Optional response cache consulted before calling the API
     
     Returns:
         List of raw data dictionaries
@@ -24,38 +41,213 @@ def fetch_weatherapi_data(source_config: Dict[str, Any]) -> List[Dict[str, Any]]
     if not cities:
         return []
     
-    data = []
-    base_url = "http://api.weatherapi.com/v1/current.json"
+    max_concurrency = source_config.get('max_concurrency', 1)
+    cache_ttl = source_config.get('cache_ttl')
+    base_url = source_config.get('base_url', DEFAULT_BASE_URL)
+    rate_limiter = get_rate_limiter('weatherapi', source_config.get('requests_per_second'))
+    guard = get_provider_guard('weatherapi', rate_limiter)
+    
+    # While the circuit is open, skip the whole source instead of timing out city by city
+    unavailable = guard.unavailable_reason()
+    if unavailable:
+        logger.warning("🚫 Skipping WeatherAPI this cycle (%s)", unavailable)
+        return []
+    
+    if source_config.get('bulk', False):
+        return _fetch_bulk(cities, api_key, session or requests, source_config, cache, guard)
+    
+    return fetch_cities_concurrently(
+        cities,
+        lambda city: _fetch_city(city, api_key, session or requests, cache, cache_ttl, base_url, guard),
+        max_concurrency=max_concurrency
+    )
+
+def _fetch_city(city: str, api_key: str, http, cache: Optional[ResponseCache] = None,
+                cache_ttl: Optional[float] = None,
+                base_url: str = DEFAULT_BASE_URL,
+                guard: Optional[ProviderGuard] = None) -> Optional[Dict[str, Any]]:
+    """
+    Fetch current weather for a single city from WeatherAPI.
+    
+    Args:
+        city: City name to query
+        api_key: WeatherAPI API key
+        http: requests.Session (or the requests module) used to send the request
+        cache: Optional response cache
+        cache_ttl: Cache TTL override for this source, in seconds
+        base_url: API root URL ('base_url' in the source config)
+        guard: Provider guard the request is sent through (circuit breaker, 429 handling)
+    
+    Returns:
+        Raw data dictionary, or None if the city could not be fetched
+    """
+    url = base_url.rstrip('/') + "/current.json"
+    
+    def send(headers: Dict[str, str]):
+        request = lambda: http.get(url, params=params, headers=headers, timeout=15)
+        return guard.call(request) if guard else request()
+    
+    try:
+        # Make API request
+        params = {
+            'key': api_key,
+            'q': city,
+            'aqi': 'no'  # We don't need air quality data
+        }
+        
+        return fetch_with_cache(
+            cache, 'weatherapi', city,
+            send=send,
+            parse=_parse_response,
+            ttl=cache_ttl
+        )
+        
+    except ProviderUnavailable as e:
+        # The circuit opened or the provider asked for a pause; reported once by the guard
+        logger.debug("Skipped %s on WeatherAPI: %s", city, e)
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.warning("⚠️  Failed to fetch data for %s from WeatherAPI: %s", city, e)
+        return None
+    except KeyError as e:
+        logger.warning("⚠️  Unexpected response format for %s from WeatherAPI: %s", city, e)
+        return None
+
+def _parse_response(response) -> Dict[str, Any]:
+    """
+    Turn a WeatherAPI current-weather response into a raw record.
+    
+    Args:
+        response: HTTP response from the current-weather endpoint
+    
+    Returns:
+        Raw data dictionary
+    
+    Raises:
+        requests.exceptions.HTTPError: For HTTP error statuses
+        KeyError: If the response is missing expected fields
+    """
+    response.raise_for_status()  # Raise exception for HTTP errors
+    
+    return _build_record(response.json())
+
+def _build_record(weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract a raw record from one location's current weather (single or bulk response item)."""
+    # Extract relevant data and standardize format
+    record = {
+        'city': weather_data['location']['name'],
+        'temperature': weather_data['current']['temp_c'],
+        'description': weather_data['current']['condition']['text'],
+        'source_provider': 'weatherapi'
+    }
+    
+    return record
+
+def _fetch_bulk(cities: List[str], api_key: str, http, source_config: Dict[str, Any],
+                cache: Optional[ResponseCache] = None,
+                guard: Optional[ProviderGuard] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch many cities with bulk requests (POST current.json?q=bulk).
+    
+    Cities are posted up to 'bulk_size' (at most 50) per request and each
+    item of the response is matched back to its city by custom_id. An item
+    the API could not answer (e.g. an unknown city name) is skipped on its
+    own; the rest of its chunk is still used. Fresh response cache entries
+    are used as-is.
+    
+    Args:
+        cities: City names to fetch
+        api_key: WeatherAPI API key
+        http: requests.Session (or the requests module) used to send the requests
+        source_config: WeatherAPI source configuration
+        cache: Optional response cache
+        guard: Provider guard the requests are sent through (and rate limited by)
+    
+    Returns:
+        Raw data dictionaries, in the same order as cities
+    """
+    url = source_config.get('base_url', DEFAULT_BASE_URL).rstrip('/') + "/current.json"
+    cache_ttl = source_config.get('cache_ttl')
+    max_concurrency = source_config.get('max_concurrency', 1)
+    bulk_size = max(1, min(source_config.get('bulk_size', BULK_MAX_LOCATIONS), BULK_MAX_LOCATIONS))
+    
+    records: Dict[str, Dict[str, Any]] = {}
+    pending = []
     
     for city in cities:
+        cached = cache.get_fresh('weatherapi', city) if cache else None
+        if cached is not None:
+            records[city] = cached
+        else:
+            pending.append(city)
+    
+    chunks = [pending[i:i + bulk_size] for i in range(0, len(pending), bulk_size)]
+    
+    for chunk_records in fetch_cities_concurrently(
+            chunks,
+            lambda chunk: _fetch_chunk(chunk, api_key, http, url, cache, cache_ttl, guard),
+            max_concurrency=max_concurrency):
+        records.update(chunk_records)
+    
+    saved = len(pending) - len(chunks)
+    if saved > 0:
+        SOURCE_REQUESTS_SAVED.labels('weatherapi').inc(saved)
+    logger.info(f"📦 WeatherAPI bulk: {len(pending)} cities in {len(chunks)} requests ({saved} requests saved)")
+    
+    return [records[city] for city in cities if city in records]
+
+def _fetch_chunk(chunk: List[str], api_key: str, http, url: str,
+                 cache: Optional[ResponseCache] = None,
+                 cache_ttl: Optional[float] = None,
+                 guard: Optional[ProviderGuard] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Fetch up to 50 cities in one bulk request.
+    
+    Returns:
+        Raw records by configured city name (cities the API returned an error
+        for are left out), or None if the request failed
+    """
+    # custom_id is echoed back in each item, so results map to cities even if
+    # the API normalises the name or reorders the items
+    body = {'locations': [{'q': city, 'custom_id': str(index)} for index, city in enumerate(chunk)]}
+    params = {'key': api_key, 'q': 'bulk', 'aqi': 'no'}
+    
+    request = lambda: http.post(url, params=params, json=body, timeout=15)
+    
+    try:
+        response = guard.call(request) if guard else request()
+        response.raise_for_status()
+        items = response.json()['bulk']
+    except ProviderUnavailable as e:
+        logger.debug("Skipped a bulk request of %d cities on WeatherAPI: %s", len(chunk), e)
+        return None
+    except requests.exceptions.RequestException as e:
+        logger.warning("⚠️  Failed to fetch %d cities from the WeatherAPI bulk endpoint: %s", len(chunk), e)
+        return None
+    except (KeyError, ValueError) as e:
+        logger.warning("⚠️  Unexpected bulk response format from WeatherAPI: %s", e)
+        return None
+    
+    records = {}
+    for item in items:
+        query = item.get('query', {})
         try:
-            # Make API request
-            params = {
-                'key': api_key,
-                'q': city,
-                'aqi': 'no'  # We don't need air quality data
-            }
-            
-            response = requests.get(base_url, params=params, timeout=15)
-            response.raise_for_status()  # Raise exception for HTTP errors
-            
-            weather_data = response.json()
-            
-            # Extract relevant data and standardize format
-            record = {
-                'city': weather_data['location']['name'],
-                'temperature': weather_data['current']['temp_c'],
-                'description': weather_data['current']['condition']['text'],
-                'source_provider': 'weatherapi'
-            }
-            
-            data.append(record)
-            
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️  Warning: Failed to fetch data for {city} from WeatherAPI: {e}")
+            city = chunk[int(query['custom_id'])]
+        except (KeyError, ValueError, IndexError):
+            logger.warning("⚠️  WeatherAPI bulk response item without a matching custom_id: %s", query.get('q'))
+            continue
+        
+        if 'error' in query:
+            logger.warning("⚠️  Failed to fetch data for %s from WeatherAPI: %s",
+                           city, query['error'].get('message', query['error']))
             continue
+        
+        try:
+            records[city] = _build_record(query)
         except KeyError as e:
-            print(f"⚠️  Warning: Unexpected response format for {city} from WeatherAPI: {e}")
+            logger.warning("⚠️  Unexpected response format for %s from WeatherAPI: %s", city, e)
             continue
+        if cache:
+            cache.store('weatherapi', city, records[city], response.headers, cache_ttl)
     
-    return data
\ No newline at end of file
+    return records
\ No newline at end of file
@@ -0,0 +1,110 @@
+import socket
+import threading
+from typing import Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+class ConnectionStats:
+    """Thread-safe counters of reused and newly opened HTTP connections."""
+    
+    def __init__(self):
+        self.reused = 0
+        self.opened = 0
+        self.lock = threading.Lock()
+        
+    def record(self, reused: bool) -> None:
+        """Record one request sent on a reused or a freshly opened connection."""
+        with self.lock:
+            if reused:
+                self.reused += 1
+            else:
+                self.opened += 1
+                
+    def snapshot(self) -> Dict[str, int]:
+        """Return the current counts as a plain dict."""
+        with self.lock:
+            return {'reused': self.reused, 'opened': self.opened}
+
+def _counting_pool_class(base_class, stats: ConnectionStats):
+    """Build a connection pool class that reports connection reuse to stats."""
+    
+    class CountingConnectionPool(base_class):
+        def _make_request(self, conn, *args, **kwargs):
+            # A connection without a socket gets a new TCP (and TLS) handshake
+            stats.record(reused=getattr(conn, 'sock', None) is not None)
+            return super()._make_request(conn, *args, **kwargs)
+    
+    return CountingConnectionPool
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools count reused vs. new connections."""
+    
+    def __init__(self, stats: ConnectionStats, socket_options=None, **kwargs):
+        self.stats = stats
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+        
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs['socket_options'] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats),
+        }
+
+def create_http_session(config: Dict[str, Any]) -> requests.Session:
+    """
+    Create the pooled keep-alive session shared by the sources and the shipper.
+    
+    Connection counts are available as session.connection_stats.
+    
+    Args:
+        config: Full application configuration
+    
+    Returns:
+        Configured requests.Session
+    """
+    http_config = config.get('http', {})
+    
+    # Only idempotent requests are retried here; shipping has its own retry loop.
+    # Retry-After is left to the provider guards (src/resilience.py): urllib3 would
+    # otherwise sleep it out and retry 429s before the guard ever saw them
+    retries = Retry(
+        total=http_config.get('max_retries', 2),
+        backoff_factor=http_config.get('backoff_factor', 0.5),
+        status_forcelist=[502, 503, 504],
+        allowed_methods=['GET'],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    
+    session = requests.Session()
+    socket_options = None
+    
+    if http_config.get('keep_alive', True):
+        # TCP keep-alive stops idle pooled connections from being silently dropped
+        socket_options = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+    else:
+        session.headers['Connection'] = 'close'
+    
+    stats = ConnectionStats()
+    adapter = CountingHTTPAdapter(
+        stats,
+        socket_options=socket_options,
+        pool_connections=http_config.get('pool_connections', 10),
+        pool_maxsize=http_config.get('pool_maxsize', 20),
+        max_retries=retries
+    )
+    
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.connection_stats = stats
+    
+    return session
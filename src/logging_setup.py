@@ -0,0 +1,192 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional
+
+LOG_FORMATS = ('text', 'json')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-8s %(name)s: %(message)s'
+
+# Attributes every LogRecord has; anything else was passed via extra= and is emitted as a field
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line, including extra= fields."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limits and samples repeated warnings and errors.
+    
+    Records are grouped by logger, level and message template (the
+    unformatted msg, so "Failed to fetch %s" is one group for all cities).
+    The first 'burst' records of a group in each 'interval' seconds pass;
+    after that only every 'sample_every'-th record passes, annotated with
+    how many similar records were suppressed since the last one. Records
+    below WARNING are never limited.
+    """
+    
+    MAX_GROUPS = 10000
+    
+    def __init__(self, burst: int = 10, interval: float = 60, sample_every: int = 100):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.groups: Dict[Any, list] = {}
+        self.lock = threading.Lock()
+        
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        
+        with self.lock:
+            group = self.groups.get(key)
+            if group is None:
+                if len(self.groups) >= self.MAX_GROUPS:
+                    self.groups.clear()
+                # [window start, records seen in window, suppressed since last pass]
+                group = self.groups[key] = [now, 0, 0]
+            elif now - group[0] >= self.interval:
+                group[0], group[1] = now, 0
+            
+            group[1] += 1
+            excess = group[1] - self.burst
+            
+            if excess > 0 and not (self.sample_every and excess % self.sample_every == 0):
+                group[2] += 1
+                return False
+            
+            suppressed, group[2] = group[2], 0
+        
+        if suppressed:
+            record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+            record.suppressed = suppressed
+        return True
+
+class FieldsFilter(logging.Filter):
+    """Adds fixed fields (e.g. the shard index) to every record."""
+    
+    def __init__(self, fields: Dict[str, Any]):
+        super().__init__()
+        self.fields = dict(fields)
+        
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in self.fields.items():
+            setattr(record, key, value)
+        return True
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+
+def configure_logging(logging_config: Dict[str, Any]) -> logging.handlers.QueueListener:
+    """
+    Route all logging through a bounded queue drained by a background thread.
+    
+    Callers only filter, format and enqueue; writing to the console happens
+    on the listener thread, so slow terminal I/O never blocks the pipeline.
+    If the queue is full, records are dropped rather than waited on.
+    
+    Args:
+        logging_config: The 'logging' config section (level, format, queue_size, rate_limit,
+            fields); the level defaults to the LOG_LEVEL environment variable, then INFO
+    
+    Returns:
+        The running QueueListener (stop it with shutdown_logging())
+    """
+    global _listener, _queue_handler
+    
+    log_format = logging_config.get('format', 'text')
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format} (expected one of {LOG_FORMATS})")
+    
+    level = str(logging_config.get('level', os.getenv('LOG_LEVEL', 'INFO'))).upper()
+    rate_limit = logging_config.get('rate_limit', {})
+    fields = logging_config.get('fields', {})
+    
+    text_format = TEXT_FORMAT
+    if fields:
+        # Fields are extra JSON keys; in text they prefix the logger name, e.g. "[shard=1] main: ..."
+        prefix = ' '.join(f'{key}=%({key})s' for key in fields)
+        text_format = TEXT_FORMAT.replace('%(name)s', f'[{prefix}] %(name)s')
+    
+    shutdown_logging()
+    
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(text_format))
+    
+    log_queue = queue.Queue(maxsize=logging_config.get('queue_size', 10000))
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(RateLimitFilter(
+        burst=rate_limit.get('burst', 10),
+        interval=rate_limit.get('interval', 60),
+        sample_every=rate_limit.get('sample_every', 100)
+    ))
+    if fields:
+        _queue_handler.addFilter(FieldsFilter(fields))
+    
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    
+    _listener = _QueueListener(log_queue, stream_handler)
+    _listener.start()
+    return _listener
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the queue handler installed by configure_logging()."""
+    global _listener, _queue_handler
+    
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+    
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    
+    if _queue_handler is not None:
+        if _queue_handler.dropped:
+            sys.stderr.write(f"{_queue_handler.dropped} log records were dropped because the log queue was full\n")
+        _queue_handler = None
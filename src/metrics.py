@@ -0,0 +1,307 @@
+import abc
+import bisect
+import json
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Latency buckets in seconds, from cache hits to slow API calls and shipments
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+class _Metric(abc.ABC):
+    """Base class: a named metric with one child per combination of label values."""
+    
+    metric_type = ''
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 registry: Optional['MetricsRegistry'] = None):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], Any] = {}
+        self.lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+        
+    def labels(self, *values: str):
+        """Return the child for these label values, creating it on first use."""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self.lock:
+                child = self.children.setdefault(values, self._new_child())
+        return child
+    
+    @abc.abstractmethod
+    def _new_child(self):
+        """Create the per-label-values child holding this metric's value."""
+    
+    def render(self) -> List[str]:
+        with self.lock:
+            children = sorted(self.children.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.metric_type}"]
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+    
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+class _CounterChild:
+    __slots__ = ('value', 'lock')
+    
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+        
+    def inc(self, amount: float = 1) -> None:
+        with self.lock:
+            self.value += amount
+            
+    def get(self) -> float:
+        return self.value
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests or records."""
+    
+    metric_type = 'counter'
+    
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter."""
+        self.labels().inc(amount)
+
+class _GaugeChild:
+    __slots__ = ('value', 'function')
+    
+    def __init__(self):
+        self.value = 0
+        self.function: Optional[Callable[[], float]] = None
+        
+    def set(self, value: float) -> None:
+        self.value = value
+        
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Compute the value at scrape time instead of on the hot path."""
+        self.function = function
+        
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return self.function()
+            except Exception:
+                return float('nan')
+        return self.value
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. a queue depth."""
+    
+    metric_type = 'gauge'
+    
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+    
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+        
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        self.labels().set_function(function)
+
+class _Timer:
+    __slots__ = ('child', 'started')
+    
+    def __init__(self, child: '_HistogramChild'):
+        self.child = child
+        
+    def __enter__(self) -> '_Timer':
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.child.observe(time.perf_counter() - self.started)
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'bucket_counts', 'sum', 'count', 'lock')
+    
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+        
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self.lock:
+            self.bucket_counts[index] += 1
+            self.sum += value
+            self.count += 1
+            
+    def time(self) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self)
+    
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self.lock:
+            return list(self.bucket_counts), self.sum, self.count
+
+class Histogram(_Metric):
+    """Distribution of observed values (latencies) in cumulative buckets."""
+    
+    metric_type = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: Optional['MetricsRegistry'] = None):
+        self.upper_bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames, registry)
+        
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+    
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+        
+    def time(self) -> _Timer:
+        return self.labels().time()
+    
+    def _render_child(self, values: Tuple[str, ...], child: _HistogramChild) -> List[str]:
+        bucket_counts, total, count = child.snapshot()
+        lines = []
+        cumulative = 0
+        for upper_bound, bucket_count in zip(self.upper_bounds + (float('inf'),), bucket_counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(upper_bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+    
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.lock = threading.Lock()
+        
+    def register(self, metric: _Metric) -> None:
+        with self.lock:
+            self.metrics.append(metric)
+            
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format (0.0.4)."""
+        with self.lock:
+            metrics = list(self.metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+# Pipeline metrics
+SOURCE_FETCH_SECONDS = Histogram('weather_source_fetch_seconds', 'Time to fetch all data from one source', ['source'])
+SOURCE_FETCH_ERRORS = Counter('weather_source_fetch_errors_total', 'Source fetches that raised an error', ['source'])
+SOURCE_RECORDS = Counter('weather_source_records_total', 'Raw records fetched per source', ['source'])
+SOURCE_REQUESTS_SAVED = Counter('weather_source_requests_saved_total',
+                                'Per-city API requests avoided by bulk (multi-city) requests', ['source'])
+# Labelled by source only: a city label would add a histogram per city, unbounded for large city lists
+CITY_FETCH_SECONDS = Histogram('weather_city_fetch_seconds', 'Time to fetch one city, including cache lookups',
+                               ['source'])
+CITY_FETCH_ERRORS = Counter('weather_city_fetch_errors_total', 'City fetches that failed', ['source'])
+TRANSFORM_SECONDS = Histogram('weather_transform_seconds', 'Time to transform one batch of raw records')
+TRANSFORM_REJECTED = Counter('weather_transform_rejected_records_total', 'Raw records rejected by the transformer')
+SERIALIZE_SECONDS = Histogram('weather_serialize_seconds', 'Time to serialize records into NDJSON payloads')
+COMPRESS_SECONDS = Histogram('weather_compress_seconds', 'Time to gzip one shipping payload')
+# Labelled raw (serialized) and sent (on the wire); their ratio is the compression ratio
+PAYLOAD_BYTES = Counter('weather_ship_payload_bytes_total', 'Shipping payload bytes before and after compression',
+                        ['stage'])
+SHIP_SECONDS = Histogram('weather_ship_request_seconds', 'Latency of one Logz.io shipping request', ['outcome'])
+SHIPPED_RECORDS = Counter('weather_shipped_records_total', 'Records accepted by Logz.io')
+SHIP_RETRIES = Counter('weather_ship_retries_total', 'Batches re-sent after a failed shipping attempt')
+UNSHIPPED_RECORDS = Counter('weather_unshipped_records_total', 'Records that failed every shipping attempt')
+QUEUE_DEPTH = Gauge('weather_shipping_queue_depth', 'Batches waiting in the background shipping queue')
+SPOOL_PENDING_BYTES = Gauge('weather_spool_pending_bytes', 'Unshipped bytes in the on-disk spool')
+CYCLE_SECONDS = Histogram('weather_polling_cycle_seconds', 'Duration of one polling cycle')
+SCHEDULER_LAG_SECONDS = Histogram('weather_scheduler_lag_seconds', 'Delay between a cycle deadline and its start')
+SCHEDULER_MISSED_TICKS = Counter('weather_scheduler_missed_ticks_total',
+                                 'Cycle deadlines coalesced or skipped because a cycle overran')
+CIRCUIT_STATE = Gauge('weather_circuit_state', 'Provider circuit state (0 closed, 1 half-open, 2 open)', ['provider'])
+CIRCUIT_REJECTED = Counter('weather_circuit_rejected_requests_total',
+                           'Requests not sent because the provider circuit was open', ['provider'])
+PROVIDER_THROTTLED = Counter('weather_provider_throttled_total', '429 Too Many Requests responses received',
+                             ['provider'])
+SHARD_UP = Gauge('weather_shard_up', 'Whether the shard worker process is running (sharded mode)', ['shard'])
+SHARD_RESTARTS = Counter('weather_shard_restarts_total', 'Shard worker processes restarted after exiting',
+                         ['shard'])
+
+def start_metrics_server(host: str = '127.0.0.1', port: int = 9108,
+                         registry: MetricsRegistry = REGISTRY,
+                         health: Optional[Callable[[], Tuple[bool, Dict[str, Any]]]] = None) -> 'ThreadingHTTPServer':
+    """
+    Serve the registry at http://host:port/metrics from a daemon thread.
+    
+    Args:
+        host: Interface to bind (local only by default)
+        port: TCP port (0 picks a free port)
+        registry: Metrics to expose (any object with a render() method returning the text format)
+        health: Optional function returning (healthy, details), served as JSON at /health
+            with status 200 when healthy and 503 otherwise
+    
+    Returns:
+        The running server; call shutdown() and server_close() to stop it
+    """
+    # Imported here so processes that never serve metrics do not pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            path = self.path.split('?')[0]
+            if path == '/metrics':
+                self.send_body(200, registry.render().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+            elif path == '/health' and health is not None:
+                healthy, details = health()
+                self.send_body(200 if healthy else 503, json.dumps(details).encode('utf-8'), 'application/json')
+            else:
+                self.send_error(404)
+                
+        def send_body(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            
+        def log_message(self, format: str, *args: Any) -> None:
+            # Scrapes every few seconds would otherwise flood the console
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,309 @@
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from .metrics import CIRCUIT_STATE, CIRCUIT_REJECTED, PROVIDER_THROTTLED
+
+if TYPE_CHECKING:
+    from .data_sources.concurrency import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+
+# Values of the weather_circuit_state gauge
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class ProviderUnavailable(Exception):
+    """Raised instead of sending a request the provider cannot take right now."""
+
+class CircuitOpenError(ProviderUnavailable):
+    """The provider's circuit is open (or its half-open probe is already in flight)."""
+
+class ThrottledError(ProviderUnavailable):
+    """The provider asked for a pause (429 Retry-After) longer than callers may wait."""
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+    
+    After failure_threshold consecutive failures the circuit opens and
+    requests are rejected without being sent. Once open_seconds have passed
+    it turns half-open and lets a single probe request through: success
+    closes the circuit, failure opens it again for twice as long (up to
+    max_open_seconds).
+    
+    Args:
+        name: Provider name, used in logs and metrics
+        failure_threshold: Consecutive failures that open the circuit
+        open_seconds: How long the circuit first stays open
+        max_open_seconds: Cap on the open period as failed probes double it
+        clock: Monotonic time source
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, open_seconds: float = 30.0,
+                 max_open_seconds: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_open_seconds = float(open_seconds)
+        self.max_open_seconds = max(float(max_open_seconds), self.base_open_seconds)
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.open_seconds = self.base_open_seconds
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(_STATE_VALUES[CLOSED])
+        
+    def retry_in(self) -> float:
+        """Seconds until a request may be sent (0 unless the circuit is open)."""
+        with self.lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.open_seconds - self.clock())
+        
+    def check(self) -> None:
+        """Raise CircuitOpenError if the circuit is open and no probe is due yet (claims nothing)."""
+        if self.retry_in() > 0:
+            self._reject()
+            
+    def before_call(self) -> None:
+        """
+        Claim permission to send one request.
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with its probe in flight
+        """
+        with self.lock:
+            if self.state == OPEN and self.clock() >= self.opened_at + self.open_seconds:
+                self._set_state(HALF_OPEN)
+            
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return
+        
+        self._reject()
+        
+    def _reject(self) -> None:
+        CIRCUIT_REJECTED.labels(self.name).inc()
+        raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+    
+    def record_success(self) -> None:
+        with self.lock:
+            if self.state != CLOSED:
+                logger.info("🔌 %s recovered, circuit closed", self.name)
+            self.failures = 0
+            self.probe_in_flight = False
+            self.open_seconds = self.base_open_seconds
+            self._set_state(CLOSED)
+            
+    def record_failure(self) -> None:
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.open_seconds = min(self.open_seconds * 2, self.max_open_seconds)
+                self._open()
+                logger.warning("🚫 %s probe failed, circuit open for another %.0fs", self.name, self.open_seconds)
+            elif self.state == CLOSED:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self._open()
+                    logger.warning("🚫 %s failed %d times in a row, circuit open for %.0fs",
+                                   self.name, self.failures, self.open_seconds)
+            # Failures of requests sent before the circuit opened change nothing
+            
+    def _open(self) -> None:
+        self.opened_at = self.clock()
+        self.probe_in_flight = False
+        self._set_state(OPEN)
+        
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+def parse_retry_after(value: Optional[str], default: float) -> float:
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date).
+    
+    Args:
+        value: Header value, or None if absent
+        default: Delay to use if the header is missing or malformed
+    
+    Returns:
+        Delay in seconds
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+class ProviderGuard:
+    """
+    Resilience wrapper for one provider's HTTP calls.
+    
+    Every request goes through call(), which rejects it while the circuit
+    is open, waits out a Retry-After pause (or rejects the request if the
+    pause is longer than max_retry_wait), takes a token from the rate
+    limiter, and feeds the response back:
+    connection errors and 5xx responses count as failures, and a 429 pauses
+    the provider and halves the rate limiter's rate, which then recovers
+    step by step with each successful request.
+    
+    Args:
+        breaker: The provider's circuit breaker
+        rate_limiter: Optional rate limiter acquired before each request and slowed down on 429s
+        max_retry_wait: Longest Retry-After pause a request waits out, in seconds
+        default_retry_after: Pause after a 429 without a Retry-After header, in seconds
+        clock: Monotonic time source
+        sleep: Sleep function
+    """
+    
+    def __init__(self, breaker: CircuitBreaker, rate_limiter: Optional['RateLimiter'] = None,
+                 max_retry_wait: float = 10.0, default_retry_after: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.name = breaker.name
+        self.breaker = breaker
+        self.rate_limiter = rate_limiter
+        self.max_retry_wait = max_retry_wait
+        self.default_retry_after = default_retry_after
+        self.clock = clock
+        self.sleep = sleep
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+        
+    def unavailable_reason(self) -> Optional[str]:
+        """Why requests to the provider would be rejected right now, or None if they would not."""
+        retry_in = self.breaker.retry_in()
+        if retry_in > 0:
+            return f"circuit open, next probe in {retry_in:.0f}s"
+        
+        paused_for = self.paused_until - self.clock()
+        if paused_for > self.max_retry_wait:
+            return f"rate limited for another {paused_for:.0f}s"
+        return None
+    
+    def call(self, send: Callable[[], Any]) -> Any:
+        """
+        Send one request through the guard.
+        
+        Args:
+            send: Sends the request and returns the response
+        
+        Returns:
+            The response (HTTP errors are left to the caller)
+        
+        Raises:
+            ProviderUnavailable: If the request was not sent
+        """
+        self._wait_for_pause()
+        
+        if self.rate_limiter:
+            # Fail fast rather than wait for a token, and check again once it is granted
+            self.breaker.check()
+            self.rate_limiter.acquire()
+        self.breaker.before_call()
+        
+        try:
+            response = send()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        
+        self.record_response(response)
+        return response
+    
+    def record_response(self, response) -> None:
+        """Update the circuit and rate from a response's status."""
+        status = response.status_code
+        
+        if status == 429:
+            # The provider is up, just overloaded: slow down rather than trip the circuit
+            self.breaker.record_success()
+            self._throttle(parse_retry_after(response.headers.get('Retry-After'), self.default_retry_after))
+        elif status >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            if self.rate_limiter:
+                self.rate_limiter.speed_up()
+                
+    def _throttle(self, retry_after: float) -> None:
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock() + retry_after)
+        if self.rate_limiter:
+            self.rate_limiter.slow_down()
+        
+        PROVIDER_THROTTLED.labels(self.name).inc()
+        rate = f", rate now {self.rate_limiter.rate:.2f}/s" if self.rate_limiter else ""
+        logger.warning("🐢 %s is rate limiting (429), pausing requests for %.0fs%s", self.name, retry_after, rate)
+        
+    def _wait_for_pause(self) -> None:
+        delay = self.paused_until - self.clock()
+        if delay <= 0:
+            return
+        if delay > self.max_retry_wait:
+            raise ThrottledError(f"{self.name} asked to pause for another {delay:.0f}s")
+        self.sleep(delay)
+
+# Settings applied to guards created after configure_resilience()
+_settings: Dict[str, float] = {
+    'failure_threshold': 5,
+    'open_seconds': 30.0,
+    'max_open_seconds': 300.0,
+    'max_retry_wait': 10.0,
+    'default_retry_after': 5.0
+}
+
+# Guards live for the whole process so circuit state holds across polling cycles
+_guards: Dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+def configure_resilience(config: Dict[str, Any]) -> None:
+    """
+    Apply the 'resilience' config section, with the circuit threshold from
+    'data_processing.max_consecutive_failures'. Existing guards are replaced.
+    
+    Args:
+        config: Full application configuration
+    """
+    resilience_config = config.get('resilience', {})
+    
+    with _guards_lock:
+        _settings['failure_threshold'] = config.get('data_processing', {}).get('max_consecutive_failures', 5)
+        for key in ('open_seconds', 'max_open_seconds', 'max_retry_wait', 'default_retry_after'):
+            if key in resilience_config:
+                _settings[key] = float(resilience_config[key])
+        _guards.clear()
+
+def get_provider_guard(provider: str, rate_limiter: Optional['RateLimiter'] = None) -> ProviderGuard:
+    """
+    Get the shared guard for a provider, creating it on first use.
+    
+    Args:
+        provider: Provider name ('openweathermap', 'weatherapi', 'logz_io', ...)
+        rate_limiter: The provider's current rate limiter (None for no limit)
+    
+    Returns:
+        The provider's ProviderGuard
+    """
+    with _guards_lock:
+        guard = _guards.get(provider)
+        if guard is None:
+            breaker = CircuitBreaker(provider, int(_settings['failure_threshold']),
+                                     _settings['open_seconds'], _settings['max_open_seconds'])
+            guard = _guards[provider] = ProviderGuard(breaker, max_retry_wait=_settings['max_retry_wait'],
+                                                      default_retry_after=_settings['default_retry_after'])
+        guard.rate_limiter = rate_limiter
+        return guard
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from .metrics import SCHEDULER_LAG_SECONDS, SCHEDULER_MISSED_TICKS
+
+logger = logging.getLogger(__name__)
+
+MISSED_TICK_POLICIES = ('coalesce', 'skip')
+
+class Tick(NamedTuple):
+    """One scheduled run: when it was due, how late it fired and how many deadlines it replaced."""
+    deadline: float
+    lag: float
+    missed: int
+
+class DeadlineScheduler:
+    """
+    Fires on fixed monotonic-clock deadlines: start, start + interval, ...
+    
+    The period does not include the time the work takes, so cycles do not
+    drift. When a cycle overruns one or more deadlines they are not run
+    back to back: with the 'coalesce' policy the overdue deadlines collapse
+    into one tick that fires immediately, with 'skip' they are dropped and
+    the next tick waits for the next deadline still in the future. Either
+    way the grid stays aligned to the start time.
+    
+    Waits end as soon as the stop event is set.
+    """
+    
+    def __init__(self, interval: float, missed_tick_policy: str = 'coalesce',
+                 clock: Callable[[], float] = time.monotonic):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if missed_tick_policy not in MISSED_TICK_POLICIES:
+            raise ValueError(f"Unknown missed tick policy: {missed_tick_policy} "
+                             f"(expected one of {MISSED_TICK_POLICIES})")
+        self.interval = float(interval)
+        self.missed_tick_policy = missed_tick_policy
+        self.clock = clock
+        self.next_deadline: Optional[float] = None
+        
+    def _schedule(self) -> int:
+        """Move the next deadline past any overrun; returns the number of deadlines dropped."""
+        now = self.clock()
+        
+        if self.next_deadline is None:
+            # The first tick fires immediately
+            self.next_deadline = now
+            return 0
+        
+        overdue = now - self.next_deadline
+        if overdue <= 0:
+            return 0
+        
+        if self.missed_tick_policy == 'coalesce':
+            # Fire now, for the latest deadline that has already passed
+            missed = int(overdue // self.interval)
+        else:
+            # Wait for the first deadline still in the future
+            missed = int(overdue // self.interval) + 1
+        
+        self.next_deadline += missed * self.interval
+        return missed
+    
+    def _fire(self, missed: int) -> Tick:
+        tick = Tick(self.next_deadline, max(0.0, self.clock() - self.next_deadline), missed)
+        self.next_deadline += self.interval
+        
+        SCHEDULER_LAG_SECONDS.observe(tick.lag)
+        if missed:
+            SCHEDULER_MISSED_TICKS.inc(missed)
+            logger.warning("⏭️  Cycle overran its interval, %s %d missed tick(s)",
+                           'coalesced' if self.missed_tick_policy == 'coalesce' else 'skipped', missed)
+        return tick
+    
+    def wait(self, stop_event: threading.Event) -> Optional[Tick]:
+        """
+        Block until the next deadline.
+        
+        Args:
+            stop_event: Event that ends the wait early (e.g. set by a signal handler)
+        
+        Returns:
+            The tick, or None if stop_event was set
+        """
+        missed = self._schedule()
+        delay = self.next_deadline - self.clock()
+        
+        stopped = stop_event.wait(delay) if delay > 0 else stop_event.is_set()
+        if stopped:
+            return None
+        return self._fire(missed)
+    
+    async def wait_async(self, stop_event: asyncio.Event) -> Optional[Tick]:
+        """Asyncio version of wait()."""
+        missed = self._schedule()
+        delay = self.next_deadline - self.clock()
+        
+        if delay > 0:
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        
+        if stop_event.is_set():
+            return None
+        return self._fire(missed)
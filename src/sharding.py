@@ -0,0 +1,413 @@
+import bisect
+import copy
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import signal
+import threading
+import time
+from typing import List, Dict, Any, Callable, Iterable, Optional, Tuple
+
+from .metrics import REGISTRY, SHARD_UP, SHARD_RESTARTS, start_metrics_server
+
+logger = logging.getLogger(__name__)
+
+# Per-process state files each shard needs its own copy of, by source type and their defaults
+SHARD_STATE_FILES = {
+    'csv': {'checkpoint_file': './csv_checkpoint.json', 'manifest_file': './csv_manifest.json'},
+    'openweathermap': {'city_id_file': './owm_city_ids.json'}
+}
+
+# A worker that stayed up this long before exiting restarts without backoff
+STABLE_SECONDS = 60
+
+def _hash(key: str) -> int:
+    """Stable 64-bit hash (unlike hash(), the same in every process)."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys (city names, file paths) to shards.
+    
+    Each shard owns 'replicas' points on the ring, so keys spread evenly and
+    changing the shard count only moves about 1/N of them to another shard.
+    """
+    
+    def __init__(self, shard_count: int, replicas: int = 100):
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        points = sorted((_hash(f"shard-{shard}#{replica}"), shard)
+                        for shard in range(shard_count) for replica in range(replicas))
+        self.shard_count = shard_count
+        self.hashes = [point for point, _ in points]
+        self.shards = [shard for _, shard in points]
+        
+    def shard_for(self, key: str) -> int:
+        """Return the shard that owns a key."""
+        index = bisect.bisect(self.hashes, _hash(key)) % len(self.hashes)
+        return self.shards[index]
+
+@functools.lru_cache(maxsize=None)
+def get_hash_ring(shard_count: int) -> HashRing:
+    """Shared ring for a shard count."""
+    return HashRing(shard_count)
+
+def owns(key: str, shard: Dict[str, int]) -> bool:
+    """Whether the shard described by {'index': i, 'count': n} owns a key."""
+    return get_hash_ring(shard['count']).shard_for(key) == shard['index']
+
+def shard_path(path: str, shard_index: int) -> str:
+    """Per-shard variant of a state file path: ./csv_checkpoint.json -> ./csv_checkpoint.shard-1.json."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.shard-{shard_index}{extension}"
+
+def shard_config(config: Dict[str, Any], shard_index: int, shard_count: int) -> Dict[str, Any]:
+    """
+    Derive one shard worker's configuration from the full configuration.
+    
+    - 'cities' lists keep only the cities the shard owns on the hash ring.
+    - CSV sources reading a directory or glob keep only the files the shard
+      owns (see 'shard' in csv_source); any other source that cannot be
+      split, such as a single CSV file, runs whole on the shard owning it.
+    - Provider rate limits are divided between the shards, so together
+      they stay within the quota.
+    - State files (checkpoints, manifests, city IDs, cache, recovery file,
+      spool) get per-shard paths, and the metrics server a per-shard port
+      (metrics.port + 1 + shard index).
+    
+    Args:
+        config: Full application configuration
+        shard_index: This shard's index (0 .. shard_count - 1)
+        shard_count: Number of shards
+    
+    Returns:
+        New configuration dict (the original is not modified)
+    """
+    config = copy.deepcopy(config)
+    ring = get_hash_ring(shard_count)
+    shard = {'index': shard_index, 'count': shard_count}
+    
+    for position, source in enumerate(config.get('data_sources', [])):
+        source_type = source.get('type')
+        file_path = source.get('file_path')
+        
+        if 'cities' in source:
+            source['cities'] = [city for city in source['cities'] if ring.shard_for(city) == shard_index]
+        elif source_type == 'csv' and file_path and (os.path.isdir(file_path) or
+                                                     any(char in file_path for char in '*?[')):
+            source['shard'] = shard
+        else:
+            key = os.path.abspath(file_path) if file_path else f"{position}:{source_type}"
+            if ring.shard_for(key) != shard_index:
+                source['enabled'] = False
+        
+        if source.get('requests_per_second'):
+            source['requests_per_second'] = source['requests_per_second'] / shard_count
+        
+        for key, default in SHARD_STATE_FILES.get(source_type, {}).items():
+            source[key] = shard_path(source.get(key, default), shard_index)
+    
+    application = config.setdefault('application', {})
+    application['recovery_file'] = shard_path(application.get('recovery_file', './unsent_data.jsonl'), shard_index)
+    
+    spool = config.setdefault('spool', {})
+    spool['directory'] = os.path.join(spool.get('directory', './spool'), f'shard-{shard_index}')
+    
+    cache = config.setdefault('cache', {})
+    cache['path'] = shard_path(cache.get('path', './weather_cache.sqlite3'), shard_index)
+    
+    metrics = config.setdefault('metrics', {})
+    metrics['port'] = metrics.get('port', 9108) + 1 + shard_index
+    
+    config.setdefault('logging', {}).setdefault('fields', {})['shard'] = shard_index
+    return config
+
+def adopt_unsharded_recovery_file(config: Dict[str, Any]) -> int:
+    """
+    Hand the recovery file of an earlier unsharded run over to shard 0.
+    
+    Shard workers only replay their own per-shard recovery files, so records
+    an unsharded run saved to application.recovery_file would never be
+    shipped. They are appended to shard 0's recovery file (for an
+    interrupted replay, only the part not yet replayed) and the unsharded
+    files are removed. Must run before any worker starts.
+    
+    Args:
+        config: Full application configuration
+    
+    Returns:
+        Number of bytes handed over (0 if there was nothing to adopt)
+    """
+    recovery_file = config.get('application', {}).get('recovery_file', './unsent_data.jsonl')
+    replaying_file = recovery_file + '.replaying'
+    offset_file = replaying_file + '.offset'
+    
+    try:
+        with open(offset_file, 'r') as f:
+            replayed_bytes = int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        replayed_bytes = 0
+    
+    # The file being replayed is older than the one still being appended to
+    pending = [(path, offset) for path, offset in ((replaying_file, replayed_bytes), (recovery_file, 0))
+               if os.path.exists(path) and os.path.getsize(path) > offset]
+    adopted = 0
+    
+    if pending:
+        target = shard_path(recovery_file, 0)
+        with open(target, 'ab') as out:
+            for path, offset in pending:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    shutil.copyfileobj(f, out)
+                adopted += os.path.getsize(path) - offset
+            out.flush()
+            os.fsync(out.fileno())
+        logger.info(f"♻️  Handed {adopted} bytes of unsharded recovery data over to shard 0 ({target})")
+    
+    for path in (recovery_file, replaying_file, offset_file):
+        if os.path.exists(path):
+            os.remove(path)
+    
+    return adopted
+
+def merge_metrics(sources: Iterable[Tuple[Optional[str], str]]) -> str:
+    """
+    Merge Prometheus text outputs into one, adding a shard label to each sample.
+    
+    Args:
+        sources: (shard label or None to leave samples as they are, text) pairs
+    
+    Returns:
+        Combined text with each metric's HELP and TYPE lines once
+    """
+    families: Dict[str, List[str]] = {}
+    
+    for shard, text in sources:
+        family = None
+        for line in text.splitlines():
+            if line.startswith('# '):
+                parts = line.split(' ', 3)
+                family = parts[2]
+                header = families.setdefault(family, [])
+                if len(parts) > 2 and line not in header[:2]:
+                    header.append(line)
+                continue
+            if not line or family is None:
+                continue
+            if shard is not None:
+                name_end = min(index for index in (line.find('{'), line.find(' ')) if index >= 0)
+                if line[name_end] == '{':
+                    line = f'{line[:name_end]}{{shard="{shard}",{line[name_end + 1:]}'
+                else:
+                    line = f'{line[:name_end]}{{shard="{shard}"}}{line[name_end:]}'
+            families[family].append(line)
+    
+    return '\n'.join(line for lines in families.values() for line in lines) + '\n'
+
+class ShardWorker:
+    """Supervisor-side state of one shard: its current process and restart history."""
+    
+    def __init__(self, index: int):
+        self.index = index
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.restart_delay = 0.0
+        self.next_start = 0.0
+
+class ShardSupervisor:
+    """
+    Runs the pipeline in shard_count worker processes and keeps them running.
+    
+    Each worker runs target(config, shard_index, shard_count, *target_args)
+    in a fresh (spawned) interpreter, so JSON parsing and transforms of
+    different shards do not share a GIL. At most one process per shard
+    exists at any time: a worker that exits is only replaced once it has
+    been reaped, after a delay that doubles (up to max_restart_delay) while
+    it keeps exiting within STABLE_SECONDS of starting.
+    
+    Before the workers start, the recovery file of an earlier unsharded run
+    is handed over to shard 0 (see adopt_unsharded_recovery_file).
+    
+    With metrics enabled, the supervisor serves the workers' metrics
+    combined (with a shard label) at metrics.port, and their combined
+    health at /health.
+    
+    Args:
+        config: Full application configuration
+        shard_count: Number of worker processes
+        target: Worker entry point
+        target_args: Extra arguments for the entry point
+        restart_delay: Delay before restarting a worker that exited
+        max_restart_delay: Cap on the restart delay
+    """
+    
+    def __init__(self, config: Dict[str, Any], shard_count: int, target: Callable[..., None],
+                 target_args: Tuple = (), restart_delay: float = 1.0, max_restart_delay: float = 60.0):
+        self.config = config
+        self.shard_count = shard_count
+        self.target = target
+        self.target_args = target_args
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.workers = [ShardWorker(index) for index in range(shard_count)]
+        self.stop_event = threading.Event()
+        self.metrics_server = None
+        self.context = None
+        
+    def run(self) -> None:
+        """Start the workers and supervise them until SIGINT/SIGTERM, then stop them."""
+        # Imported here so single-process runs never load multiprocessing
+        import multiprocessing
+        
+        # Spawned workers do not inherit this process's threads (log listener, metrics server)
+        self.context = multiprocessing.get_context('spawn')
+        
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.signal_handler)
+        
+        adopt_unsharded_recovery_file(self.config)
+        
+        logger.info(f"🧩 Starting {self.shard_count} shard workers")
+        for worker in self.workers:
+            self.start_worker(worker)
+        
+        metrics_config = self.config.get('metrics', {})
+        if metrics_config.get('enabled', False):
+            self.metrics_server = start_metrics_server(
+                metrics_config.get('host', '127.0.0.1'),
+                metrics_config.get('port', 9108),
+                registry=self,
+                health=self.health
+            )
+            host, port = self.metrics_server.server_address[:2]
+            logger.info(f"📈 Combined shard metrics at http://{host}:{port}/metrics, health at /health")
+        
+        while not self.stop_event.wait(0.5):
+            self.check_workers()
+        
+        self.stop_workers()
+        
+        if self.metrics_server:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            
+    def signal_handler(self, signum, frame):
+        logger.info(f"🛑 Received signal {signum}, stopping shard workers...")
+        self.stop_event.set()
+        
+    def start_worker(self, worker: ShardWorker) -> None:
+        worker.process = self.context.Process(
+            target=self.target,
+            args=(self.config, worker.index, self.shard_count) + tuple(self.target_args),
+            name=f'shard-{worker.index}'
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        SHARD_UP.labels(str(worker.index)).set(1)
+        logger.info(f"▶️  Shard {worker.index} started (pid {worker.process.pid})")
+        
+    def check_workers(self) -> None:
+        """Reap workers that exited and restart them once their delay has passed."""
+        now = time.monotonic()
+        
+        for worker in self.workers:
+            if worker.process is not None and not worker.process.is_alive():
+                worker.process.join()
+                SHARD_UP.labels(str(worker.index)).set(0)
+                
+                if now - worker.started_at >= STABLE_SECONDS:
+                    worker.restart_delay = self.restart_delay
+                else:
+                    worker.restart_delay = min(max(worker.restart_delay * 2, self.restart_delay),
+                                               self.max_restart_delay)
+                worker.next_start = now + worker.restart_delay
+                logger.warning("💥 Shard %d exited with code %s, restarting in %.0fs",
+                               worker.index, worker.process.exitcode, worker.restart_delay)
+                worker.process = None
+            
+            if worker.process is None and now >= worker.next_start and not self.stop_event.is_set():
+                worker.restarts += 1
+                SHARD_RESTARTS.labels(str(worker.index)).inc()
+                self.start_worker(worker)
+                
+    def stop_workers(self) -> None:
+        """Ask every worker to shut down gracefully (SIGTERM), killing those that do not in time."""
+        shutdown_timeout = self.config.get('application', {}).get('shutdown_timeout', 30)
+        running = [worker.process for worker in self.workers if worker.process is not None]
+        
+        for process in running:
+            if process.is_alive():
+                process.terminate()
+        
+        # Workers drain their own shipping queues within shutdown_timeout
+        deadline = time.monotonic() + shutdown_timeout + 5
+        for process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("⏰ Shard process %s did not stop in time, killing it", process.pid)
+                process.kill()
+                process.join()
+        
+        for worker in self.workers:
+            SHARD_UP.labels(str(worker.index)).set(0)
+        logger.info("👋 All shard workers stopped")
+        
+    def worker_url(self, worker: ShardWorker, path: str) -> str:
+        metrics_config = self.config.get('metrics', {})
+        host = metrics_config.get('host', '127.0.0.1')
+        if host in ('', '0.0.0.0'):
+            host = '127.0.0.1'
+        return f"http://{host}:{metrics_config.get('port', 9108) + 1 + worker.index}{path}"
+    
+    def fetch_worker(self, worker: ShardWorker, path: str) -> Tuple[int, str]:
+        """GET a path from a worker's metrics server; returns (status, body), status 0 if unreachable."""
+        import urllib.error
+        import urllib.request
+        
+        try:
+            with urllib.request.urlopen(self.worker_url(worker, path), timeout=2) as response:
+                return response.status, response.read().decode('utf-8')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8')
+        except (OSError, ValueError):
+            return 0, ''
+        
+    def render(self) -> str:
+        """Workers' metrics with a shard label, plus the supervisor's own (weather_shard_*)."""
+        sources = [(None, REGISTRY.render())]
+        for worker in self.workers:
+            if worker.process is not None:
+                status, text = self.fetch_worker(worker, '/metrics')
+                if status == 200:
+                    sources.append((str(worker.index), text))
+        return merge_metrics(sources)
+    
+    def health(self) -> Tuple[bool, Dict[str, Any]]:
+        """Healthy if every worker is running and reports itself healthy."""
+        shards = []
+        for worker in self.workers:
+            process = worker.process
+            entry = {
+                'shard': worker.index,
+                'pid': process.pid if process is not None else None,
+                'alive': process is not None and process.is_alive(),
+                'restarts': worker.restarts,
+                'healthy': False
+            }
+            if entry['alive']:
+                status, body = self.fetch_worker(worker, '/health')
+                entry['healthy'] = status == 200
+                if body:
+                    try:
+                        entry['worker'] = json.loads(body)
+                    except ValueError:
+                        pass
+            shards.append(entry)
+        
+        healthy = all(entry['healthy'] for entry in shards)
+        return healthy, {'status': 'ok' if healthy else 'degraded', 'shards': shards}
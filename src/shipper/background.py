@@ -0,0 +1,152 @@
+import logging
+import queue
+import threading
+from typing import List, Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FULL_POLICIES = ('block', 'drop_oldest', 'spill')
+
+class ShippingWorker(threading.Thread):
+    """
+    Background thread that ships queued record batches so retries never delay polling.
+    
+    Each queued item is one cycle's records. When the queue is full, submit()
+    applies the configured policy: 'block' waits for space, 'drop_oldest'
+    discards the oldest queued item, and 'spill' hands the new records to the
+    spill callback (e.g. to persist them on disk) instead of queueing them.
+    
+    A batch may come with an on_handed_off callback, called with the ship
+    callback's result once the batch was shipped, or with True once it was
+    spilled. It is not called for dropped batches or batches left queued at
+    stop(), so e.g. source read positions are only saved for records that
+    were not lost.
+    """
+    
+    def __init__(self, ship: Callable[[List[Dict[str, Any]]], bool],
+                 spill: Callable[[List[Dict[str, Any]]], None],
+                 queue_size: int = 10, full_policy: str = 'drop_oldest'):
+        super().__init__(name='logz-shipper', daemon=True)
+        
+        if full_policy not in QUEUE_FULL_POLICIES:
+            raise ValueError(f"Unknown queue_full_policy: {full_policy} (expected one of {QUEUE_FULL_POLICIES})")
+        
+        self.ship = ship
+        self.spill = spill
+        self.full_policy = full_policy
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.stop_event = threading.Event()
+        # Set once stop() gives up waiting: the worker takes no more batches
+        self.halt_event = threading.Event()
+        # Held while taking a batch, so stop() never drains the queue mid-take
+        self.take_lock = threading.Lock()
+        self.in_flight = 0
+        self.dropped_records = 0
+        self.spilled_records = 0
+        
+    def submit(self, records: List[Dict[str, Any]],
+               on_handed_off: Optional[Callable[[bool], None]] = None) -> None:
+        """Queue one batch of records for shipping, applying the queue-full policy."""
+        item = (records, on_handed_off)
+        
+        if self.full_policy == 'block':
+            while True:
+                try:
+                    self.queue.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    if not self.is_alive():
+                        raise RuntimeError("Shipping worker is not running")
+        
+        try:
+            self.queue.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        
+        if self.full_policy == 'spill':
+            self.spilled_records += len(records)
+            logger.warning("💾 Shipping queue full, spilling %d records to disk", len(records))
+            self.spill(records)
+            if on_handed_off:
+                on_handed_off(True)
+            return
+        
+        # drop_oldest: make room by discarding the oldest queued batch
+        while True:
+            try:
+                dropped, _ = self.queue.get_nowait()
+                self.dropped_records += len(dropped)
+                logger.warning("🗑️  Shipping queue full, dropped %d oldest records", len(dropped))
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                continue
+            
+    def queue_depth(self) -> int:
+        """Number of batches waiting to be shipped."""
+        return self.queue.qsize()
+    
+    def run(self) -> None:
+        """Ship queued batches until stopped and the queue is drained (or until halted)."""
+        while True:
+            with self.take_lock:
+                if self.halt_event.is_set():
+                    break
+                try:
+                    records, on_handed_off = self.queue.get(timeout=0.5)
+                except queue.Empty:
+                    if self.stop_event.is_set():
+                        break
+                    continue
+                self.in_flight = len(records)
+            
+            try:
+                shipped = self.ship(records)
+            except Exception as e:
+                # Don't lose the batch to an unexpected error; persist it instead
+                logger.error("❌ Background shipping error, spilling %d records to disk: %s", len(records), e)
+                self.spill(records)
+                shipped = True
+            finally:
+                self.in_flight = 0
+            
+            if on_handed_off:
+                on_handed_off(shipped)
+                
+    def stop(self, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Ask the worker to drain the queue and exit.
+        
+        If the queue has not drained when the timeout expires, the worker is
+        halted before the rest is taken, so a batch is either returned here
+        or owned by the worker, never both. A batch the worker is still
+        shipping at that point is not returned.
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        
+        Returns:
+            Records still queued when the timeout expired
+        """
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+        
+        with self.take_lock:
+            self.halt_event.set()
+        
+        if self.is_alive() and self.in_flight:
+            logger.warning("⏳ Shipping worker still sending %d records after %ss", self.in_flight, timeout)
+        
+        leftover = []
+        while True:
+            try:
+                leftover.extend(self.queue.get_nowait()[0])
+            except queue.Empty:
+                break
+        
+        return leftover
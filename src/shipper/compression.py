@@ -0,0 +1,38 @@
+import gzip
+import time
+from typing import Dict, Any, Optional, NamedTuple
+
+class CompressedPayload(NamedTuple):
+    """A request body with its content encoding and compression statistics."""
+    body: bytes
+    encoding: Optional[str]
+    original_size: int
+    compressed_size: int
+    seconds: float
+    
+    @property
+    def ratio(self) -> float:
+        """Original size divided by compressed size (1.0 when not compressed)."""
+        return self.original_size / self.compressed_size if self.compressed_size else 1.0
+
+def compress_payload(payload: bytes, compression_config: Dict[str, Any]) -> CompressedPayload:
+    """
+    Gzip-compress a shipping payload if compression is enabled and it is large enough.
+    
+    Args:
+        payload: Uncompressed NDJSON body
+        compression_config: The 'logz_io.compression' section (enabled, level, min_size_bytes)
+    
+    Returns:
+        CompressedPayload with the body to send and its Content-Encoding (None if uncompressed)
+    """
+    original_size = len(payload)
+    
+    if not compression_config.get('enabled', False) or original_size < compression_config.get('min_size_bytes', 1024):
+        return CompressedPayload(payload, None, original_size, original_size, 0.0)
+    
+    started = time.perf_counter()
+    body = gzip.compress(payload, compresslevel=compression_config.get('level', 6))
+    seconds = time.perf_counter() - started
+    
+    return CompressedPayload(body, 'gzip', original_size, len(body), seconds)
@@ -1,42 +1,144 @@
+import logging
 import requests
-import json
-from typing import List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, NamedTuple
 
-def ship_to_logz_io(transformed_data: List[Dict[str, Any]], logz_config: Dict[str, Any]) -> bool:
+from .compression import compress_payload
+from ..metrics import (COMPRESS_SECONDS, PAYLOAD_BYTES, SERIALIZE_SECONDS, SHIP_SECONDS, SHIPPED_RECORDS,
+                       SHIP_RETRIES, UNSHIPPED_RECORDS)
+from ..resilience import ProviderUnavailable, get_provider_guard
+from .serializer import NdjsonSerializer, get_serializer
+
+logger = logging.getLogger(__name__)
+
+class Batch(NamedTuple):
+    """A chunk of records together with its serialized NDJSON payload."""
+    records: List[Dict[str, Any]]
+    payload: bytes
+
+def build_payload(records: List[Dict[str, Any]], serializer: Optional[NdjsonSerializer] = None) -> bytes:
+    """Serialize records as newline-delimited JSON."""
+    with SERIALIZE_SECONDS.time():
+        return (serializer or get_serializer()).serialize(records)
+
+def split_into_batches(records: List[Dict[str, Any]], max_records: int, max_bytes: int,
+                       serializer: Optional[NdjsonSerializer] = None) -> List[Batch]:
+    """
+    Split records into batches capped by record count and by payload size.
+    
+    Each record is serialized exactly once, into the serializer's reusable
+    buffer. A single record larger than max_bytes is sent in a batch of its own.
+    
+    Args:
+        records: Records in unified JSON format
+        max_records: Maximum number of records per batch
+        max_bytes: Maximum payload size per batch in bytes
+        serializer: NDJSON serializer (the default backend if omitted)
+    
+    Returns:
+        List of batches in the original record order
+    """
+    serializer = serializer or get_serializer()
+    encode = serializer.encode
+    buffer = serializer.buffer()
+    started = time.perf_counter()
+    
+    batches = []
+    batch_records = []
+    
+    for record in records:
+        line = encode(record)
+        # Every line after the first also costs a newline separator
+        added_bytes = len(line) + (1 if batch_records else 0)
+        
+        if batch_records and (len(batch_records) >= max_records or len(buffer) + added_bytes > max_bytes):
+            batches.append(Batch(batch_records, bytes(buffer)))
+            batch_records = []
+            buffer.clear()
+        
+        if batch_records:
+            buffer += b'\n'
+        buffer += line
+        batch_records.append(record)
+    
+    if batch_records:
+        batches.append(Batch(batch_records, bytes(buffer)))
+    
+    SERIALIZE_SECONDS.observe(time.perf_counter() - started)
+    return batches
+
+def ship_to_logz_io(transformed_data: List[Dict[str, Any]], logz_config: Dict[str, Any],
+                    session: Optional[requests.Session] = None) -> bool:
     """
     Ship transformed weather data to Logz.io listener endpoint.
     
     Args:
         transformed_data: List of records in unified JSON format
         logz_config: Logz.io configuration (host, port, token)
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
         
     Returns:
         True if shipping successful, False otherwise
     """
     if not transformed_data:
-        print("ℹ️  No data to ship")
+        logger.info("ℹ️  No data to ship")
         return True
     
+    serializer = get_serializer(logz_config.get('serializer', 'auto'))
+
+    return _post_payload(build_payload(transformed_data, serializer), len(transformed_data), logz_config, session)
+
+def _post_payload(payload: bytes, record_count: int, logz_config: Dict[str, Any],
+                  session: Optional[requests.Session] = None) -> bool:
+    """Send one payload (see _send_payload), recording its latency and outcome."""
+    started = time.perf_counter()
+    shipped = _send_payload(payload, record_count, logz_config, session)
+    
+    SHIP_SECONDS.labels('success' if shipped else 'failure').observe(time.perf_counter() - started)
+    if shipped:
+        SHIPPED_RECORDS.inc(record_count)
+    
+    return shipped
+
+def _send_payload(payload: bytes, record_count: int, logz_config: Dict[str, Any],
+                  session: Optional[requests.Session] = None) -> bool:
+    """
+    Send one NDJSON payload to the Logz.io listener in a single POST.
+    
+    Args:
+        payload: Newline-delimited JSON body, UTF-8 encoded
+        record_count: Number of records in the payload, for reporting
+        logz_config: Logz.io configuration (host, port, scheme, token)
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
+    
+    Returns:
+        True if the listener accepted the payload, False otherwise
+    """
     # Extract Logz.io configuration
     host = logz_config.get('host')
     port = logz_config.get('port', 8071)
+    scheme = logz_config.get('scheme', 'https')
     token = logz_config.get('token')
     
     if not host or not token:
         raise ValueError("Logz.io configuration missing 'host' or 'token'")
     
     # Build endpoint URL
-    url = f"https://{host}:{port}/?token={token}"
+    url = f"{scheme}://{host}:{port}/?token={token}"
+    
+    logger.info(f"📤 Shipping {record_count} records to Logz.io...")
+    logger.debug(f"🌐 Endpoint: {url}")
     
-    # Prepare newline-delimited JSON payload
-    payload_lines = []
-    for record in transformed_data:
-        payload_lines.append(json.dumps(record))
+    compressed = compress_payload(payload, logz_config.get('compression', {}))
     
-    payload = '\n'.join(payload_lines)
+    PAYLOAD_BYTES.labels('raw').inc(compressed.original_size)
+    PAYLOAD_BYTES.labels('sent').inc(compressed.compressed_size)
     
-    print(f"📤 Shipping {len(transformed_data)} records to Logz.io...")
-    print(f"🌐 Endpoint: {url}")
+    if compressed.encoding:
+        COMPRESS_SECONDS.observe(compressed.seconds)
+        logger.debug("🗜️  Compressed %d -> %d bytes (ratio %.1fx) in %.1fms", compressed.original_size,
+                     compressed.compressed_size, compressed.ratio, compressed.seconds * 1000)
     
     try:
         # Send HTTP POST request
@@ -44,62 +146,131 @@ def ship_to_logz_io(transformed_data: List[Dict[str, Any]], logz_config: Dict[st
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(
+        if compressed.encoding:
+            headers['Content-Encoding'] = compressed.encoding
+        
+        response = get_provider_guard('logz_io').call(lambda: (session or requests).post(
             url,
-            data=payload,
+            data=compressed.body,
             headers=headers,
             timeout=30  # Use timeout from config if available
-        )
+        ))
         
         # Check response
         if response.status_code == 200:
-            print("✅ Successfully shipped data to Logz.io!")
+            logger.info("✅ Successfully shipped data to Logz.io!")
             return True
         else:
-            print(f"❌ Logz.io responded with status {response.status_code}: {response.text}")
+            logger.error("❌ Logz.io responded with status %s: %s", response.status_code, response.text)
             return False
             
+    except ProviderUnavailable as e:
+        logger.debug("Not shipping to Logz.io: %s", e)
+        return False
     except requests.exceptions.Timeout:
-        print("⏰ Timeout while shipping to Logz.io")
+        logger.warning("⏰ Timeout while shipping to Logz.io")
         return False
     except requests.exceptions.ConnectionError:
-        print("🌐 Connection error while shipping to Logz.io")
+        logger.warning("🌐 Connection error while shipping to Logz.io")
         return False
     except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed while shipping to Logz.io: {e}")
+        logger.error("❌ Request failed while shipping to Logz.io: %s", e)
         return False
 
-def ship_with_retry(transformed_data: List[Dict[str, Any]], config: Dict[str, Any]) -> bool:
+def ship_with_retry(transformed_data: List[Dict[str, Any]], config: Dict[str, Any],
+                    session: Optional[requests.Session] = None) -> bool:
     """
     Ship data to Logz.io with retry logic for robustness.
     
     Args:
         transformed_data: List of records in unified JSON format
         config: Full application configuration
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
         
     Returns:
         True if shipping successful (eventually), False if all retries failed
     """
+    return not ship_batches_with_retry(transformed_data, config, session=session)
+
+def ship_batches_with_retry(transformed_data: List[Dict[str, Any]], config: Dict[str, Any],
+                            session: Optional[requests.Session] = None) -> List[Dict[str, Any]]:
+    """
+    Ship data to Logz.io in size-capped batches, retrying only the batches that failed.
+    
+    Batches are capped by 'data_processing.batch_size' records and by
+    'logz_io.max_batch_bytes' bytes, serialized with the 'logz_io.serializer'
+    backend, and up to 'logz_io.max_in_flight' of them are sent concurrently.
+    
+    Args:
+        transformed_data: List of records in unified JSON format
+        config: Full application configuration
+        session: Shared pooled HTTP session (a one-off connection is used if omitted)
+    
+    Returns:
+        Records that could not be shipped after all retries (empty on success)
+    """
+    if not transformed_data:
+        logger.info("ℹ️  No data to ship")
+        return []
+    
     logz_config = config.get('logz_io', {})
     network_config = config.get('network', {})
     
     retry_attempts = network_config.get('retry_attempts', 3)
     retry_delay_base = network_config.get('retry_delay_base', 2)
     
+    batch_size = config.get('data_processing', {}).get('batch_size', 100)
+    max_batch_bytes = logz_config.get('max_batch_bytes', 9_000_000)
+    max_in_flight = logz_config.get('max_in_flight', 4)
+    
+    serializer = get_serializer(logz_config.get('serializer', 'auto'))
+    
+    pending_batches = split_into_batches(transformed_data, batch_size, max_batch_bytes, serializer)
+    guard = get_provider_guard('logz_io')
+    
     for attempt in range(1, retry_attempts + 1):
-        print(f"🔄 Shipping attempt {attempt}/{retry_attempts}")
+        # While the listener's circuit is open, hand the records back without waiting out retries
+        unavailable = guard.unavailable_reason()
+        if unavailable:
+            logger.warning("🚫 Not shipping %d batches to Logz.io (%s)", len(pending_batches), unavailable)
+            break
         
-        success = ship_to_logz_io(transformed_data, logz_config)
+        logger.info(f"🔄 Shipping attempt {attempt}/{retry_attempts} ({len(pending_batches)} batches)")
         
-        if success:
-            return True
+        pending_batches = _send_batches(pending_batches, logz_config, max_in_flight, session)
+        
+        if not pending_batches:
+            return []
         
-        if attempt < retry_attempts:
+        # No backoff if the circuit just opened; the next attempt gives up at once
+        if attempt < retry_attempts and not guard.unavailable_reason():
+            SHIP_RETRIES.inc(len(pending_batches))
             # Exponential backoff: 2s, 4s, 8s
             delay = retry_delay_base ** attempt
-            print(f"⏳ Waiting {delay}s before retry...")
-            import time
+            logger.info(f"⏳ {len(pending_batches)} batches failed, waiting {delay}s before retry...")
             time.sleep(delay)
     
-    print("❌ All shipping attempts failed")
-    return False
\ No newline at end of file
+    logger.error("❌ All shipping attempts failed")
+    unshipped = [record for batch in pending_batches for record in batch.records]
+    UNSHIPPED_RECORDS.inc(len(unshipped))
+    return unshipped
+
+def _send_batches(batches: List[Batch], logz_config: Dict[str, Any], max_in_flight: int,
+                  session: Optional[requests.Session] = None) -> List[Batch]:
+    """
+    Send batches with at most max_in_flight requests outstanding.
+    
+    Returns:
+        The batches that failed, in their original order
+    """
+    def send(batch: Batch) -> bool:
+        return _post_payload(batch.payload, len(batch.records), logz_config, session)
+    
+    if max_in_flight <= 1 or len(batches) <= 1:
+        results = [send(batch) for batch in batches]
+    else:
+        workers = min(max_in_flight, len(batches))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='logz-ship') as executor:
+            results = list(executor.map(send, batches))
+    
+    return [batch for batch, success in zip(batches, results) if not success]
\ No newline at end of file
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import List, Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class RecoveryReplayer(threading.Thread):
+    """
+    Streams the recovery file back through the shipper in the background.
+    
+    On start the recovery file is rotated to '<recovery_file>.replaying', so
+    records saved during this run go to a fresh file. The rotated file is
+    read batch by batch, never whole, and the byte offset of the last
+    acknowledged batch is recorded in '<recovery_file>.replaying.offset'.
+    An interrupted replay therefore resumes where it stopped on the next
+    start, and the rotated file is deleted once it has been fully shipped.
+    Replay is rate-limited so it does not starve the live polling cycles.
+    
+    Writers appending to the recovery file must hold file_lock, which the
+    rotation takes too, so no append can land in a file being renamed.
+    """
+    
+    def __init__(self, recovery_file: str,
+                 ship: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 batch_size: int = 100, records_per_second: Optional[float] = None,
+                 retry_delay: float = 5.0, file_lock: Optional[threading.Lock] = None):
+        super().__init__(name='recovery-replay', daemon=True)
+        self.recovery_file = recovery_file
+        self.replaying_file = recovery_file + '.replaying'
+        self.offset_file = self.replaying_file + '.offset'
+        self.ship = ship
+        self.batch_size = batch_size
+        self.records_per_second = records_per_second
+        self.retry_delay = retry_delay
+        self.file_lock = file_lock or threading.Lock()
+        self.stop_event = threading.Event()
+        self.replayed_records = 0
+        
+    @staticmethod
+    def has_pending(recovery_file: str) -> bool:
+        """Whether there is anything to replay for this recovery file."""
+        for path in (recovery_file, recovery_file + '.replaying'):
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                return True
+        return False
+    
+    def run(self) -> None:
+        """Replay rotated recovery files until everything is shipped or stop() is called."""
+        while not self.stop_event.is_set() and self._rotate():
+            if not self._replay_file():
+                return
+        
+        if self.replayed_records:
+            logger.info(f"✅ Recovery replay complete: {self.replayed_records} records shipped")
+            
+    def stop(self, timeout: float) -> None:
+        """Stop after the current batch; progress is kept for the next start."""
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+            
+    def _rotate(self) -> bool:
+        """Ensure a file is ready to replay; returns False when there is nothing left."""
+        if os.path.exists(self.replaying_file):
+            return True
+        
+        with self.file_lock:
+            if not os.path.exists(self.recovery_file) or os.path.getsize(self.recovery_file) == 0:
+                return False
+            os.replace(self.recovery_file, self.replaying_file)
+        
+        self._save_offset(0)
+        return True
+    
+    def _replay_file(self) -> bool:
+        """Ship the rotated file from its saved offset; returns False if stopped early."""
+        total_bytes = os.path.getsize(self.replaying_file)
+        offset = self._load_offset()
+        
+        logger.info(f"♻️  Replaying {self.replaying_file} from byte {offset} of {total_bytes}")
+        
+        with open(self.replaying_file, 'rb') as f:
+            f.seek(offset)
+            
+            while not self.stop_event.is_set():
+                records = []
+                end_offset = offset
+                
+                while len(records) < self.batch_size:
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        # End of file (a final line without newline is still a record)
+                        if line.strip():
+                            end_offset += len(line)
+                            records.extend(self._parse(line))
+                        break
+                    end_offset += len(line)
+                    records.extend(self._parse(line))
+                
+                if not records and end_offset == offset:
+                    break
+                
+                started = time.monotonic()
+                
+                if records and not self._ship_until_acknowledged(records):
+                    return False
+                
+                offset = end_offset
+                self._save_offset(offset)
+                self.replayed_records += len(records)
+                
+                percent = 100 * offset / total_bytes if total_bytes else 100
+                logger.info(f"♻️  Recovery replay: {offset}/{total_bytes} bytes ({percent:.0f}%), "
+                      f"{self.replayed_records} records shipped")
+                
+                self._throttle(len(records), started)
+        
+        if self.stop_event.is_set():
+            return False
+        
+        os.remove(self.replaying_file)
+        if os.path.exists(self.offset_file):
+            os.remove(self.offset_file)
+        return True
+    
+    def _ship_until_acknowledged(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Ship one batch, backing off between failures; returns False if stopped first.
+        
+        Only the records the shipper returns as unshipped are re-sent, so
+        records already accepted are not duplicated.
+        """
+        delay = self.retry_delay
+        while not self.stop_event.is_set():
+            records = self.ship(records)
+            if not records:
+                return True
+            logger.warning("⚠️  Recovery replay batch failed, retrying in %.0fs", delay)
+            if self.stop_event.wait(delay):
+                break
+            delay = min(delay * 2, 300)
+        return False
+    
+    def _throttle(self, record_count: int, started: float) -> None:
+        if not self.records_per_second:
+            return
+        remaining = record_count / self.records_per_second - (time.monotonic() - started)
+        if remaining > 0:
+            self.stop_event.wait(remaining)
+            
+    def _parse(self, line: bytes) -> List[Dict[str, Any]]:
+        try:
+            return [json.loads(line)]
+        except ValueError:
+            logger.warning("⚠️  Skipping corrupt line in recovery file")
+            return []
+        
+    def _load_offset(self) -> int:
+        try:
+            with open(self.offset_file, 'r') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+        
+    def _save_offset(self, offset: int) -> None:
+        # Write-then-rename so a crash never leaves a half-written offset
+        tmp_path = self.offset_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_file)
@@ -0,0 +1,96 @@
+import json
+import threading
+from typing import List, Dict, Any, Callable, Iterable, Union
+
+from ..transformers.weather_record import WeatherRecord
+
+try:
+    import orjson
+except ImportError:  # Optional dependency; the stdlib backends are used instead
+    orjson = None
+
+SERIALIZER_BACKENDS = ('auto', 'orjson', 'fixed', 'json')
+
+Record = Union[WeatherRecord, Dict[str, Any]]
+
+def _encode_orjson(record: Record) -> bytes:
+    if type(record) is WeatherRecord:
+        return orjson.dumps(record.to_dict())
+    return orjson.dumps(record)
+
+def _encode_fixed(record: Record) -> bytes:
+    # WeatherRecord formats its four fields directly; dicts read back from disk go through json
+    if type(record) is WeatherRecord:
+        return record.to_json().encode('ascii')
+    return json.dumps(record).encode('ascii')
+
+def _encode_json(record: Record) -> bytes:
+    if type(record) is WeatherRecord:
+        record = record.to_dict()
+    return json.dumps(record).encode('ascii')
+
+_ENCODERS = {
+    'orjson': _encode_orjson,
+    'fixed': _encode_fixed,
+    'json': _encode_json
+}
+
+class NdjsonSerializer:
+    """
+    Serializes unified records to NDJSON bytes through a reusable buffer.
+    
+    Backends: 'orjson' (fastest, needs the optional orjson package), 'fixed'
+    (stdlib, formats the four-field schema directly) and 'json' (generic
+    json.dumps of each record). 'auto' picks orjson when it is installed
+    and 'fixed' otherwise. Each thread gets its own buffer, so one
+    serializer can be shared by concurrent shippers.
+    """
+    
+    def __init__(self, backend: str = 'auto'):
+        if backend not in SERIALIZER_BACKENDS:
+            raise ValueError(f"Unknown serializer backend: {backend} (expected one of {SERIALIZER_BACKENDS})")
+        
+        if backend == 'auto':
+            backend = 'orjson' if orjson is not None else 'fixed'
+        elif backend == 'orjson' and orjson is None:
+            raise ValueError("Serializer backend 'orjson' requires the orjson package")
+        
+        self.backend = backend
+        self.encode: Callable[[Record], bytes] = _ENCODERS[backend]
+        self.local = threading.local()
+        
+    def buffer(self) -> bytearray:
+        """Return this thread's reusable buffer, emptied."""
+        buffer = getattr(self.local, 'buffer', None)
+        if buffer is None:
+            buffer = self.local.buffer = bytearray()
+        buffer.clear()
+        return buffer
+    
+    def serialize(self, records: Iterable[Record]) -> bytes:
+        """Serialize records as newline-delimited JSON (no trailing newline)."""
+        buffer = self.buffer()
+        encode = self.encode
+        
+        for record in records:
+            buffer += encode(record)
+            buffer += b'\n'
+        
+        # Drop the final newline; deleting from the end does not copy
+        del buffer[-1:]
+        return bytes(buffer)
+
+_serializers: Dict[str, NdjsonSerializer] = {}
+_serializers_lock = threading.Lock()
+
+def get_serializer(backend: str = 'auto') -> NdjsonSerializer:
+    """Return the shared serializer for a backend, creating it on first use."""
+    with _serializers_lock:
+        serializer = _serializers.get(backend)
+        if serializer is None:
+            serializer = _serializers[backend] = NdjsonSerializer(backend)
+        return serializer
+
+def available_backends() -> List[str]:
+    """Backends that can be used in this environment."""
+    return [backend for backend in SERIALIZER_BACKENDS[1:] if backend != 'orjson' or orjson is not None]
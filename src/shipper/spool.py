@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Tuple, NamedTuple
+from ..transformers.weather_record import record_to_json
+
+logger = logging.getLogger(__name__)
+
+class SpoolPosition(NamedTuple):
+    """A read position in the spool: segment sequence number and byte offset."""
+    segment: int
+    offset: int
+
+class Spool:
+    """
+    Durable, segmented, append-only on-disk log of records waiting to be shipped.
+    
+    Records are appended as JSON lines to numbered segment files and fsynced
+    once per append() call. Readers consume from the checkpointed position;
+    ack() advances the checkpoint and deletes fully consumed segments, so a
+    restart resumes exactly where the last acknowledged batch ended. When the
+    spool grows past max_total_bytes, the oldest segments are dropped.
+    """
+    
+    CHECKPOINT_FILE = 'checkpoint.json'
+    
+    def __init__(self, directory: str, segment_max_bytes: int = 8 * 1024 * 1024,
+                 max_total_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.max_total_bytes = max_total_bytes
+        self.lock = threading.Lock()
+        self.dropped_bytes = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        self.checkpoint = self._load_checkpoint()
+        segments = self._segments()
+        self.active_segment = segments[-1] if segments else max(self.checkpoint.segment, 1)
+        self._truncate_torn_tail(self._segment_path(self.active_segment))
+        self.active_file = open(self._segment_path(self.active_segment), 'ab')
+        
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Append records durably (one fsync per call)."""
+        if not records:
+            return
+        
+        data = ''.join(record_to_json(record) + '\n' for record in records).encode('utf-8')
+        
+        with self.lock:
+            if self.active_file.tell() > 0 and self.active_file.tell() + len(data) > self.segment_max_bytes:
+                self._roll_segment()
+            
+            self.active_file.write(data)
+            self.active_file.flush()
+            os.fsync(self.active_file.fileno())
+            
+            self._enforce_size_cap()
+            
+    def read(self, max_records: int) -> Tuple[List[Dict[str, Any]], SpoolPosition]:
+        """
+        Read up to max_records unacknowledged records, oldest first.
+        
+        Returns:
+            The records and the position to pass to ack() once they are shipped
+        """
+        with self.lock:
+            records = []
+            position = self.checkpoint
+            
+            for segment in self._segments():
+                if segment < position.segment:
+                    continue
+                
+                offset = position.offset if segment == position.segment else 0
+                
+                with open(self._segment_path(segment), 'rb') as f:
+                    f.seek(offset)
+                    while len(records) < max_records:
+                        line = f.readline()
+                        # A line without its newline is still being written (or was torn by a crash)
+                        if not line.endswith(b'\n'):
+                            break
+                        offset += len(line)
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            logger.warning("⚠️  Skipping corrupt spool record in segment %s", segment)
+                
+                position = SpoolPosition(segment, offset)
+                
+                if len(records) >= max_records:
+                    break
+            
+            return records, position
+        
+    def ack(self, position: SpoolPosition) -> None:
+        """Mark everything before position as shipped and delete consumed segments."""
+        with self.lock:
+            self.checkpoint = position
+            self._save_checkpoint()
+            
+            for segment in self._segments():
+                if segment < position.segment and segment != self.active_segment:
+                    os.remove(self._segment_path(segment))
+                    
+    def pending_bytes(self) -> int:
+        """Approximate number of unacknowledged bytes on disk."""
+        with self.lock:
+            total = 0
+            for segment in self._segments():
+                if segment < self.checkpoint.segment:
+                    continue
+                size = os.path.getsize(self._segment_path(segment))
+                total += size - (self.checkpoint.offset if segment == self.checkpoint.segment else 0)
+            return max(total, 0)
+        
+    def close(self) -> None:
+        """Flush and close the active segment."""
+        with self.lock:
+            self.active_file.flush()
+            os.fsync(self.active_file.fileno())
+            self.active_file.close()
+            
+    def _roll_segment(self) -> None:
+        self.active_file.flush()
+        os.fsync(self.active_file.fileno())
+        self.active_file.close()
+        self.active_segment += 1
+        self.active_file = open(self._segment_path(self.active_segment), 'ab')
+        
+    def _enforce_size_cap(self) -> None:
+        segments = self._segments()
+        total = sum(os.path.getsize(self._segment_path(segment)) for segment in segments)
+        
+        for segment in segments:
+            if total <= self.max_total_bytes or segment == self.active_segment:
+                break
+            
+            size = os.path.getsize(self._segment_path(segment))
+            os.remove(self._segment_path(segment))
+            total -= size
+            
+            if segment >= self.checkpoint.segment:
+                dropped = size - (self.checkpoint.offset if segment == self.checkpoint.segment else 0)
+                self.dropped_bytes += dropped
+                logger.warning("🗑️  Spool over %d bytes, dropped %d bytes of oldest records",
+                               self.max_total_bytes, dropped)
+                self.checkpoint = SpoolPosition(segment + 1, 0)
+                self._save_checkpoint()
+                
+    def _truncate_torn_tail(self, path: str) -> None:
+        """Cut off a partial last line left by a crash so new appends start cleanly."""
+        if not os.path.exists(path):
+            return
+        
+        with open(path, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            
+            # Scan backwards in blocks for the last newline
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                block = f.read(end - start)
+                newline = block.rfind(b'\n')
+                if newline != -1:
+                    end = start + newline + 1
+                    break
+                end = start
+            
+            if end != size:
+                logger.warning("⚠️  Discarding %d bytes of a torn spool record", size - end)
+                f.truncate(end)
+                
+    def _segments(self) -> List[int]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith('segment-') and name.endswith('.jsonl'):
+                segments.append(int(name[len('segment-'):-len('.jsonl')]))
+        return sorted(segments)
+    
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:010d}.jsonl")
+    
+    def _load_checkpoint(self) -> SpoolPosition:
+        path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            return SpoolPosition(data['segment'], data['offset'])
+        except FileNotFoundError:
+            return SpoolPosition(1, 0)
+        
+    def _save_checkpoint(self) -> None:
+        # Write-then-rename so a crash never leaves a half-written checkpoint
+        path = os.path.join(self.directory, self.CHECKPOINT_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'segment': self.checkpoint.segment, 'offset': self.checkpoint.offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
@@ -0,0 +1,106 @@
+import json
+import math
+import sys
+from typing import List, Dict, Any, Iterator, Tuple, Union
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+class WeatherRecord:
+    """
+    Compact record in the unified weather format.
+    
+    Uses __slots__ instead of a per-record dict and interns the city,
+    description and provider strings, which repeat across cycles, so each
+    queued or pending record costs a fraction of the equivalent dict. It
+    supports the read-only mapping operations the pipeline uses
+    (record['city'], .get(), 'city' in record, dict(record)) and compares
+    equal to the dict it replaces.
+    """
+    
+    __slots__ = ('city', 'temperature_celsius', 'description', 'source_provider')
+    
+    FIELDS = ('city', 'temperature_celsius', 'description', 'source_provider')
+    
+    def __init__(self, city: str, temperature_celsius: float, description: str, source_provider: str):
+        self.city = sys.intern(city)
+        self.temperature_celsius = temperature_celsius
+        self.description = sys.intern(description)
+        self.source_provider = sys.intern(source_provider)
+        
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+    
+    def __contains__(self, field: object) -> bool:
+        return field in self.FIELDS
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, WeatherRecord):
+            return self.to_tuple() == other.to_tuple()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"WeatherRecord({self.to_dict()!r})"
+    
+    def get(self, field: str, default: Any = None) -> Any:
+        return getattr(self, field) if field in self.FIELDS else default
+    
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+    
+    def items(self) -> List[Tuple[str, Any]]:
+        return list(zip(self.FIELDS, self.to_tuple()))
+    
+    def to_tuple(self) -> Tuple[str, float, str, str]:
+        return (self.city, self.temperature_celsius, self.description, self.source_provider)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "city": self.city,
+            "temperature_celsius": self.temperature_celsius,
+            "description": self.description,
+            "source_provider": self.source_provider
+        }
+        
+    def to_json(self) -> str:
+        """Serialize to the same JSON text json.dumps() produces for the equivalent dict."""
+        return (
+            '{"city": ' + _encode_string(self.city)
+            + ', "temperature_celsius": ' + _encode_float(self.temperature_celsius)
+            + ', "description": ' + _encode_string(self.description)
+            + ', "source_provider": ' + _encode_string(self.source_provider) + '}'
+        )
+
+def _encode_float(value: float) -> str:
+    """Format a float the way the json module does."""
+    if math.isfinite(value):
+        return float.__repr__(value)
+    if math.isnan(value):
+        return 'NaN'
+    return 'Infinity' if value > 0 else '-Infinity'
+
+def record_to_json(record: Union[WeatherRecord, Dict[str, Any]]) -> str:
+    """
+    Serialize one record as a JSON line.
+    
+    Records read back from the spool or recovery file are plain dicts, so
+    both representations can appear in the same batch.
+    
+    Args:
+        record: WeatherRecord or record dictionary
+    
+    Returns:
+        JSON text without a trailing newline
+    """
+    if type(record) is WeatherRecord:
+        return record.to_json()
+    return json.dumps(record)
@@ -1,4 +1,10 @@
-from typing import List, Dict, Any
+import logging
+import sys
+from array import array
+from typing import List, Dict, Any, Optional, Tuple
+from .weather_record import WeatherRecord
+
+logger = logging.getLogger(__name__)
 
 def transform_weather_data(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -10,20 +16,141 @@ def transform_weather_data(raw_data: List[Dict[str, Any]]) -> List[Dict[str, Any
     Returns:
         List of transformed dictionaries in unified format
     """
+    return [record.to_dict() for record in transform_weather_records(raw_data)]
+
+def transform_weather_records(raw_data: List[Dict[str, Any]]) -> List[WeatherRecord]:
+    """
+    Transform raw weather data into compact WeatherRecord objects for shipping.
+    
+    Same validation as transform_weather_data(), but the records stay
+    WeatherRecord objects, which the shipping serializer writes directly.
+    Use transform_weather_data() wherever plain dicts are expected
+    (e.g. json.dumps).
+    
+    Args:
+        raw_data: List of raw data dictionaries from various sources
+    
+    Returns:
+        List of WeatherRecord objects in unified format
+    """
     transformed_data = []
     
     for record in raw_data:
         try:
-            transformed_record = transform_single_record(record)
+            transformed_record = build_weather_record(record)
             if transformed_record:  # Only add valid records
                 transformed_data.append(transformed_record)
         except Exception as e:
-            print(f"⚠️  Warning: Skipping invalid record due to transformation error: {e}")
+            logger.warning("⚠️  Skipping invalid record due to transformation error: %s", e)
             # Skip invalid records as per our robustness config
             continue
     
     return transformed_data
 
+class RecordBatch:
+    """
+    Columnar batch of transformed records in unified format.
+    
+    Each unified field is one column; temperatures are stored as C doubles in
+    an array('d') rather than one float object per record, and the string
+    columns hold interned strings.
+    """
+    
+    __slots__ = ('city', 'temperature_celsius', 'description', 'source_provider')
+    
+    def __init__(self, city: List[str], temperature_celsius: array,
+                 description: List[str], source_provider: List[str]):
+        self.city = city
+        self.temperature_celsius = temperature_celsius
+        self.description = description
+        self.source_provider = source_provider
+        
+    def __len__(self) -> int:
+        return len(self.city)
+    
+    def to_records(self) -> List[WeatherRecord]:
+        """Expand the batch into unified records."""
+        return list(map(WeatherRecord, self.city, self.temperature_celsius,
+                        self.description, self.source_provider))
+
+def transform_weather_batch(raw_data: List[Dict[str, Any]]) -> Tuple[RecordBatch, List[int]]:
+    """
+    Transform raw weather data column by column instead of record by record.
+    
+    Produces exactly the records transform_weather_data() would, but checks
+    and converts whole columns at once, falling back to per-row checks only
+    when the batch contains invalid rows. Rejected rows are reported in one
+    summary warning instead of one warning per row.
+    
+    Args:
+        raw_data: List of raw data dictionaries from various sources
+    
+    Returns:
+        The batch of valid records and the indices of rejected raw records
+    """
+    cities = [record.get('city') for record in raw_data]
+    temperatures = [record.get('temperature') for record in raw_data]
+    descriptions = [record.get('description') for record in raw_data]
+    source_providers = [record.get('source_provider') for record in raw_data]
+    
+    rejected = []
+    
+    try:
+        temperature_celsius = array('d', map(float, temperatures))
+        valid = all(cities) and all(descriptions) and all(source_providers) and None not in temperatures
+    except (ValueError, TypeError, OverflowError):
+        valid = False
+    
+    if not valid:
+        temperature_celsius = array('d')
+        reasons = {}
+        kept = []
+        
+        for index, (city, temperature, description, source_provider) in enumerate(
+                zip(cities, temperatures, descriptions, source_providers)):
+            reason = _rejection_reason(city, temperature, description, source_provider)
+            if reason is None:
+                try:
+                    value = float(temperature)
+                except (ValueError, TypeError, OverflowError):
+                    reason = 'invalid temperature'
+            
+            if reason is None:
+                kept.append(index)
+                temperature_celsius.append(value)
+            else:
+                rejected.append(index)
+                reasons[reason] = reasons.get(reason, 0) + 1
+        
+        cities = [cities[index] for index in kept]
+        descriptions = [descriptions[index] for index in kept]
+        source_providers = [source_providers[index] for index in kept]
+        
+        summary = ', '.join(f"{reason}: {count}" for reason, count in reasons.items())
+        logger.warning("⚠️  Skipping %d invalid records (%s)", len(rejected), summary)
+    
+    # Interned strings are shared by every record with the same value
+    batch = RecordBatch(
+        list(map(sys.intern, map(str.strip, map(str, cities)))),
+        temperature_celsius,
+        list(map(sys.intern, map(str.strip, map(str, descriptions)))),
+        list(map(sys.intern, map(str.strip, map(str, source_providers))))
+    )
+    
+    return batch, rejected
+
+def _rejection_reason(city: Any, temperature: Any, description: Any, source_provider: Any) -> Optional[str]:
+    """Return why a raw row fails the required-field checks, or None if it passes."""
+    if not city:
+        return 'missing city'
+    if temperature is None:
+        return 'missing temperature'
+    if not description:
+        return 'missing description'
+    if not source_provider:
+        return 'missing source_provider'
+    return None
+
 def transform_single_record(raw_record: Dict[str, Any]) -> Dict[str, Any]:
     """
     Transform a single raw weather record into unified format.
@@ -38,9 +165,24 @@ def transform_single_record(raw_record: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         raw_record: Single raw data dictionary
-        
+    
     Returns:
         Transformed dictionary in unified format
+    
+    Raises:
+        ValueError: If required fields are missing or invalid
+    """
+    return build_weather_record(raw_record).to_dict()
+
+def build_weather_record(raw_record: Dict[str, Any]) -> WeatherRecord:
+    """
+    Transform a single raw weather record into a compact WeatherRecord.
+    
+    Args:
+        raw_record: Single raw data dictionary
+        
+    Returns:
+        WeatherRecord in unified format (supports dict-style access)
         
     Raises:
         ValueError: If required fields are missing or invalid
@@ -68,12 +210,12 @@ def transform_single_record(raw_record: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError(f"Invalid temperature value: {temperature}")
     
     # Create unified format
-    unified_record = {
-        "city": str(city).strip(),
-        "temperature_celsius": temperature_celsius,
-        "description": str(description).strip(),
-        "source_provider": str(source_provider).strip()
-    }
+    unified_record = WeatherRecord(
+        str(city).strip(),
+        temperature_celsius,
+        str(description).strip(),
+        str(source_provider).strip()
+    )
     
     return unified_record
 
@@ -93,21 +235,21 @@ def validate_transformed_data(transformed_data: List[Dict[str, Any]]) -> bool:
         # Check all required fields exist
         for field in required_fields:
             if field not in record:
-                print(f"❌ Record {i+1} missing field: {field}")
+                logger.error("❌ Record %d missing field: %s", i + 1, field)
                 return False
         
         # Check data types
         if not isinstance(record["city"], str):
-            print(f"❌ Record {i+1}: 'city' must be string")
+            logger.error("❌ Record %d: 'city' must be string", i + 1)
             return False
         if not isinstance(record["temperature_celsius"], (int, float)):
-            print(f"❌ Record {i+1}: 'temperature_celsius' must be number")
+            logger.error("❌ Record %d: 'temperature_celsius' must be number", i + 1)
             return False
         if not isinstance(record["description"], str):
-            print(f"❌ Record {i+1}: 'description' must be string")
+            logger.error("❌ Record %d: 'description' must be string", i + 1)
             return False
         if not isinstance(record["source_provider"], str):
-            print(f"❌ Record {i+1}: 'source_provider' must be string")
+            logger.error("❌ Record %d: 'source_provider' must be string", i + 1)
             return False
     
     return True
\ No newline at end of file
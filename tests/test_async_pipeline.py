@@ -0,0 +1,120 @@
+import asyncio
+import signal
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import main
+from src.data_sources import registry, register_source
+
+
+def healthy_source(source_config):
+    return [{'city': 'Berlin', 'temperature': 20.5, 'description': 'clear', 'source_provider': 'test-healthy'}]
+
+
+def hung_source(source_config):
+    time.sleep(1)
+    return [{'city': 'Late', 'temperature': 1.0, 'description': 'late', 'source_provider': 'test-hung'}]
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Unit tests for the asyncio polling loop (WeatherDataShipper.run_async)."""
+    
+    def setUp(self):
+        register_source('test-healthy', healthy_source, uses_http=False)
+        register_source('test-hung', hung_source, uses_http=False)
+        self.handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+        self.shipper = main.WeatherDataShipper(config={
+            'polling_interval': 0.05,
+            'data_sources': [{'type': 'test-hung', 'timeout': 0.1}, {'type': 'test-healthy'}],
+            'fetching': {'cycle_timeout': 0.5},
+            'data_processing': {'max_consecutive_failures': 2}
+        })
+        self.shipper.http_session = main.create_http_session(self.shipper.config)
+        
+    def tearDown(self):
+        self.shipper.http_session.close()
+        for signum, handler in self.handlers.items():
+            signal.signal(signum, handler)
+        for name in ('test-healthy', 'test-hung'):
+            registry._registry.pop(name, None)
+            
+    def run_cycles(self, cycles, ship):
+        """
+        Run the async loop for at least a number of cycles with ship_batches_with_retry replaced by ship.
+        
+        The loop stops once that many shipments started; the next cycle may already be under way.
+        """
+        shipped = []
+        
+        def ship_and_count(records, config, session=None):
+            shipped.append([record['city'] for record in records])
+            if len(shipped) >= cycles:
+                self.shipper.running = False
+            return ship(records)
+        
+        with patch('main.ship_batches_with_retry', side_effect=ship_and_count):
+            asyncio.run(asyncio.wait_for(self.shipper.run_async(0.05), timeout=10))
+        
+        return shipped
+    
+    def test_hung_source_does_not_hold_back_cycles(self):
+        """Test a source past its deadline is skipped while the other sources' records are shipped."""
+        with self.assertLogs('src.data_sources', 'WARNING'):
+            shipped = self.run_cycles(3, lambda records: [])
+        
+        self.assertEqual(shipped, [['Berlin']] * len(shipped))
+        self.assertTrue(self.shipper.last_cycle_success)
+        self.shipper.running = True  # health as seen while still polling
+        self.assertTrue(self.shipper.health()[0])
+        
+    def test_failed_shipments_fail_their_cycles(self):
+        """Test cycles whose shipment fails are recorded as failed and turn /health unhealthy."""
+        with self.assertLogs('weather_shipper', 'WARNING'):
+            self.run_cycles(2, lambda records: list(records))
+        
+        self.shipper.running = True  # health as seen while still polling
+        healthy, details = self.shipper.health()
+        
+        self.assertFalse(self.shipper.last_cycle_success)
+        self.assertEqual(self.shipper.consecutive_failures, self.shipper.cycles)
+        self.assertFalse(healthy)
+        self.assertEqual(details['status'], 'failing')
+        self.assertEqual(len(self.shipper.pending_data), self.shipper.cycles)
+        
+    def test_shipping_error_does_not_store_the_cycle_again(self):
+        """Test an error while shipping is reported without storing records a second time."""
+        def broken(records):
+            raise RuntimeError("listener misconfigured")
+        
+        with self.assertLogs('weather_shipper', 'ERROR'):
+            self.run_cycles(1, broken)
+        
+        self.assertFalse(self.shipper.last_cycle_success)
+        self.assertEqual(self.shipper.pending_data, [])
+        
+    def test_one_shipment_in_flight(self):
+        """Test a cycle waits for the previous cycle's shipment before starting its own."""
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_ship(records):
+            with lock:
+                in_flight.append(records)
+                peak.append(len(in_flight))
+            time.sleep(0.15)
+            with lock:
+                in_flight.remove(records)
+            return []
+        
+        with self.assertLogs('src.data_sources', 'WARNING'):
+            self.run_cycles(4, slow_ship)
+        
+        self.assertEqual(max(peak), 1)
+        self.assertGreaterEqual(self.shipper.cycles, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
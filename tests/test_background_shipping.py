@@ -0,0 +1,123 @@
+import threading
+import unittest
+
+from src.shipper.background import ShippingWorker
+
+
+class TestShippingWorker(unittest.TestCase):
+    """Unit tests for the background shipping worker and its queue-full policies."""
+    
+    def make_worker(self, policy, queue_size=2):
+        self.shipped = []
+        self.spilled = []
+        return ShippingWorker(
+            ship=self.shipped.append,
+            spill=self.spilled.append,
+            queue_size=queue_size,
+            full_policy=policy
+        )
+    
+    def test_worker_ships_queued_batches(self):
+        """Test submitted batches are shipped and stop() drains the queue."""
+        worker = self.make_worker('block')
+        worker.start()
+        
+        worker.submit([{'city': 'Berlin'}])
+        worker.submit([{'city': 'Tokyo'}])
+        leftover = worker.stop(timeout=5)
+        
+        self.assertEqual(leftover, [])
+        self.assertEqual(self.shipped, [[{'city': 'Berlin'}], [{'city': 'Tokyo'}]])
+    
+    def test_drop_oldest_policy(self):
+        """Test a full queue discards its oldest batch to make room."""
+        worker = self.make_worker('drop_oldest')
+        
+        for city in ('A', 'B', 'C'):
+            worker.submit([{'city': city}])
+        
+        self.assertEqual(worker.dropped_records, 1)
+        self.assertEqual(worker.stop(timeout=0), [{'city': 'B'}, {'city': 'C'}])
+    
+    def test_spill_policy(self):
+        """Test a full queue hands new batches to the spill callback."""
+        worker = self.make_worker('spill')
+        
+        for city in ('A', 'B', 'C'):
+            worker.submit([{'city': city}])
+        
+        self.assertEqual(self.spilled, [[{'city': 'C'}]])
+        self.assertEqual(worker.stop(timeout=0), [{'city': 'A'}, {'city': 'B'}])
+    
+    def test_on_handed_off_skips_dropped_batches(self):
+        """Test the hand-off callback runs for spilled and shipped batches but not dropped ones."""
+        handed_off = []
+        worker = self.make_worker('drop_oldest', queue_size=1)
+        worker.submit([{'city': 'A'}], lambda shipped: handed_off.append(('A', shipped)))
+        worker.submit([{'city': 'B'}], lambda shipped: handed_off.append(('B', shipped)))
+        worker.start()
+        worker.stop(timeout=5)
+        
+        spilling = self.make_worker('spill', queue_size=1)
+        spilling.submit([{'city': 'C'}])
+        spilling.submit([{'city': 'D'}], lambda shipped: handed_off.append(('D', shipped)))
+        
+        # list.append returns None, the ship callback's result
+        self.assertEqual(handed_off, [('B', None), ('D', True)])
+        
+    def test_failed_ship_is_spilled(self):
+        """Test a batch whose shipping raises is spilled instead of lost."""
+        spilled = []
+        done = threading.Event()
+        
+        def broken_ship(records):
+            done.set()
+            raise ValueError("misconfigured")
+        
+        worker = ShippingWorker(ship=broken_ship, spill=spilled.append, queue_size=1)
+        worker.start()
+        worker.submit([{'city': 'Berlin'}])
+        done.wait(5)
+        worker.stop(timeout=5)
+        
+        self.assertEqual(spilled, [[{'city': 'Berlin'}]])
+    
+    def test_stop_timeout_halts_worker_before_draining(self):
+        """Test batches returned by a timed-out stop() are never also shipped by the worker."""
+        shipping = threading.Event()
+        release = threading.Event()
+        shipped = []
+        
+        def slow_ship(records):
+            shipping.set()
+            release.wait(5)
+            shipped.append(records)
+        
+        worker = ShippingWorker(ship=slow_ship, spill=self.fail, queue_size=3, full_policy='block')
+        worker.start()
+        worker.submit([{'city': 'A'}])
+        shipping.wait(5)
+        worker.submit([{'city': 'B'}])
+        worker.submit([{'city': 'C'}])
+        
+        with self.assertLogs('src.shipper.background', 'WARNING'):
+            leftover = worker.stop(timeout=0.1)
+        self.assertTrue(worker.is_alive())
+        
+        # Anything queued after stop() returned is left alone by the halted worker
+        worker.submit([{'city': 'D'}])
+        release.set()
+        worker.join(5)
+        
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(leftover, [{'city': 'B'}, {'city': 'C'}])
+        self.assertEqual(shipped, [[{'city': 'A'}]])
+        self.assertEqual(worker.queue_depth(), 1)
+        
+    def test_unknown_policy_rejected(self):
+        """Test an unknown queue-full policy is a configuration error."""
+        with self.assertRaises(ValueError):
+            self.make_worker('explode')
+
+if __name__ == '__main__':
+    unittest.main()
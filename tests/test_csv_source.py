@@ -0,0 +1,292 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data_sources import csv_source
+from src.data_sources.csv_source import fetch_csv_data, iter_csv_chunks, commit_csv_chunk
+
+
+class TestIncrementalCsvSource(unittest.TestCase):
+    """Unit tests for incremental tailing of CSV files."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, 'weather_data.csv')
+        self.config = {
+            'type': 'csv',
+            'file_path': self.file_path,
+            'mode': 'incremental',
+            'checkpoint_file': os.path.join(self.directory, 'csv_checkpoint.json')
+        }
+        self._write('city,temperature,description\nBerlin,18.5,Cloudy\n', 'w')
+        
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def _write(self, text, mode='a'):
+        with open(self.file_path, mode, newline='') as f:
+            f.write(text)
+            
+    def _cities(self):
+        return [row['city'] for row in fetch_csv_data(self.config)]
+    
+    def _restart(self):
+        # A new process only has the checkpoint file
+        csv_source._read_states.clear()
+        
+    def _fetch_and_commit(self):
+        rows = fetch_csv_data(self.config)
+        for checkpoint in rows.checkpoints:
+            checkpoint()
+        return [row['city'] for row in rows]
+    
+    def test_reads_only_appended_rows(self):
+        """Test each call returns only rows added since the previous one."""
+        self.assertEqual(self._cities(), ['Berlin'])
+        self.assertEqual(self._cities(), [])
+        
+        self._write('Tokyo,15.3,Rain\nSydney,22.1,Sunny\n')
+        rows = fetch_csv_data(self.config)
+        
+        self.assertEqual([row['city'] for row in rows], ['Tokyo', 'Sydney'])
+        self.assertEqual(rows[0]['temperature'], '15.3')
+        self.assertEqual(rows[0]['source_provider'], 'csv')
+        
+    def test_partial_line_waits_for_next_call(self):
+        """Test a row without its newline is not consumed until it is complete."""
+        self._cities()
+        
+        self._write('Tok')
+        self.assertEqual(self._cities(), [])
+        
+        self._write('yo,15.3,Rain\n')
+        self.assertEqual(self._cities(), ['Tokyo'])
+        
+    def test_quoted_newlines_stay_in_their_row(self):
+        """Test a quoted field spanning lines is one row, and is not read until its closing quote."""
+        self._cities()
+        
+        self._write('Oslo,3.0,"Snow\nthen ')
+        self.assertEqual(self._cities(), [])
+        
+        self._write('""sleet""\nlater"\nRome,24.0,Sunny\n')
+        rows = fetch_csv_data(self.config)
+        
+        self.assertEqual([row['city'] for row in rows], ['Oslo', 'Rome'])
+        self.assertEqual(rows[0]['description'], 'Snow\nthen "sleet"\nlater')
+        
+    def test_checkpoint_survives_restart(self):
+        """Test the offset is persisted, so a new process does not re-read old rows."""
+        self._fetch_and_commit()
+        self._write('Paris,20.0,Clear\n')
+        self._restart()
+        
+        self.assertEqual(self._cities(), ['Paris'])
+        
+    def test_rows_not_checkpointed_are_read_again_after_restart(self):
+        """Test the checkpoint only moves once rows are handed off, and in order."""
+        self._fetch_and_commit()
+        self._write('Tokyo,15.3,Rain\n')
+        self.assertEqual(self._cities(), ['Tokyo'])  # never shipped
+        
+        self._write('Paris,20.0,Clear\n')
+        self.assertEqual(self._fetch_and_commit(), ['Paris'])
+        self._restart()
+        
+        # Saving Paris' offset would skip Tokyo, so neither is checkpointed
+        self.assertEqual(self._fetch_and_commit(), ['Tokyo', 'Paris'])
+        self._restart()
+        self.assertEqual(self._cities(), [])
+        
+    def test_checkpoints_handed_off_out_of_order_are_saved(self):
+        """Test a read handed off before the one it continues from is saved along with it."""
+        first = fetch_csv_data(self.config)
+        self._write('Tokyo,15.3,Rain\n')
+        second = fetch_csv_data(self.config)
+        
+        for checkpoint in second.checkpoints + first.checkpoints:
+            checkpoint()
+        self._restart()
+        
+        self.assertEqual(self._cities(), [])
+        
+    def test_truncated_file_is_read_from_start(self):
+        """Test a file that shrank below the checkpoint is re-read from the beginning."""
+        self._write('Tokyo,15.3,Rain\n')
+        self._cities()
+        
+        self._write('city,temperature,description\nLima,19.0,Fog\n', 'w')
+        self.assertEqual(self._cities(), ['Lima'])
+        
+    def test_file_rewritten_past_checkpoint_is_read_from_start(self):
+        """Test a file rewritten in place to beyond the checkpoint (same inode, larger) is re-read."""
+        self._cities()
+        
+        self._write('city,temperature,description\nLima,19.0,Fog\nOslo,3.0,Snow\nRome,24.0,Sunny\n', 'w')
+        self.assertEqual(self._cities(), ['Lima', 'Oslo', 'Rome'])
+        
+    def test_rotated_file_is_read_from_start(self):
+        """Test a file replaced by a new one (new inode) is read from the beginning."""
+        self._cities()
+        
+        rotated_path = self.file_path + '.tmp'
+        with open(rotated_path, 'w', newline='') as f:
+            f.write('city,temperature,description\nOslo,3.0,Snow\nRome,24.0,Sunny\n')
+        old_path = self.file_path + '.1'
+        os.rename(self.file_path, old_path)
+        os.rename(rotated_path, self.file_path)
+        
+        self.assertEqual(self._cities(), ['Oslo', 'Rome'])
+
+
+class TestBulkCsvSource(unittest.TestCase):
+    """Unit tests for chunked, memory-mapped bulk reads of CSV files."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, 'history.csv')
+        self.config = {
+            'type': 'csv',
+            'file_path': self.file_path,
+            'mode': 'bulk',
+            'chunk_size': 4,
+            'checkpoint_file': os.path.join(self.directory, 'csv_checkpoint.json')
+        }
+        with open(self.file_path, 'w', newline='') as f:
+            f.write('city,temperature,description\n')
+            for i in range(10):
+                f.write(f'City{i},{i}.5,"Clear, calm"\n')
+                
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def test_yields_fixed_size_chunks(self):
+        """Test rows are parsed and yielded in chunks of chunk_size."""
+        chunks = list(iter_csv_chunks(self.config))
+        
+        self.assertEqual([len(chunk.rows) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(chunks[0].rows[0], {
+            'city': 'City0',
+            'temperature': '0.5',
+            'description': 'Clear, calm',
+            'source_provider': 'csv'
+        })
+        self.assertEqual(chunks[-1].end_offset, os.path.getsize(self.file_path))
+        
+    def test_quoted_newlines_stay_in_their_row(self):
+        """Test chunks count records, not lines, when quoted fields span lines."""
+        with open(self.file_path, 'a', newline='') as f:
+            f.write('Oslo,3.0,"Snow\nand ""sleet"""\nRome,24.0,"Sunny\n')
+        
+        rows = [row for chunk in iter_csv_chunks(self.config) for row in chunk.rows]
+        
+        self.assertEqual([row['city'] for row in rows[-2:]], ['City9', 'Oslo'])
+        self.assertEqual(rows[-1]['description'], 'Snow\nand "sleet"')
+        
+    def test_resumes_after_last_committed_chunk(self):
+        """Test an interrupted read restarts after the last committed chunk."""
+        chunks = iter_csv_chunks(self.config)
+        commit_csv_chunk(self.config, next(chunks))
+        next(chunks)  # handed out but never committed
+        chunks.close()
+        
+        remaining = [row['city'] for chunk in iter_csv_chunks(self.config) for row in chunk.rows]
+        
+        self.assertEqual(remaining, [f'City{i}' for i in range(4, 10)])
+        
+    def test_file_rewritten_past_checkpoint_is_read_from_start(self):
+        """Test a bulk read restarts from the top of a file rewritten in place."""
+        commit_csv_chunk(self.config, next(iter_csv_chunks(self.config)))
+        
+        with open(self.file_path, 'w', newline='') as f:
+            f.write('city,temperature,description\n')
+            for i in range(10):
+                f.write(f'Town{i},{i}.0,Rain\n')
+        
+        cities = [row['city'] for chunk in iter_csv_chunks(self.config) for row in chunk.rows]
+        
+        self.assertEqual(cities, [f'Town{i}' for i in range(10)])
+        
+    def test_fully_committed_file_yields_nothing(self):
+        """Test a file read to the end yields no chunks until rows are appended."""
+        for chunk in iter_csv_chunks(self.config):
+            commit_csv_chunk(self.config, chunk)
+        
+        self.assertEqual(list(iter_csv_chunks(self.config)), [])
+        
+        with open(self.file_path, 'a', newline='') as f:
+            f.write('Lima,19.0,Fog\n')
+        
+        self.assertEqual([chunk.rows[0]['city'] for chunk in iter_csv_chunks(self.config)], ['Lima'])
+
+
+class TestCsvDirectorySource(unittest.TestCase):
+    """Unit tests for ingesting a directory or glob of CSV files."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stations = os.path.join(self.directory, 'stations')
+        os.makedirs(self.stations)
+        self.config = {
+            'type': 'csv',
+            'file_path': self.stations,
+            'max_workers': 2,
+            'manifest_file': os.path.join(self.directory, 'csv_manifest.json')
+        }
+        for city in ('Berlin', 'Oslo', 'Rome'):
+            self._write_station(city, '10.0')
+            
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        
+    def _write_station(self, city, temperature):
+        with open(os.path.join(self.stations, f'{city.lower()}.csv'), 'w', newline='') as f:
+            f.write(f'city,temperature,description\n{city},{temperature},Clear\n')
+            
+    def test_reads_all_files_in_name_order(self):
+        """Test every CSV file in the directory is read, merged in file name order."""
+        rows = fetch_csv_data(self.config)
+        
+        self.assertEqual([row['city'] for row in rows], ['Berlin', 'Oslo', 'Rome'])
+        
+    def test_unchanged_files_are_skipped(self):
+        """Test only new or modified files are read on later calls."""
+        for checkpoint in fetch_csv_data(self.config).checkpoints:
+            checkpoint()
+        csv_source._read_states.clear()
+        self.assertEqual(fetch_csv_data(self.config), [])
+        
+        self._write_station('Oslo', '-3.25')
+        self._write_station('Lima', '19.0')
+        
+        rows = fetch_csv_data(self.config)
+        
+        self.assertEqual([(row['city'], row['temperature']) for row in rows],
+                         [('Lima', '19.0'), ('Oslo', '-3.25')])
+                         
+    def test_appended_rows_are_read_once(self):
+        """Test rows appended to an already read file are read without re-reading earlier rows."""
+        fetch_csv_data(self.config)
+        
+        with open(os.path.join(self.stations, 'oslo.csv'), 'a', newline='') as f:
+            f.write('Oslo,-1.5,Snow\nOslo,-2')
+        
+        self.assertEqual([row['temperature'] for row in fetch_csv_data(self.config)], ['-1.5'])
+        
+        with open(os.path.join(self.stations, 'oslo.csv'), 'a', newline='') as f:
+            f.write('.5,Snow\n')
+        
+        self.assertEqual([row['temperature'] for row in fetch_csv_data(self.config)], ['-2.5'])
+        
+    def test_glob_pattern_with_process_pool(self):
+        """Test a glob pattern is honoured and files can be read on a process pool."""
+        self.config.update({'file_path': os.path.join(self.stations, '[br]*.csv'), 'executor': 'process'})
+        
+        rows = fetch_csv_data(self.config)
+        
+        self.assertEqual([row['city'] for row in rows], ['Berlin', 'Rome'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,403 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.data_sources import FetchedRows, SourcePlugin, fetch_all_sources_data, fetch_all_sources_data_async
+from src.data_sources.cache import MemoryCacheBackend, ResponseCache
+from src.data_sources.openweathermap_source import fetch_openweathermap_data, get_city_id_cache
+from src.data_sources.weatherapi_source import fetch_weatherapi_data
+from src.data_sources.concurrency import RateLimiter, fetch_cities_concurrently, get_rate_limiter
+from src.resilience import configure_resilience
+
+
+def fake_fetch_source_data(source_config, session=None, cache=None):
+    """Stand-in fetcher driven entirely by the source config."""
+    time.sleep(source_config.get('delay', 0))
+    if source_config.get('fail'):
+        raise RuntimeError("source is down")
+    rows = [{'city': source_config['type'], 'source_provider': source_config['type']}]
+    return FetchedRows(rows, source_config.get('checkpoints', ()))
+
+
+class TestConcurrentFetching(unittest.TestCase):
+    """Unit tests for the concurrent fetch path of fetch_all_sources_data."""
+    
+    def make_config(self, sources, **fetching):
+        fetching.setdefault('concurrent', True)
+        return {'data_sources': sources, 'fetching': fetching}
+    
+    @patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+    def test_results_merged_in_config_order(self, _):
+        """Test results keep configuration order regardless of completion order."""
+        config = self.make_config([
+            {'type': 'slow', 'delay': 0.2},
+            {'type': 'fast'},
+            {'type': 'disabled', 'enabled': False},
+        ])
+        
+        result = fetch_all_sources_data(config)
+        
+        self.assertEqual([r['city'] for r in result], ['slow', 'fast'])
+        
+    @patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+    def test_failed_and_slow_sources_do_not_block_others(self, _):
+        """Test a failing source and one past its deadline are skipped."""
+        config = self.make_config([
+            {'type': 'broken', 'fail': True},
+            {'type': 'hung', 'delay': 2, 'timeout': 0.2},
+            {'type': 'healthy'},
+        ])
+        
+        started = time.monotonic()
+        result = fetch_all_sources_data(config)
+        elapsed = time.monotonic() - started
+        
+        self.assertEqual([r['city'] for r in result], ['healthy'])
+        self.assertLess(elapsed, 1.0)
+        
+    @patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+    def test_cycle_deadline_caps_all_sources(self, _):
+        """Test the global cycle deadline overrides longer per-source deadlines."""
+        config = self.make_config(
+            [{'type': 'hung', 'delay': 2}, {'type': 'healthy'}],
+            source_timeout=10,
+            cycle_timeout=0.2,
+        )
+        
+        started = time.monotonic()
+        result = fetch_all_sources_data(config)
+        
+        self.assertEqual([r['city'] for r in result], ['healthy'])
+        self.assertLess(time.monotonic() - started, 1.0)
+        
+    @patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+    def test_source_deadline_starts_when_fetch_starts(self, _):
+        """Test a source queued behind max_workers keeps its full timeout once it starts."""
+        config = self.make_config(
+            [{'type': 'slow', 'delay': 0.3}, {'type': 'queued', 'delay': 0.1, 'timeout': 0.3}],
+            max_workers=1,
+        )
+        
+        result = fetch_all_sources_data(config)
+        
+        self.assertEqual([r['city'] for r in result], ['slow', 'queued'])
+        
+    @patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+    def test_hung_source_is_not_resubmitted(self, fetch):
+        """Test a source whose abandoned fetch is still running is skipped instead of piling up threads."""
+        config = self.make_config([{'type': 'hung', 'delay': 0.5, 'timeout': 0.1}, {'type': 'healthy'}])
+        
+        for _ in range(3):
+            self.assertEqual([r['city'] for r in fetch_all_sources_data(config)], ['healthy'])
+        hung_calls = [call for call in fetch.call_args_list if call.args[0]['type'] == 'hung']
+        self.assertEqual(len(hung_calls), 1)
+        
+        time.sleep(0.6)
+        fetch_all_sources_data(config)
+        hung_calls = [call for call in fetch.call_args_list if call.args[0]['type'] == 'hung']
+        self.assertEqual(len(hung_calls), 2)
+
+
+
+@patch('src.data_sources.get_source_plugin', return_value=SourcePlugin('fake', fake_fetch_source_data))
+@patch('src.data_sources.fetch_source_data', side_effect=fake_fetch_source_data)
+class TestAsyncFetching(unittest.TestCase):
+    """Unit tests for fetch_all_sources_data_async."""
+    
+    def fetch(self, sources, **fetching):
+        return asyncio.run(fetch_all_sources_data_async({'data_sources': sources, 'fetching': fetching}))
+    
+    def test_hung_source_is_abandoned_and_not_resubmitted(self, fetch, _):
+        """Test a source past its deadline is skipped, and skipped again while its fetch still runs."""
+        sources = [{'type': 'hung', 'delay': 0.5, 'timeout': 0.1}, {'type': 'healthy'}]
+        
+        started = time.monotonic()
+        with self.assertLogs('src.data_sources', 'WARNING') as logs:
+            self.assertEqual([r['city'] for r in self.fetch(sources)], ['healthy'])
+            self.assertEqual([r['city'] for r in self.fetch(sources)], ['healthy'])
+        
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertIn('Timed out fetching from hung', logs.output[0])
+        self.assertIn('still running', logs.output[1])
+        hung_calls = [call for call in fetch.call_args_list if call.args[0]['type'] == 'hung']
+        self.assertEqual(len(hung_calls), 1)
+        
+        time.sleep(0.5)
+        with self.assertLogs('src.data_sources', 'WARNING'):
+            self.fetch(sources)
+        hung_calls = [call for call in fetch.call_args_list if call.args[0]['type'] == 'hung']
+        self.assertEqual(len(hung_calls), 2)
+        
+    def test_source_deadline_starts_when_fetch_starts(self, fetch, _):
+        """Test a source queued behind max_workers keeps its full timeout once it starts."""
+        sources = [{'type': 'slow', 'delay': 0.3}, {'type': 'queued', 'delay': 0.1, 'timeout': 0.3}]
+        
+        self.assertEqual([r['city'] for r in self.fetch(sources, max_workers=1)], ['slow', 'queued'])
+        
+    def test_checkpoints_of_finished_sources_are_kept(self, fetch, _):
+        """Test the merged rows carry the read position checkpoints of the sources that finished."""
+        checkpoint = MagicMock()
+        sources = [{'type': 'csv', 'checkpoints': [checkpoint]}, {'type': 'late', 'delay': 0.5,
+                                                                  'timeout': 0.1, 'checkpoints': [MagicMock()]}]
+        
+        with self.assertLogs('src.data_sources', 'WARNING'):
+            rows = self.fetch(sources)
+        
+        self.assertEqual(rows.checkpoints, [checkpoint])
+
+
+class TestCityConcurrency(unittest.TestCase):
+    """Unit tests for the per-city concurrency helpers."""
+    
+    def test_fetch_cities_keeps_order_and_skips_failures(self):
+        """Test per-city results keep city order and failed cities are dropped."""
+        def fetch_city(city):
+            time.sleep(0.05 if city == 'Berlin' else 0)
+            return None if city == 'Nowhere' else {'city': city}
+        
+        result = fetch_cities_concurrently(['Berlin', 'Nowhere', 'Tokyo'], fetch_city, max_concurrency=3)
+        
+        self.assertEqual([r['city'] for r in result], ['Berlin', 'Tokyo'])
+    
+    def test_rate_limiter_caps_request_rate(self):
+        """Test the limiter allows one second's burst and then paces requests."""
+        limiter = RateLimiter(requests_per_second=20)
+        
+        started = time.monotonic()
+        for _ in range(30):
+            limiter.acquire()
+        elapsed = time.monotonic() - started
+        
+        # 20 requests come from the initial burst, the other 10 take ~0.5s
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertLess(elapsed, 1.5)
+    
+    def test_rate_limiter_shared_per_provider(self):
+        """Test the same limiter is reused for a provider across cycles."""
+        first = get_rate_limiter('test-provider', 5)
+        
+        self.assertIs(get_rate_limiter('test-provider', 5), first)
+        self.assertIsNone(get_rate_limiter('test-provider', None))
+
+
+class TestApiEndpoints(unittest.TestCase):
+    """Unit tests for the configurable API base URLs."""
+    
+    def setUp(self):
+        configure_resilience({})
+        
+    def test_sources_use_configured_base_url(self):
+        """Test each API source sends its request under the configured base_url."""
+        responses = {
+            'openweathermap': {'name': 'Berlin', 'main': {'temp': 20.5}, 'weather': [{'description': 'clear sky'}]},
+            'weatherapi': {'location': {'name': 'Berlin'}, 'current': {'temp_c': 20.5, 'condition': {'text': 'Sunny'}}}
+        }
+        cases = [
+            (fetch_openweathermap_data, 'openweathermap', 'http://127.0.0.1:8000/data/2.5/weather'),
+            (fetch_weatherapi_data, 'weatherapi', 'http://127.0.0.1:8000/v1/current.json')
+        ]
+        
+        for fetch, provider, expected_url in cases:
+            with self.subTest(provider=provider):
+                session = MagicMock()
+                session.get.return_value.status_code = 200
+                session.get.return_value.json.return_value = responses[provider]
+                base_url = expected_url.rsplit('/', 1)[0] + '/'
+                
+                result = fetch({'api_key': 'test', 'cities': ['Berlin'], 'base_url': base_url}, session=session)
+                
+                self.assertEqual(session.get.call_args[0][0], expected_url)
+                self.assertEqual(result[0]['temperature'], 20.5)
+
+
+class FakeOpenWeatherMapSession:
+    """Session stand-in answering /weather and /group requests and recording the URLs called."""
+    
+    def __init__(self, unknown=(), failing_groups=False):
+        self.unknown = set(unknown)
+        self.failing_groups = failing_groups
+        self.calls = []
+        
+    def weather(self, city):
+        return {'id': 1000 + int(city[4:]), 'name': city, 'main': {'temp': 10.0},
+                'weather': [{'description': 'mist'}]}
+                
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append(url.rsplit('/', 1)[1])
+        response = MagicMock(headers={}, status_code=200)
+        if url.endswith('/group'):
+            if self.failing_groups:
+                response.status_code = 503
+                response.raise_for_status.side_effect = requests.exceptions.HTTPError('503')
+            ids = [int(city_id) for city_id in params['id'].split(',')]
+            # City1003 is left out of group responses
+            response.json.return_value = {'list': [self.weather(f'City{i - 1000}') for i in ids if i != 1003]}
+        elif params['q'] in self.unknown:
+            response.status_code = 404
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError('404')
+        else:
+            response.json.return_value = self.weather(params['q'])
+        return response
+
+
+class TestOpenWeatherMapBulk(unittest.TestCase):
+    """Unit tests for the multi-city /group fetch mode."""
+    
+    def setUp(self):
+        configure_resilience({})
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_config = {
+            'api_key': 'test', 'bulk': True, 'bulk_size': 20,
+            'cities': [f'City{i}' for i in range(45)],
+            'city_id_file': os.path.join(self.temp_dir.name, 'city_ids.json')
+        }
+        
+    def tearDown(self):
+        self.temp_dir.cleanup()
+        
+    def test_ids_resolved_once_then_fetched_in_groups(self):
+        """Test the first cycle resolves IDs per city and later cycles use /group chunks of 20."""
+        session = FakeOpenWeatherMapSession(unknown={'City44'})
+        
+        first = fetch_openweathermap_data(self.source_config, session=session)
+        self.assertEqual(session.calls.count('weather'), 45)
+        
+        session.calls = []
+        second = fetch_openweathermap_data(self.source_config, session=session)
+        
+        # 44 resolved cities in 3 groups; City3 (missing from the group response) and the
+        # unresolvable City44 fall back to per-city requests
+        self.assertEqual(session.calls.count('group'), 3)
+        self.assertEqual(session.calls.count('weather'), 2)
+        self.assertEqual([r['city'] for r in second], [f'City{i}' for i in range(44)])
+        self.assertEqual(first, second)
+        
+        with open(self.source_config['city_id_file']) as f:
+            self.assertEqual(len(json.load(f)), 44)
+            
+    def test_aliases_of_one_city_id_share_the_group_result(self):
+        """Test names resolving to the same ID ('City7', 'City07') all get records from /group."""
+        self.source_config['cities'] = ['City5', 'City7', 'City07']
+        session = FakeOpenWeatherMapSession()
+        fetch_openweathermap_data(self.source_config, session=session)
+        
+        session.calls = []
+        records = fetch_openweathermap_data(self.source_config, session=session)
+        
+        self.assertEqual(session.calls, ['group'])
+        # Records carry the provider's name for the city, as per-city responses do
+        self.assertEqual([r['city'] for r in records], ['City5', 'City7', 'City7'])
+        
+    def test_failed_group_request_does_not_fall_back_per_city(self):
+        """Test cities of a failed /group request are skipped rather than fetched one by one."""
+        city_ids = get_city_id_cache(self.source_config['city_id_file'])
+        for i in range(45):
+            city_ids.set(f'City{i}', 1000 + i)
+        session = FakeOpenWeatherMapSession(failing_groups=True)
+        
+        result = fetch_openweathermap_data(self.source_config, session=session)
+        
+        self.assertEqual(result, [])
+        self.assertEqual(session.calls, ['group'] * 3)
+        
+    def test_fresh_cache_entries_skip_requests(self):
+        """Test cities cached from a group response are served from the response cache."""
+        city_ids = get_city_id_cache(self.source_config['city_id_file'])
+        for i in range(45):
+            city_ids.set(f'City{i}', 1000 + i)
+        session = FakeOpenWeatherMapSession()
+        cache = ResponseCache(MemoryCacheBackend(), default_ttl=600)
+        fetch_openweathermap_data(self.source_config, session=session, cache=cache)
+        self.assertEqual(session.calls.count('group'), 3)
+        
+        session.calls = []
+        result = fetch_openweathermap_data(self.source_config, session=session, cache=cache)
+        
+        self.assertEqual(session.calls, [])
+        self.assertEqual(len(result), 45)
+
+
+class FakeWeatherAPISession:
+    """Session stand-in answering bulk POSTs, echoing custom_id with per-item errors for unknown cities."""
+    
+    def __init__(self, unknown=(), failing=False):
+        self.unknown = set(unknown)
+        self.failing = failing
+        self.chunk_sizes = []
+        
+    def post(self, url, params=None, json=None, timeout=None):
+        self.chunk_sizes.append(len(json['locations']))
+        response = MagicMock(headers={}, status_code=200)
+        if self.failing:
+            response.status_code = 503
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError('503')
+        bulk = []
+        # Items come back in reverse order, so matching must go by custom_id
+        for location in reversed(json['locations']):
+            query = {'custom_id': location['custom_id'], 'q': location['q']}
+            if location['q'] in self.unknown:
+                query['error'] = {'code': 1006, 'message': 'No matching location found.'}
+            else:
+                query.update(location={'name': location['q'].upper()},
+                             current={'temp_c': 12.5, 'condition': {'text': 'Mist'}})
+            bulk.append({'query': query})
+        response.json.return_value = {'bulk': bulk}
+        return response
+
+
+class TestWeatherAPIBulk(unittest.TestCase):
+    """Unit tests for the WeatherAPI bulk fetch mode."""
+    
+    def setUp(self):
+        configure_resilience({})
+        self.cities = [f'city{i}' for i in range(120)]
+        self.source_config = {'api_key': 'test', 'bulk': True, 'cities': self.cities}
+        
+    def test_cities_posted_in_chunks_and_mapped_back(self):
+        """Test cities go out 50 per request and come back in config order despite reordered items."""
+        session = FakeWeatherAPISession()
+        
+        result = fetch_weatherapi_data(self.source_config, session=session)
+        
+        self.assertEqual(session.chunk_sizes, [50, 50, 20])
+        self.assertEqual([r['city'] for r in result], [city.upper() for city in self.cities])
+        
+    def test_item_errors_skip_only_that_city(self):
+        """Test a city the API cannot match is dropped without failing the rest of its chunk."""
+        session = FakeWeatherAPISession(unknown={'city7'})
+        
+        result = fetch_weatherapi_data(dict(self.source_config, bulk_size=10), session=session)
+        
+        self.assertEqual(len(session.chunk_sizes), 12)
+        self.assertEqual(len(result), 119)
+        self.assertNotIn('CITY7', [r['city'] for r in result])
+        
+    def test_failed_request_skips_its_chunk(self):
+        """Test cities of a failed bulk request are skipped rather than fetched one by one."""
+        session = FakeWeatherAPISession(failing=True)
+        
+        result = fetch_weatherapi_data(self.source_config, session=session)
+        
+        self.assertEqual(result, [])
+        self.assertEqual(len(session.chunk_sizes), 3)
+        
+    def test_fresh_cache_entries_skip_requests(self):
+        """Test cities cached from a bulk response are served from the response cache."""
+        session = FakeWeatherAPISession()
+        cache = ResponseCache(MemoryCacheBackend(), default_ttl=600)
+        fetch_weatherapi_data(self.source_config, session=session, cache=cache)
+        
+        session.chunk_sizes = []
+        result = fetch_weatherapi_data(self.source_config, session=session, cache=cache)
+        
+        self.assertEqual(session.chunk_sizes, [])
+        self.assertEqual(len(result), 120)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from src.http_session import create_http_session
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive capable handler answering every GET with 'ok' (429 under /throttled)."""
+    protocol_version = 'HTTP/1.1'
+    throttled_requests = 0
+    
+    def do_GET(self):
+        if self.path.startswith('/throttled'):
+            OkHandler.throttled_requests += 1
+            self.send_response(429)
+            self.send_header('Retry-After', '3')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    """Unit tests for the pooled HTTP session and its connection counters."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/"
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+    
+    def test_keep_alive_reuses_connection(self):
+        """Test repeated requests reuse one pooled connection."""
+        session = create_http_session({})
+        
+        for _ in range(5):
+            session.get(self.url, timeout=5)
+        session.close()
+        
+        self.assertEqual(session.connection_stats.snapshot(), {'reused': 4, 'opened': 1})
+    
+    def test_keep_alive_disabled_opens_new_connections(self):
+        """Test disabling keep-alive opens a connection per request."""
+        session = create_http_session({'http': {'keep_alive': False}})
+        
+        for _ in range(3):
+            session.get(self.url, timeout=5)
+        session.close()
+        
+        self.assertEqual(session.connection_stats.snapshot(), {'reused': 0, 'opened': 3})
+
+    def test_429_is_returned_without_retrying(self):
+        """Test a 429 reaches the caller at once, leaving Retry-After to the provider guard."""
+        session = create_http_session({})
+        OkHandler.throttled_requests = 0
+        
+        started = time.monotonic()
+        response = session.get(self.url + 'throttled', timeout=5)
+        elapsed = time.monotonic() - started
+        session.close()
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(OkHandler.throttled_requests, 1)
+        self.assertLess(elapsed, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import json
+import logging
+import queue
+import unittest
+
+from src.logging_setup import (JsonFormatter, NonBlockingQueueHandler, RateLimitFilter,
+                               configure_logging, shutdown_logging)
+
+
+def make_record(msg, args=(), level=logging.WARNING, name='test'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    """Unit tests for rate limiting and sampling of repeated warnings."""
+    
+    def test_burst_then_sampling(self):
+        """Test the first records pass, then one in sample_every with a suppressed count."""
+        log_filter = RateLimitFilter(burst=3, interval=60, sample_every=10)
+        records = [make_record('Failed to fetch %s', (f'City{i}',)) for i in range(33)]
+        
+        passed = [record for record in records if log_filter.filter(record)]
+        
+        self.assertEqual(len(passed), 6)
+        self.assertEqual(passed[2].getMessage(), 'Failed to fetch City2')
+        self.assertEqual(passed[3].getMessage(), 'Failed to fetch City12 (9 similar messages suppressed)')
+        self.assertEqual(passed[3].suppressed, 9)
+        
+    def test_groups_and_levels_are_independent(self):
+        """Test different templates are limited separately and info records are never limited."""
+        log_filter = RateLimitFilter(burst=1, interval=60, sample_every=0)
+        
+        self.assertTrue(log_filter.filter(make_record('Template A')))
+        self.assertFalse(log_filter.filter(make_record('Template A')))
+        self.assertTrue(log_filter.filter(make_record('Template B')))
+        self.assertTrue(all(log_filter.filter(make_record('Chatty', level=logging.INFO)) for _ in range(50)))
+        
+    def test_window_resets_after_interval(self):
+        """Test records pass again once the interval has elapsed."""
+        log_filter = RateLimitFilter(burst=1, interval=0, sample_every=0)
+        
+        self.assertTrue(log_filter.filter(make_record('Outage')))
+        self.assertTrue(log_filter.filter(make_record('Outage')))
+
+
+class TestQueueLogging(unittest.TestCase):
+    """Unit tests for the queue-backed handler and formatters."""
+    
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test records beyond the queue size are counted and dropped."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=2))
+        
+        for i in range(5):
+            handler.handle(make_record('record %d', (i,)))
+        
+        self.assertEqual(handler.queue.qsize(), 2)
+        self.assertEqual(handler.dropped, 3)
+        
+    def test_json_formatter_includes_extra_fields(self):
+        """Test structured output carries the message, level and extra= fields."""
+        record = make_record('Shipped %d records', (5,))
+        record.batch_id = 'abc'
+        
+        entry = json.loads(JsonFormatter().format(record))
+        
+        self.assertEqual(entry['message'], 'Shipped 5 records')
+        self.assertEqual(entry['level'], 'WARNING')
+        self.assertEqual(entry['batch_id'], 'abc')
+        
+    def test_configure_and_shutdown_flushes_output(self):
+        """Test records logged through the queue are written once logging shuts down."""
+        output = io.StringIO()
+        root_level = logging.getLogger().level
+        
+        try:
+            with contextlib.redirect_stdout(output):
+                configure_logging({'level': 'DEBUG', 'format': 'json'})
+                logging.getLogger('weather_shipper.test').debug('queued %s', 'message')
+                shutdown_logging()
+        finally:
+            logging.getLogger().setLevel(root_level)
+        
+        entry = json.loads(output.getvalue().strip())
+        self.assertEqual(entry['message'], 'queued message')
+        self.assertEqual(entry['logger'], 'weather_shipper.test')
+
+
+if __name__ == '__main__':
+    unittest.main()
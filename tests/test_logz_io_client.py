@@ -0,0 +1,145 @@
+import gzip
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.shipper.compression import compress_payload
+from src.metrics import COMPRESS_SECONDS, PAYLOAD_BYTES
+from src.resilience import configure_resilience
+from src.shipper.logz_io_client import split_into_batches, ship_batches_with_retry
+
+
+def make_records(count):
+    return [
+        {'city': f'City{i}', 'temperature_celsius': float(i), 'description': 'sunny', 'source_provider': 'test'}
+        for i in range(count)
+    ]
+
+
+class TestBatching(unittest.TestCase):
+    """Unit tests for splitting records into shippable batches."""
+    
+    def test_batches_capped_by_record_count(self):
+        """Test no batch holds more than max_records records."""
+        batches = split_into_batches(make_records(250), max_records=100, max_bytes=10_000_000)
+        
+        self.assertEqual([len(batch.records) for batch in batches], [100, 100, 50])
+    
+    def test_batches_capped_by_payload_size(self):
+        """Test no batch payload exceeds max_bytes and nothing is lost."""
+        records = make_records(50)
+        line_bytes = len(json.dumps(records[0]))
+        
+        batches = split_into_batches(records, max_records=100, max_bytes=line_bytes * 5)
+        
+        self.assertTrue(all(len(batch.payload) <= line_bytes * 5 for batch in batches))
+        self.assertEqual([r for batch in batches for r in batch.records], records)
+    
+    def test_payload_is_ndjson(self):
+        """Test batch payloads are newline-delimited JSON of their records."""
+        batch = split_into_batches(make_records(3), max_records=10, max_bytes=10_000)[0]
+        
+        self.assertEqual([json.loads(line) for line in batch.payload.split(b'\n')], batch.records)
+
+
+class TestShipBatchesWithRetry(unittest.TestCase):
+    """Unit tests for batch-level retry."""
+    
+    config = {
+        'logz_io': {'host': 'localhost', 'token': 'test', 'max_in_flight': 2},
+        'network': {'retry_attempts': 2, 'retry_delay_base': 0},
+        'data_processing': {'batch_size': 10},
+    }
+    
+    def setUp(self):
+        configure_resilience({})
+    
+    def test_only_failed_batches_are_retried(self):
+        """Test a retry re-sends only the batch that failed the first time."""
+        sent = []
+        
+        def fake_post(payload, record_count, logz_config, session=None):
+            first_city = json.loads(payload.split(b'\n')[0])['city']
+            sent.append(first_city)
+            # The second batch fails once, then succeeds
+            return not (first_city == 'City10' and sent.count('City10') == 1)
+        
+        with patch('src.shipper.logz_io_client._post_payload', side_effect=fake_post):
+            unshipped = ship_batches_with_retry(make_records(30), self.config)
+        
+        self.assertEqual(unshipped, [])
+        self.assertEqual(sorted(sent), ['City0', 'City10', 'City10', 'City20'])
+    
+    def test_unshipped_records_returned_after_all_retries(self):
+        """Test records from batches that never succeed are handed back."""
+        records = make_records(25)
+        
+        def fake_post(payload, record_count, logz_config, session=None):
+            return json.loads(payload.split(b'\n')[0])['city'] != 'City20'
+        
+        with patch('src.shipper.logz_io_client._post_payload', side_effect=fake_post):
+            unshipped = ship_batches_with_retry(records, self.config)
+        
+        self.assertEqual(unshipped, records[20:])
+
+    def test_listener_scheme_is_configurable(self):
+        """Test logz_io.scheme selects the listener URL scheme (https by default)."""
+        for scheme, expected_url in ((None, 'https://localhost:8071/?token=test'),
+                                     ('http', 'http://localhost:8071/?token=test')):
+            with self.subTest(scheme=scheme):
+                config = dict(self.config, logz_io=dict(self.config['logz_io']))
+                if scheme:
+                    config['logz_io']['scheme'] = scheme
+                session = MagicMock()
+                session.post.return_value.status_code = 200
+                
+                self.assertEqual(ship_batches_with_retry(make_records(1), config, session=session), [])
+                self.assertEqual(session.post.call_args[0][0], expected_url)
+
+
+
+class TestCompression(unittest.TestCase):
+    """Unit tests for optional gzip compression of shipping payloads."""
+    
+    def test_large_payload_is_gzipped(self):
+        """Test payloads above the threshold are gzipped and round-trip."""
+        payload = split_into_batches(make_records(100), 100, 10_000_000)[0].payload
+        
+        result = compress_payload(payload, {'enabled': True, 'level': 6, 'min_size_bytes': 1024})
+        
+        self.assertEqual(result.encoding, 'gzip')
+        self.assertEqual(gzip.decompress(result.body), payload)
+        self.assertGreater(result.ratio, 1.0)
+    
+    def test_small_or_disabled_payload_is_sent_as_is(self):
+        """Test compression is skipped below the threshold or when disabled."""
+        payload = b'{"city": "Berlin"}'
+        
+        for config in ({'enabled': True, 'min_size_bytes': 1024}, {'enabled': False}):
+            with self.subTest(config=config):
+                result = compress_payload(payload, config)
+                self.assertIsNone(result.encoding)
+                self.assertEqual(result.body, payload)
+
+    def test_compression_is_reported_through_metrics(self):
+        """Test shipping counts raw and sent payload bytes and times the compression."""
+        configure_resilience({})
+        config = {
+            'logz_io': {'host': 'localhost', 'token': 'test', 'compression': {'enabled': True, 'min_size_bytes': 0}},
+            'network': {'retry_attempts': 1, 'retry_delay_base': 0},
+            'data_processing': {'batch_size': 100},
+        }
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        raw_before, sent_before = PAYLOAD_BYTES.labels('raw').get(), PAYLOAD_BYTES.labels('sent').get()
+        compressions_before = COMPRESS_SECONDS.labels().snapshot()[2]
+        
+        self.assertEqual(ship_batches_with_retry(make_records(100), config, session=session), [])
+        
+        body = session.post.call_args[1]['data']
+        self.assertEqual(PAYLOAD_BYTES.labels('raw').get() - raw_before, len(gzip.decompress(body)))
+        self.assertEqual(PAYLOAD_BYTES.labels('sent').get() - sent_before, len(body))
+        self.assertEqual(COMPRESS_SECONDS.labels().snapshot()[2] - compressions_before, 1)
+
+if __name__ == '__main__':
+    unittest.main()
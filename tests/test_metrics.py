@@ -0,0 +1,108 @@
+import json
+import unittest
+import urllib.error
+import urllib.request
+
+from src.metrics import Counter, Gauge, Histogram, MetricsRegistry, _Metric, start_metrics_server
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the metrics registry and Prometheus text output."""
+    
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        
+    def test_metric_types_must_define_their_children(self):
+        """Test a metric type without _new_child cannot be instantiated."""
+        class Untyped(_Metric):
+            metric_type = 'untyped'
+        
+        with self.assertRaises(TypeError):
+            Untyped('untyped', 'No children', registry=self.registry)
+        self.assertEqual(self.registry.render(), '\n')
+        
+    def test_counter_with_labels(self):
+        """Test labelled counters render one sample per label combination."""
+        counter = Counter('fetches_total', 'Fetches', ['source'], registry=self.registry)
+        counter.labels('csv').inc()
+        counter.labels('csv').inc(2)
+        counter.labels('say "hi"').inc()
+        
+        output = self.registry.render()
+        
+        self.assertIn('# TYPE fetches_total counter', output)
+        self.assertIn('fetches_total{source="csv"} 3', output)
+        self.assertIn('fetches_total{source="say \\"hi\\""} 1', output)
+        
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count follow the exposition format."""
+        histogram = Histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0), registry=self.registry)
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        
+        output = self.registry.render()
+        
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', output)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 3', output)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', output)
+        self.assertIn('latency_seconds_sum 6.05', output)
+        self.assertIn('latency_seconds_count 4', output)
+        
+    def test_gauge_function_is_read_at_scrape_time(self):
+        """Test callback gauges are evaluated when rendered, not when set."""
+        depth = [3]
+        gauge = Gauge('queue_depth', 'Depth', registry=self.registry)
+        gauge.set_function(lambda: depth[0])
+        depth[0] = 7
+        
+        self.assertIn('queue_depth 7', self.registry.render())
+        
+    def test_label_count_is_checked(self):
+        """Test using the wrong number of label values is an error."""
+        counter = Counter('errors_total', 'Errors', ['source', 'city'], registry=self.registry)
+        
+        with self.assertRaises(ValueError):
+            counter.labels('csv')
+            
+    def test_http_endpoint(self):
+        """Test the server exposes the registry at /metrics."""
+        Counter('up_total', 'Up', registry=self.registry).inc()
+        server = start_metrics_server('127.0.0.1', 0, registry=self.registry)
+        
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode('utf-8')
+                content_type = response.headers['Content-Type']
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertIn('up_total 1', body)
+        self.assertTrue(content_type.startswith('text/plain; version=0.0.4'))
+
+    def test_health_endpoint(self):
+        """Test /health returns the health callback's details, with 503 when unhealthy."""
+        health = {'healthy': True}
+        server = start_metrics_server('127.0.0.1', 0, registry=self.registry,
+                                      health=lambda: (health['healthy'], {'cycles': 3}))
+        
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/health"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = json.loads(response.read())
+            
+            health['healthy'] = False
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(url, timeout=5)
+            context.exception.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertEqual(body, {'cycles': 3})
+        self.assertEqual(context.exception.code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from src.shipper.recovery import RecoveryReplayer
+
+
+class TestRecoveryReplayer(unittest.TestCase):
+    """Unit tests for streaming replay of the recovery file."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.recovery_file = os.path.join(self.directory, 'unsent_data.jsonl')
+        self.records = [{'city': f'City{i}', 'temperature_celsius': float(i)} for i in range(25)]
+        with open(self.recovery_file, 'w') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_replays_in_batches_and_removes_file(self):
+        """Test the file is shipped batch by batch and deleted when done."""
+        shipped = []
+        
+        def ship(records):
+            shipped.append(records)
+            return []
+        
+        replayer = RecoveryReplayer(self.recovery_file, ship, batch_size=10)
+        replayer.run()
+        
+        self.assertEqual([len(batch) for batch in shipped], [10, 10, 5])
+        self.assertEqual([r for batch in shipped for r in batch], self.records)
+        self.assertFalse(RecoveryReplayer.has_pending(self.recovery_file))
+        self.assertEqual(os.listdir(self.directory), [])
+    
+    def test_resumes_from_acknowledged_offset(self):
+        """Test a replay stopped part-way resumes after the last acknowledged batch."""
+        first_run = []
+        
+        def ship_then_stop(records):
+            first_run.append(records)
+            replayer.stop_event.set()
+            return []
+        
+        replayer = RecoveryReplayer(self.recovery_file, ship_then_stop, batch_size=10)
+        replayer.run()
+        
+        self.assertEqual(len(first_run), 1)
+        self.assertTrue(RecoveryReplayer.has_pending(self.recovery_file))
+        
+        second_run = []
+        resumed = RecoveryReplayer(self.recovery_file, lambda records: second_run.extend(records) or [], batch_size=10)
+        resumed.run()
+        
+        self.assertEqual(second_run, self.records[10:])
+    
+    def test_failed_batch_resends_only_unshipped_records(self):
+        """Test a partly failed batch re-sends only the records that were not accepted."""
+        attempts = []
+        
+        def ship(records):
+            attempts.append(records)
+            # The first attempt loses the second half of the batch
+            return records[len(records) // 2:] if len(attempts) == 1 else []
+        
+        RecoveryReplayer(self.recovery_file, ship, batch_size=100, retry_delay=0).run()
+        
+        self.assertEqual(attempts, [self.records, self.records[12:]])
+        
+    def test_rotation_waits_for_file_lock(self):
+        """Test the file is not rotated while a writer holds the shared lock."""
+        lock = threading.Lock()
+        shipped = []
+        replayer = RecoveryReplayer(self.recovery_file, lambda records: shipped.extend(records) or [],
+                                    file_lock=lock)
+        
+        with lock:
+            replayer.start()
+            replayer.join(0.2)
+            self.assertFalse(os.path.exists(self.recovery_file + '.replaying'))
+            # An append made under the lock is still part of the file being rotated
+            with open(self.recovery_file, 'a') as f:
+                f.write(json.dumps({'city': 'Late'}) + '\n')
+        replayer.join(5)
+        
+        self.assertEqual(shipped, self.records + [{'city': 'Late'}])
+        
+    def test_new_records_go_to_fresh_file(self):
+        """Test records saved during replay land in a new recovery file that is replayed too."""
+        shipped = []
+        
+        def ship(records):
+            if not shipped:
+                with open(self.recovery_file, 'a') as f:
+                    f.write(json.dumps({'city': 'Late'}) + '\n')
+            shipped.extend(records)
+            return []
+        
+        RecoveryReplayer(self.recovery_file, ship, batch_size=100).run()
+        
+        self.assertEqual(shipped, self.records + [{'city': 'Late'}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+from src.data_sources.concurrency import RateLimiter
+from src.data_sources.weatherapi_source import fetch_weatherapi_data
+from src.resilience import (CircuitBreaker, CircuitOpenError, ProviderGuard, ThrottledError,
+                            configure_resilience, get_provider_guard, parse_retry_after)
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to (or when the guard sleeps)."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_response(status_code, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Unit tests for the per-provider circuit breaker."""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, open_seconds=30, max_open_seconds=100,
+                                      clock=self.clock)
+    
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens on the Nth failure in a row, and a success resets the count."""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.before_call()
+        
+        self.breaker.record_failure()
+        
+        self.assertEqual(self.breaker.state, 'open')
+        self.assertEqual(self.breaker.retry_in(), 30)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+            
+    def test_half_open_allows_a_single_probe(self):
+        """Test one probe goes through after open_seconds, and its success closes the circuit."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.advance(30)
+        
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.before_call()
+        
+    def test_failed_probes_back_off(self):
+        """Test each failed probe doubles the open period, up to max_open_seconds."""
+        for _ in range(3):
+            self.breaker.record_failure()
+        
+        open_periods = []
+        for _ in range(3):
+            self.clock.advance(self.breaker.retry_in())
+            self.breaker.before_call()
+            self.breaker.record_failure()
+            open_periods.append(self.breaker.retry_in())
+        
+        self.assertEqual(open_periods, [60, 100, 100])
+
+
+class TestProviderGuard(unittest.TestCase):
+    """Unit tests for routing requests through a provider guard."""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleeps = []
+        
+        def sleep(seconds):
+            self.sleeps.append(seconds)
+            self.clock.advance(seconds)
+        
+        self.breaker = CircuitBreaker('test', failure_threshold=2, clock=self.clock)
+        self.limiter = RateLimiter(requests_per_second=10)
+        self.guard = ProviderGuard(self.breaker, self.limiter, max_retry_wait=10, default_retry_after=5,
+                                   clock=self.clock, sleep=sleep)
+    
+    def test_server_errors_and_exceptions_trip_the_circuit(self):
+        """Test 5xx responses and connection errors count as failures; 4xx responses do not."""
+        self.guard.call(lambda: make_response(404))
+        self.guard.call(lambda: make_response(503))
+        self.assertEqual(self.breaker.state, 'closed')
+        
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.guard.call(MagicMock(side_effect=requests.exceptions.ConnectionError('refused')))
+        
+        send = MagicMock()
+        with self.assertRaises(CircuitOpenError):
+            self.guard.call(send)
+        send.assert_not_called()
+        self.assertIn('circuit open', self.guard.unavailable_reason())
+        
+    def test_429_pauses_and_slows_down(self):
+        """Test a 429 waits out Retry-After before the next request and halves the rate."""
+        self.guard.call(lambda: make_response(429, {'Retry-After': '3'}))
+        
+        self.assertEqual(self.limiter.rate, 5)
+        self.assertEqual(self.breaker.state, 'closed')
+        
+        self.guard.call(lambda: make_response(200))
+        self.assertEqual(self.sleeps, [3])
+        self.assertEqual(self.limiter.rate, 5.5)
+        
+    def test_long_retry_after_rejects_requests(self):
+        """Test a pause longer than max_retry_wait rejects requests instead of blocking."""
+        self.guard.call(lambda: make_response(429, {'Retry-After': '120'}))
+        
+        with self.assertRaises(ThrottledError):
+            self.guard.call(MagicMock())
+        self.assertIn('rate limited', self.guard.unavailable_reason())
+        
+        self.clock.advance(115)
+        self.assertIsNone(self.guard.unavailable_reason())
+        
+    def test_retry_after_formats(self):
+        """Test Retry-After is read as seconds or an HTTP date, with a default otherwise."""
+        self.assertEqual(parse_retry_after('7', 5), 7)
+        self.assertEqual(parse_retry_after(None, 5), 5)
+        self.assertEqual(parse_retry_after('soon', 5), 5)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', 5), 0)
+
+
+class TestSourceCircuit(unittest.TestCase):
+    """Unit tests for the circuit breaker around an API source."""
+    
+    def setUp(self):
+        configure_resilience({'data_processing': {'max_consecutive_failures': 3}})
+        
+    def tearDown(self):
+        configure_resilience({})
+        
+    def test_dead_provider_is_skipped_after_threshold(self):
+        """Test an unreachable provider stops being called once its circuit opens."""
+        session = MagicMock()
+        session.get.side_effect = requests.exceptions.ConnectTimeout('timed out')
+        source_config = {'api_key': 'test', 'cities': [f'City{i}' for i in range(10)]}
+        
+        self.assertEqual(fetch_weatherapi_data(source_config, session=session), [])
+        self.assertEqual(session.get.call_count, 3)
+        
+        # The next cycle skips the source without sending anything
+        self.assertEqual(fetch_weatherapi_data(source_config, session=session), [])
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(get_provider_guard('weatherapi').breaker.failure_threshold, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.data_sources.cache import (
+    ResponseCache,
+    MemoryCacheBackend,
+    DiskCacheBackend,
+)
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+    
+    def __init__(self, status_code=200, headers=None, temperature=20.0):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.temperature = temperature
+
+
+def parse(response):
+    return {'city': 'Berlin', 'temperature': response.temperature}
+
+
+class TestResponseCache(unittest.TestCase):
+    """Unit tests for the TTL response cache."""
+    
+    def setUp(self):
+        self.sent = []
+    
+    def sender(self, *responses):
+        responses = list(responses)
+        
+        def send(headers):
+            self.sent.append(headers)
+            return responses.pop(0)
+        return send
+    
+    def test_fresh_entry_is_a_hit(self):
+        """Test a cached record is served without a request until it expires."""
+        cache = ResponseCache(MemoryCacheBackend(), default_ttl=60)
+        send = self.sender(FakeResponse(temperature=21.5))
+        
+        first = cache.fetch('openweathermap', 'Berlin', send, parse)
+        second = cache.fetch('openweathermap', 'Berlin', send, parse)
+        
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'revalidated': 0})
+    
+    def test_cache_control_overrides_ttl(self):
+        """Test max-age=0 and no-store responses are fetched again every time."""
+        for header in ('max-age=0', 'no-store'):
+            with self.subTest(cache_control=header):
+                cache = ResponseCache(MemoryCacheBackend(), default_ttl=60)
+                response = FakeResponse(headers={'Cache-Control': header})
+                send = self.sender(response, response)
+                
+                cache.fetch('weatherapi', 'Berlin', send, parse)
+                cache.fetch('weatherapi', 'Berlin', send, parse)
+                
+                self.assertEqual(cache.stats()['misses'], 2)
+    
+    def test_etag_revalidation(self):
+        """Test an expired entry with an ETag is revalidated and a 304 reuses it."""
+        cache = ResponseCache(MemoryCacheBackend(), default_ttl=0)
+        send = self.sender(
+            FakeResponse(headers={'ETag': '"v1"'}, temperature=18.0),
+            FakeResponse(status_code=304, headers={'ETag': '"v1"'}),
+        )
+        
+        cache.fetch('openweathermap', 'Berlin', send, parse)
+        record = cache.fetch('openweathermap', 'Berlin', send, parse)
+        
+        self.assertEqual(record['temperature'], 18.0)
+        self.assertEqual(self.sent[1], {'If-None-Match': '"v1"'})
+        self.assertEqual(cache.stats()['revalidated'], 1)
+    
+    def test_lru_evicts_least_recently_used(self):
+        """Test the memory backend keeps only max_entries entries."""
+        cache = ResponseCache(MemoryCacheBackend(max_entries=2), default_ttl=60)
+        send = self.sender(*(FakeResponse() for _ in range(4)))
+        
+        for city in ('Berlin', 'Tokyo', 'Berlin', 'Paris', 'Tokyo'):
+            cache.fetch('openweathermap', city, send, parse)
+        
+        # Tokyo was evicted by Paris and had to be fetched again
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 4, 'revalidated': 0})
+    
+    def test_disk_backend_survives_restart(self):
+        """Test entries written to the disk backend are readable by a new cache."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'cache.sqlite3')
+            cache = ResponseCache(DiskCacheBackend(path), default_ttl=60)
+            cache.fetch('weatherapi', 'Berlin', self.sender(FakeResponse(temperature=9.5)), parse)
+            cache.close()
+            
+            reopened = ResponseCache(DiskCacheBackend(path), default_ttl=60)
+            record = reopened.fetch('weatherapi', 'Berlin', self.sender(), parse)
+            reopened.close()
+            
+            self.assertEqual(record['temperature'], 9.5)
+            self.assertEqual(reopened.stats()['hits'], 1)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
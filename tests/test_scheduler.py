@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import unittest
+
+from src.scheduler import DeadlineScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to (or when a wait times out)."""
+    
+    def __init__(self):
+        self.now = 1000.0
+        
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeStopEvent:
+    """threading.Event stand-in whose timed waits advance the fake clock instead of sleeping."""
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.flag = False
+        self.waits = []
+        
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        if not self.flag:
+            self.clock.advance(timeout)
+        return self.flag
+    
+    def is_set(self):
+        return self.flag
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    """Unit tests for the fixed-deadline polling scheduler."""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.stop = FakeStopEvent(self.clock)
+        
+    def test_deadlines_do_not_drift_with_cycle_time(self):
+        """Test the wait shrinks by the time the cycle took, keeping a fixed period."""
+        scheduler = DeadlineScheduler(60, clock=self.clock)
+        start = self.clock.now
+        
+        deadlines = []
+        for _ in range(4):
+            tick = scheduler.wait(self.stop)
+            deadlines.append(tick.deadline - start)
+            self.clock.advance(15)  # the cycle itself
+        
+        self.assertEqual(deadlines, [0, 60, 120, 180])
+        self.assertEqual(self.stop.waits, [45, 45, 45])
+        
+    def test_overrun_is_coalesced_into_one_immediate_tick(self):
+        """Test a cycle overrunning several deadlines produces a single late tick, then the grid resumes."""
+        scheduler = DeadlineScheduler(10, 'coalesce', clock=self.clock)
+        start = self.clock.now
+        scheduler.wait(self.stop)
+        
+        self.clock.advance(35)  # deadlines at 10, 20 and 30 pass during the cycle
+        tick = scheduler.wait(self.stop)
+        
+        self.assertEqual((tick.deadline - start, tick.lag, tick.missed), (30, 5, 2))
+        self.assertEqual(self.stop.waits, [])
+        self.assertEqual(scheduler.wait(self.stop).deadline - start, 40)
+        
+    def test_overrun_is_skipped_until_next_deadline(self):
+        """Test the skip policy drops overdue deadlines and waits for the next future one."""
+        scheduler = DeadlineScheduler(10, 'skip', clock=self.clock)
+        start = self.clock.now
+        scheduler.wait(self.stop)
+        
+        self.clock.advance(35)
+        tick = scheduler.wait(self.stop)
+        
+        self.assertEqual((tick.deadline - start, tick.lag, tick.missed), (40, 0, 3))
+        self.assertEqual(self.stop.waits, [5])
+        
+    def test_stop_event_ends_wait_immediately(self):
+        """Test a real stop event interrupts a long wait without waiting for the deadline."""
+        scheduler = DeadlineScheduler(3600)
+        stop = threading.Event()
+        self.assertIsNotNone(scheduler.wait(stop))
+        
+        threading.Timer(0.05, stop.set).start()
+        self.assertIsNone(scheduler.wait(stop))
+        
+    def test_async_wait_stops_on_event(self):
+        """Test the asyncio variant fires on the first deadline and returns None once stopped."""
+        async def run():
+            scheduler = DeadlineScheduler(3600)
+            stop = asyncio.Event()
+            first = await scheduler.wait_async(stop)
+            asyncio.get_running_loop().call_later(0.05, stop.set)
+            return first, await scheduler.wait_async(stop)
+        
+        first, second = asyncio.run(run())
+        
+        self.assertEqual(first.missed, 0)
+        self.assertIsNone(second)
+        
+    def test_invalid_settings_rejected(self):
+        """Test a non-positive interval or unknown policy raises ValueError."""
+        with self.assertRaises(ValueError):
+            DeadlineScheduler(0)
+        with self.assertRaises(ValueError):
+            DeadlineScheduler(10, 'catch_up')
+
+
+if __name__ == '__main__':
+    unittest.main()
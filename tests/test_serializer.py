@@ -0,0 +1,66 @@
+import json
+import threading
+import unittest
+
+from src.shipper.serializer import NdjsonSerializer, available_backends, orjson
+from src.transformers.weather_record import WeatherRecord
+
+
+class TestNdjsonSerializer(unittest.TestCase):
+    """Unit tests for the NDJSON payload serializer backends."""
+    
+    def setUp(self):
+        self.records = [
+            WeatherRecord('Berlin', 22.86, 'clear sky', 'openweathermap'),
+            WeatherRecord('São Paulo', -3.5, 'chuva "forte"', 'csv'),
+            # Records replayed from the spool or recovery file are plain dicts
+            {'city': 'Tokyo', 'temperature_celsius': 15.0, 'description': 'rain', 'source_provider': 'weatherapi'},
+        ]
+        self.expected = [dict(record) for record in self.records]
+        
+    def test_every_backend_round_trips(self):
+        """Test each available backend produces NDJSON of the records."""
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                payload = NdjsonSerializer(backend).serialize(self.records)
+                
+                self.assertIsInstance(payload, bytes)
+                self.assertEqual([json.loads(line) for line in payload.split(b'\n')], self.expected)
+                
+    def test_fixed_backend_matches_json_dumps(self):
+        """Test the stdlib fixed-schema backend is byte-identical to json.dumps."""
+        payload = NdjsonSerializer('fixed').serialize(self.records)
+        
+        self.assertEqual(payload, '\n'.join(json.dumps(record) for record in self.expected).encode('utf-8'))
+        
+    def test_auto_prefers_orjson_when_installed(self):
+        """Test 'auto' picks orjson if available and the stdlib backend otherwise."""
+        self.assertEqual(NdjsonSerializer('auto').backend, 'orjson' if orjson is not None else 'fixed')
+        
+    def test_empty_and_unknown(self):
+        """Test empty input serializes to nothing and unknown backends are rejected."""
+        self.assertEqual(NdjsonSerializer('fixed').serialize([]), b'')
+        with self.assertRaises(ValueError):
+            NdjsonSerializer('msgpack')
+            
+    def test_threads_use_separate_buffers(self):
+        """Test concurrent serialization from several threads does not mix payloads."""
+        serializer = NdjsonSerializer('fixed')
+        results = {}
+        
+        def work(index):
+            records = [WeatherRecord(f'City{index}', float(i), 'x', 'csv') for i in range(2000)]
+            results[index] = serializer.serialize(records)
+        
+        threads = [threading.Thread(target=work, args=(index,)) for index in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for index, payload in results.items():
+            self.assertEqual({json.loads(line)['city'] for line in payload.split(b'\n')}, {f'City{index}'})
+
+
+if __name__ == '__main__':
+    unittest.main()
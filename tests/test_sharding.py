@@ -0,0 +1,186 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.data_sources.csv_source import fetch_csv_data
+from src.sharding import (HashRing, ShardSupervisor, adopt_unsharded_recovery_file, merge_metrics, shard_config,
+                          shard_path)
+
+
+def exit_at_once(config, shard_index, shard_count):
+    """Shard worker that crashes right after starting."""
+    os._exit(3)
+
+
+class TestHashRing(unittest.TestCase):
+    """Unit tests for consistent hashing of cities to shards."""
+    
+    def setUp(self):
+        self.cities = [f"City{i:04d}" for i in range(2000)]
+        
+    def test_assignment_is_stable_and_balanced(self):
+        """Test every ring agrees on a key's shard, and shards get similar shares."""
+        ring = HashRing(4)
+        shards = [ring.shard_for(city) for city in self.cities]
+        
+        self.assertEqual(shards, [HashRing(4).shard_for(city) for city in self.cities])
+        for shard in range(4):
+            self.assertGreater(shards.count(shard), 2000 / 4 * 0.7)
+            self.assertLess(shards.count(shard), 2000 / 4 * 1.3)
+            
+    def test_adding_a_shard_moves_few_keys(self):
+        """Test going from 4 to 5 shards only moves keys to the new shard, about a fifth of them."""
+        before, after = HashRing(4), HashRing(5)
+        moved = [city for city in self.cities if before.shard_for(city) != after.shard_for(city)]
+        
+        self.assertLess(len(moved), 2000 * 0.3)
+        self.assertTrue(all(after.shard_for(city) == 4 for city in moved))
+
+
+class TestShardConfig(unittest.TestCase):
+    """Unit tests for deriving shard worker configurations."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = {
+            'data_sources': [
+                {'type': 'openweathermap', 'cities': [f"City{i}" for i in range(100)], 'requests_per_second': 9},
+                {'type': 'csv', 'file_path': os.path.join(self.temp_dir, 'single.csv')},
+                {'type': 'csv', 'file_path': os.path.join(self.temp_dir, 'incoming', '*.csv'),
+                 'manifest_file': os.path.join(self.temp_dir, 'manifest.json')}
+            ],
+            'metrics': {'enabled': True, 'port': 9200}
+        }
+        
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        
+    def test_cities_are_partitioned(self):
+        """Test each city lands on exactly one shard and rate limits are split."""
+        shards = [shard_config(self.config, index, 3) for index in range(3)]
+        cities = [city for config in shards for city in config['data_sources'][0]['cities']]
+        
+        self.assertEqual(sorted(cities), sorted(self.config['data_sources'][0]['cities']))
+        self.assertEqual(shards[1]['data_sources'][0]['requests_per_second'], 3)
+        self.assertEqual(len(self.config['data_sources'][0]['cities']), 100)
+        
+    def test_unsplittable_source_runs_on_one_shard(self):
+        """Test a single CSV file is read by one shard only."""
+        shards = [shard_config(self.config, index, 3) for index in range(3)]
+        enabled = [config['data_sources'][1].get('enabled', True) for config in shards]
+        
+        self.assertEqual(enabled.count(True), 1)
+        
+    def test_state_files_and_ports_are_per_shard(self):
+        """Test each shard gets its own state files, spool directory and metrics port."""
+        config = shard_config(self.config, 2, 3)
+        
+        self.assertEqual(config['data_sources'][0]['city_id_file'], './owm_city_ids.shard-2.json')
+        self.assertEqual(config['data_sources'][2]['manifest_file'],
+                         os.path.join(self.temp_dir, 'manifest.shard-2.json'))
+        self.assertEqual(config['application']['recovery_file'], './unsent_data.shard-2.jsonl')
+        self.assertEqual(config['spool']['directory'], os.path.join('./spool', 'shard-2'))
+        self.assertEqual(config['metrics']['port'], 9203)
+        self.assertEqual(config['logging']['fields'], {'shard': 2})
+        self.assertEqual(shard_path('data/cache', 0), 'data/cache.shard-0')
+        
+    def test_csv_files_are_partitioned(self):
+        """Test shards of a glob CSV source read disjoint sets of files that cover them all."""
+        os.makedirs(os.path.join(self.temp_dir, 'incoming'))
+        for i in range(12):
+            with open(os.path.join(self.temp_dir, 'incoming', f'station{i}.csv'), 'w') as f:
+                f.write(f"city,temperature,description\nStation{i},10.0,Clear\n")
+        
+        cities = []
+        for index in range(3):
+            source_config = shard_config(self.config, index, 3)['data_sources'][2]
+            cities.extend(row['city'] for row in fetch_csv_data(source_config))
+        
+        self.assertEqual(sorted(cities), sorted(f"Station{i}" for i in range(12)))
+
+
+class TestMergeMetrics(unittest.TestCase):
+    """Unit tests for combining shard metrics."""
+    
+    def test_samples_get_shard_labels(self):
+        """Test samples are labelled by shard and each family keeps one HELP and TYPE line."""
+        shard_text = ('# HELP records_total Records\n# TYPE records_total counter\n'
+                      'records_total{source="csv"} 3\ncycles_total 7\n')
+        own_text = '# HELP records_total Records\n# TYPE records_total counter\n'
+        
+        output = merge_metrics([(None, own_text), ('0', shard_text), ('1', shard_text)])
+        
+        self.assertEqual(output.count('# TYPE records_total counter'), 1)
+        self.assertIn('records_total{shard="0",source="csv"} 3', output)
+        self.assertIn('records_total{shard="1",source="csv"} 3', output)
+        self.assertIn('cycles_total{shard="1"} 7', output)
+
+
+class TestAdoptUnshardedRecoveryFile(unittest.TestCase):
+    """Unit tests for handing an unsharded run's recovery file over to shard 0."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.recovery_file = os.path.join(self.temp_dir, 'unsent_data.jsonl')
+        self.config = {'application': {'recovery_file': self.recovery_file}}
+        
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        
+    def test_unreplayed_records_move_to_shard_zero(self):
+        """Test pending and not yet replayed records are appended to shard 0's file, once."""
+        shard_file = shard_config(self.config, 0, 2)['application']['recovery_file']
+        with open(shard_file, 'w') as f:
+            f.write('{"city": "Shard"}\n')
+        with open(self.recovery_file + '.replaying', 'w') as f:
+            f.write('{"city": "Replayed"}\n{"city": "Interrupted"}\n')
+        with open(self.recovery_file + '.replaying.offset', 'w') as f:
+            f.write(str(len('{"city": "Replayed"}\n')))
+        with open(self.recovery_file, 'w') as f:
+            f.write('{"city": "Pending"}\n')
+        
+        with self.assertLogs('src.sharding', 'INFO'):
+            adopted = adopt_unsharded_recovery_file(self.config)
+        
+        with open(shard_file) as f:
+            self.assertEqual(f.read(), '{"city": "Shard"}\n{"city": "Interrupted"}\n{"city": "Pending"}\n')
+        self.assertEqual(adopted, len('{"city": "Interrupted"}\n{"city": "Pending"}\n'))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), [os.path.basename(shard_file)])
+        self.assertEqual(adopt_unsharded_recovery_file(self.config), 0)
+        
+    def test_nothing_to_adopt(self):
+        """Test no shard file is created when there is no unsharded recovery data."""
+        self.assertEqual(adopt_unsharded_recovery_file(self.config), 0)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+class TestShardSupervisor(unittest.TestCase):
+    """Unit tests for restarting shard workers."""
+    
+    def test_crashed_worker_is_restarted_with_backoff(self):
+        """Test a crashing worker is replaced only after it exits, with a growing delay."""
+        supervisor = ShardSupervisor({}, 1, exit_at_once, restart_delay=0.1, max_restart_delay=0.2)
+        supervisor.context = multiprocessing.get_context('spawn')
+        worker = supervisor.workers[0]
+        supervisor.start_worker(worker)
+        
+        delays = []
+        deadline = time.monotonic() + 30
+        while worker.restarts < 2 and time.monotonic() < deadline:
+            process = worker.process
+            supervisor.check_workers()
+            if process is not None and worker.process is None:
+                delays.append(worker.restart_delay)
+                # The old process is reaped before any new one starts
+                self.assertFalse(process.is_alive())
+            time.sleep(0.05)
+        
+        worker.process.join()
+        self.assertEqual(worker.restarts, 2)
+        self.assertEqual(delays, [0.1, 0.2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.data_sources import (SourceCapabilities, fetch_source_data, fetch_all_sources_data_async,
+                              get_source_plugin, register_configured_sources, register_source)
+from src.data_sources import registry
+
+
+def fake_fetch(source_config, session=None, cache=None):
+    return [{'city': city, 'source_provider': source_config['type']} for city in source_config.get('cities', [])]
+
+
+async def fake_fetch_async(source_config, session=None, cache=None):
+    await asyncio.sleep(0)
+    return fake_fetch(source_config)
+
+
+class TestSourceRegistry(unittest.TestCase):
+    """Unit tests for the data source registry and lazy loading."""
+    
+    def tearDown(self):
+        for name in ('test-config', 'test-function', 'test-async', 'test-entry-point'):
+            registry._registry.pop(name, None)
+            
+    def test_importing_package_does_not_load_sources(self):
+        """Test importing src.data_sources imports no source module and not requests."""
+        code = (
+            "import sys, src.data_sources\n"
+            "loaded = [m for m in ('requests', 'src.data_sources.csv_source', "
+            "'src.data_sources.openweathermap_source') if m in sys.modules]\n"
+            "print(','.join(loaded))"
+        )
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        
+        self.assertEqual(output.strip(), '')
+        
+    def test_builtin_capabilities(self):
+        """Test the built-in sources declare what they support."""
+        csv = get_source_plugin('csv').capabilities
+        
+        self.assertTrue(csv.supports_incremental and csv.supports_batching)
+        self.assertFalse(get_source_plugin('openweathermap').capabilities.supports_incremental)
+        
+    def test_configured_plugin_loaded_by_target(self):
+        """Test a source_plugins entry is imported from its 'module:function' target on first fetch."""
+        register_configured_sources({'source_plugins': {'test-config': 'tests.test_source_registry:fake_fetch'}})
+        
+        result = fetch_source_data({'type': 'test-config', 'cities': ['Berlin']})
+        
+        self.assertEqual(result, [{'city': 'Berlin', 'source_provider': 'test-config'}])
+        
+    def test_unsupported_mode_rejected(self):
+        """Test asking a source for a read mode it does not support raises ValueError."""
+        register_source('test-function', fake_fetch)
+        
+        with self.assertRaises(ValueError):
+            fetch_source_data({'type': 'test-function', 'mode': 'incremental'})
+            
+    def test_async_source_from_sync_and_async_paths(self):
+        """Test coroutine sources work from the threaded path and are awaited directly on the loop."""
+        register_source('test-async', fake_fetch_async, SourceCapabilities(supports_async=True))
+        source_config = {'type': 'test-async', 'cities': ['Tokyo']}
+        
+        self.assertEqual(fetch_source_data(source_config)[0]['city'], 'Tokyo')
+        result = asyncio.run(fetch_all_sources_data_async({'data_sources': [source_config]}))
+        self.assertEqual(result[0]['city'], 'Tokyo')
+        
+    def test_entry_point_consulted_for_unknown_type(self):
+        """Test an unregistered type is looked up in installed entry points, and unknown types fail."""
+        entry_point = MagicMock()
+        entry_point.load.return_value = fake_fetch
+        
+        def fake_entry_points(group, name=None):
+            return [entry_point] if name == 'test-entry-point' else []
+        
+        with patch('importlib.metadata.entry_points', side_effect=fake_entry_points):
+            plugin = get_source_plugin('test-entry-point')
+            with self.assertRaises(ValueError):
+                get_source_plugin('no-such-source')
+        
+        self.assertEqual(plugin.name, 'test-entry-point')
+        self.assertIs(plugin.load(), fake_fetch)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import main
+from src.shipper.spool import Spool
+
+
+def make_records(start, count):
+    return [{'city': f'City{i}', 'temperature_celsius': float(i)} for i in range(start, start + count)]
+
+
+class TestSpool(unittest.TestCase):
+    """Unit tests for the durable on-disk spool."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_read_and_ack_in_order(self):
+        """Test records come back oldest first and ack advances the reader."""
+        spool = Spool(self.directory)
+        spool.append(make_records(0, 5))
+        
+        records, position = spool.read(3)
+        self.assertEqual(records, make_records(0, 3))
+        
+        # Unacknowledged records are read again
+        self.assertEqual(spool.read(3)[0], make_records(0, 3))
+        
+        spool.ack(position)
+        records, position = spool.read(10)
+        self.assertEqual(records, make_records(3, 2))
+        
+        spool.ack(position)
+        self.assertEqual(spool.read(10)[0], [])
+        self.assertEqual(spool.pending_bytes(), 0)
+    
+    def test_replay_after_restart(self):
+        """Test a new spool on the same directory resumes from the checkpoint."""
+        spool = Spool(self.directory)
+        spool.append(make_records(0, 4))
+        spool.ack(spool.read(2)[1])
+        spool.close()
+        
+        reopened = Spool(self.directory)
+        
+        self.assertEqual(reopened.read(10)[0], make_records(2, 2))
+    
+    def test_segments_roll_and_are_deleted_once_consumed(self):
+        """Test appends roll over to new segments and acked segments are removed."""
+        spool = Spool(self.directory, segment_max_bytes=200)
+        for i in range(10):
+            spool.append(make_records(i * 3, 3))
+        
+        self.assertGreater(len(os.listdir(self.directory)), 2)
+        
+        records, position = spool.read(100)
+        self.assertEqual(records, make_records(0, 30))
+        spool.ack(position)
+        
+        segments = [name for name in os.listdir(self.directory) if name.startswith('segment-')]
+        self.assertEqual(len(segments), 1)
+    
+    def test_size_cap_drops_oldest_records(self):
+        """Test the spool stays under its size cap by dropping the oldest segments."""
+        spool = Spool(self.directory, segment_max_bytes=200, max_total_bytes=600)
+        for i in range(20):
+            spool.append(make_records(i * 3, 3))
+        
+        records, _ = spool.read(1000)
+        
+        self.assertGreater(spool.dropped_bytes, 0)
+        self.assertLessEqual(spool.pending_bytes(), 600 + 200)
+        self.assertEqual(records[-1], make_records(59, 1)[0])
+        self.assertNotEqual(records[0], make_records(0, 1)[0])
+    
+    def test_torn_tail_is_discarded(self):
+        """Test a partial record left by a crash does not corrupt later appends."""
+        spool = Spool(self.directory)
+        spool.append(make_records(0, 2))
+        spool.close()
+        with open(os.path.join(self.directory, 'segment-0000000001.jsonl'), 'ab') as f:
+            f.write(b'{"city": "Tor')
+        
+        reopened = Spool(self.directory)
+        reopened.append(make_records(2, 1))
+        
+        self.assertEqual(reopened.read(10)[0], make_records(0, 3))
+
+
+class TestSpoolDrainInPipeline(unittest.TestCase):
+    """Unit tests for when the pipeline replays spooled records."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.shipper = main.WeatherDataShipper(config={'data_sources': []})
+        self.shipper.spool = Spool(self.directory)
+        self.shipper.spool.append(make_records(0, 3))
+        
+    def tearDown(self):
+        self.shipper.spool.close()
+        shutil.rmtree(self.directory)
+        
+    @patch('main.ship_batches_with_retry', return_value=[])
+    def test_cycle_without_records_drains_the_spool(self, ship):
+        """Test spooled records are replayed even when no cycle has records of its own to ship."""
+        self.assertTrue(self.shipper.polling_cycle())
+        
+        ship.assert_called_once()
+        self.assertEqual(ship.call_args.args[0], make_records(0, 3))
+        self.assertEqual(self.shipper.spool.pending_bytes(), 0)
+        
+    @patch('main.ship_batches_with_retry', side_effect=lambda records, config, session=None: records)
+    def test_failed_drain_keeps_records_for_the_next_cycle(self, ship):
+        """Test records stay spooled while the listener is still down."""
+        with self.assertLogs('weather_shipper', 'WARNING'):
+            self.shipper.polling_cycle()
+        
+        self.assertEqual(self.shipper.spool.read(10)[0], make_records(0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from src.transformers.weather_record import WeatherRecord, record_to_json
+from src.transformers.weather_transformer import transform_single_record
+from src.shipper.logz_io_client import build_payload
+
+
+class TestWeatherRecord(unittest.TestCase):
+    """Unit tests for the compact unified record type."""
+    
+    def setUp(self):
+        self.record = WeatherRecord('Berlin', 22.86, 'clear sky', 'openweathermap')
+        self.as_dict = {
+            'city': 'Berlin',
+            'temperature_celsius': 22.86,
+            'description': 'clear sky',
+            'source_provider': 'openweathermap'
+        }
+        
+    def test_behaves_like_the_record_dict(self):
+        """Test mapping-style access and equality with the equivalent dict."""
+        self.assertEqual(self.record, self.as_dict)
+        self.assertEqual(dict(self.record), self.as_dict)
+        self.assertEqual(self.record['city'], 'Berlin')
+        self.assertEqual(self.record.get('missing', 'default'), 'default')
+        self.assertIn('temperature_celsius', self.record)
+        self.assertNotIn('humidity', self.record)
+        with self.assertRaises(KeyError):
+            self.record['humidity']
+        with self.assertRaises(AttributeError):
+            self.record.humidity = 50
+            
+    def test_strings_are_interned(self):
+        """Test records with equal strings share one string object."""
+        other = transform_single_record({
+            'city': ''.join(['Ber', 'lin']),
+            'temperature': '1.0',
+            'description': 'clear sky',
+            'source_provider': 'openweathermap'
+        })
+        
+        self.assertIs(other['city'], self.record.city)
+        
+    def test_json_matches_json_dumps_of_dict(self):
+        """Test direct serialization produces exactly what json.dumps gives for the dict."""
+        cases = [
+            WeatherRecord('São Paulo "Centro"', -0.0, 'chuva\nforte', 'csv'),
+            WeatherRecord('Tokyo', 1e400, '晴れ', 'weatherapi'),
+            WeatherRecord('Oslo', 15.300000000000001, 'x', 'csv'),
+        ]
+        
+        for record in [self.record] + cases:
+            with self.subTest(record=record):
+                self.assertEqual(record.to_json(), json.dumps(record.to_dict()))
+                self.assertEqual(json.loads(record_to_json(record)), record.to_dict())
+                
+    def test_payload_mixes_records_and_dicts(self):
+        """Test NDJSON payloads accept both records and dicts read back from disk."""
+        payload = build_payload([self.record, self.as_dict])
+        
+        self.assertEqual([json.loads(line) for line in payload.split(b'\n')], [self.as_dict, self.as_dict])
+
+
+if __name__ == '__main__':
+    unittest.main()
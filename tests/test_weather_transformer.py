@@ -1,7 +1,10 @@
+import json
 import unittest
 from src.transformers.weather_transformer import (
     transform_single_record, 
     transform_weather_data, 
+    transform_weather_batch,
+    transform_weather_records,
     validate_transformed_data
 )
 
@@ -104,6 +107,54 @@ class TestWeatherTransformer(unittest.TestCase):
         self.assertEqual(result[0]['city'], 'Berlin')
         self.assertEqual(result[1]['city'], 'Tokyo')
     
+    def test_transformed_records_round_trip_through_json(self):
+        """Test the public transform returns plain dicts that json.dumps accepts."""
+        raw_data = [{'city': 'Berlin', 'temperature': '22.5', 'description': 'sunny', 'source_provider': 'csv'}]
+        
+        result = transform_weather_data(raw_data)
+        
+        self.assertIs(type(result[0]), dict)
+        self.assertEqual(json.loads(json.dumps(result[0])), result[0])
+        self.assertEqual(json.loads(json.dumps(transform_single_record(raw_data[0]))), result[0])
+        self.assertEqual(transform_weather_records(raw_data), result)
+        
+    def test_transform_weather_batch_matches_per_record_path(self):
+        """Test the columnar transform produces exactly the per-record output."""
+        mixed_data = [
+            {'city': ' Berlin ', 'temperature': 22.5, 'description': 'sunny ', 'source_provider': 'test'},
+            {'temperature': 20.0, 'description': 'cloudy', 'source_provider': 'test'},
+            {'city': 'Tokyo', 'temperature': '15.0', 'description': 'rainy', 'source_provider': 'csv'},
+            {'city': 'Oslo', 'temperature': 'not_a_number', 'description': 'snow', 'source_provider': 'csv'},
+            {'city': 'Lima', 'temperature': None, 'description': 'fog', 'source_provider': 'csv'},
+            {'city': 'Rome', 'temperature': 0, 'description': 'clear', 'source_provider': 'csv'},
+            {'city': 'Cairo', 'temperature': ' -3e1 ', 'description': 'hot', 'source_provider': ''},
+            {'city': 12345, 'temperature': True, 'description': 'odd', 'source_provider': 'csv'},
+            {'city': 'Quito', 'temperature': '1e400', 'description': 'mild', 'source_provider': 'csv'},
+        ]
+        
+        with self.assertLogs('src.transformers.weather_transformer', level='WARNING'):
+            expected = transform_weather_data(mixed_data)
+            batch, rejected = transform_weather_batch(mixed_data)
+        
+        self.assertEqual(batch.to_records(), expected)
+        self.assertEqual(len(batch), len(expected))
+        self.assertEqual(rejected, [1, 3, 4, 6])
+        
+        self.assertEqual(transform_weather_batch(mixed_data[:1] + mixed_data[2:3])[0].to_records(),
+                             transform_weather_data(mixed_data[:1] + mixed_data[2:3]))
+                             
+    def test_transform_weather_batch_summarizes_warnings(self):
+        """Test rejected rows produce one summary warning rather than one per row."""
+        raw_data = [{'city': 'Berlin', 'temperature': 'bad', 'description': 'x', 'source_provider': 'csv'}] * 50
+        
+        with self.assertLogs('src.transformers.weather_transformer', level='WARNING') as logs:
+            batch, rejected = transform_weather_batch(raw_data)
+        
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(rejected, list(range(50)))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('invalid temperature: 50', logs.output[0])
+        
     def test_validate_transformed_data_valid(self):
         """Test validation of properly transformed data."""
         valid_data = [